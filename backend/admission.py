@@ -0,0 +1,214 @@
+"""
+===============================================================================
+ File: admission.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Admission control for the write routes (like, dislike, recipe and
+     user creation), each of which turns into several Supabase writes.
+
+     Provides:
+         - TokenBucket: refills at `rate` tokens/second up to `burst`.
+         - LatencyTracker: exponentially weighted moving average of
+           observed Supabase latency.
+         - AdmissionControl: a per-user bucket and one bucket shared by
+           every caller, plus latency-aware load shedding.
+
+     A request is admitted only if both its user's bucket and the global
+     bucket have a token; otherwise the caller gets a 429 with how long to
+     wait. Independently, once the average Supabase latency goes above
+     SHED_LATENCY_MS the database is taken to be saturated and writes are
+     shed (503) with a probability that grows from 0 at the threshold to
+     SHED_MAX at twice the threshold, so load backs off before requests
+     pile up. Some writes always get through, so the latency average keeps
+     receiving samples and shedding stops once the database recovers.
+
+     Buckets live in this process; with several workers the global rate
+     applies per worker.
+
+ Configuration (environment):
+     WRITE_RATE_PER_USER     Write requests/second per user          [2]
+     WRITE_BURST_PER_USER    Per-user burst size                     [20]
+     WRITE_RATE_GLOBAL       Write requests/second, all users        [200]
+     WRITE_BURST_GLOBAL      Global burst size                       [400]
+     SHED_LATENCY_MS         Average DB latency where shedding starts [500]
+                             (0 disables shedding)
+===============================================================================
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+
+WRITE_RATE_PER_USER = float(os.getenv("WRITE_RATE_PER_USER", "2"))
+WRITE_BURST_PER_USER = float(os.getenv("WRITE_BURST_PER_USER", "20"))
+WRITE_RATE_GLOBAL = float(os.getenv("WRITE_RATE_GLOBAL", "200"))
+WRITE_BURST_GLOBAL = float(os.getenv("WRITE_BURST_GLOBAL", "400"))
+SHED_LATENCY_MS = float(os.getenv("SHED_LATENCY_MS", "500"))
+
+# Highest shed probability (leaves traffic to measure recovery with)
+SHED_MAX = 0.9
+
+# Users with a live bucket; idle buckets are full, so dropping the oldest is safe
+MAX_TRACKED_USERS = 100_000
+
+
+class TokenBucket:
+    """
+    Token bucket: starts full, refills at `rate` tokens/second, holds at
+    most `burst`.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def take(self, now, n=1.0):
+        """
+        Take `n` tokens if available.
+
+        Returns:
+            float: 0.0 if taken, else seconds until `n` tokens will be.
+        """
+        self._refill(now)
+        if self.tokens >= n:
+            self.tokens -= n
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (n - self.tokens) / self.rate
+
+    def give(self, n=1.0):
+        """Return tokens taken for a request that was refused elsewhere."""
+        self.tokens = min(self.burst, self.tokens + n)
+
+
+class LatencyTracker:
+    """
+    EWMA of call latency in seconds.
+
+    Args:
+        alpha (float): Weight of each new sample.
+    """
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.value = 0.0
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            if self.samples == 0:
+                self.value = seconds
+            else:
+                self.value += self.alpha * (seconds - self.value)
+            self.samples += 1
+
+
+class AdmissionControl:
+    """
+    Per-user and global token buckets with latency-aware load shedding.
+
+    Args:
+        per_user_rate, per_user_burst (float): Each user's bucket.
+        global_rate, global_burst (float): Bucket shared by every request.
+        shed_latency (float): Average DB latency in seconds where shedding
+            starts; 0 or None disables it.
+        latency (LatencyTracker): Where DB latency is observed; by default
+            a new tracker fed through observe() (Services hooks it up to
+            every Supabase call made through resilience.DBCaller).
+    """
+
+    def __init__(self, per_user_rate=WRITE_RATE_PER_USER, per_user_burst=WRITE_BURST_PER_USER,
+                 global_rate=WRITE_RATE_GLOBAL, global_burst=WRITE_BURST_GLOBAL,
+                 shed_latency=SHED_LATENCY_MS / 1000, latency=None,
+                 max_users=MAX_TRACKED_USERS, clock=time.monotonic, rand=random.random):
+        self.per_user_rate = per_user_rate
+        self.per_user_burst = per_user_burst
+        self.shed_latency = shed_latency
+        self.latency = latency or LatencyTracker()
+        self.max_users = max_users
+        self.clock = clock
+        self.rand = rand
+        self._global = TokenBucket(global_rate, global_burst, now=clock())
+        self._users = OrderedDict()     # key → TokenBucket (least recent first)
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.limited = 0
+        self.shed = 0
+
+    def observe(self, seconds):
+        """Record one Supabase call's latency."""
+        self.latency.observe(seconds)
+
+    def shed_probability(self):
+        if not self.shed_latency or self.latency.samples == 0:
+            return 0.0
+        over = (self.latency.value - self.shed_latency) / self.shed_latency
+        return min(SHED_MAX, max(0.0, over))
+
+    def _bucket(self, key, now):
+        bucket = self._users.get(key)
+        if bucket is None:
+            bucket = self._users[key] = TokenBucket(self.per_user_rate, self.per_user_burst, now=now)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(key)
+        return bucket
+
+    def admit(self, key):
+        """
+        Decide whether to run a write for caller `key` (user id, or client
+        address when there is none).
+
+        Returns:
+            tuple(int, float): (status, retry_after) — (200, 0) to proceed,
+            (429, seconds) when a bucket is empty, (503, seconds) when
+            shedding load.
+        """
+        probability = self.shed_probability()
+        if probability and self.rand() < probability:
+            with self._lock:
+                self.shed += 1
+            # Roughly how long the backlog needs to drain
+            return 503, max(1.0, self.latency.value)
+
+        now = self.clock()
+        with self._lock:
+            bucket = self._bucket(key, now)
+            wait = bucket.take(now)
+            if not wait:
+                wait = self._global.take(now)
+                if wait:
+                    bucket.give()
+            if wait:
+                self.limited += 1
+                return 429, wait
+            self.admitted += 1
+            return 200, 0.0
+
+    def stats(self):
+        return {
+            "admitted": self.admitted,
+            "limited": self.limited,
+            "shed": self.shed,
+            "tracked_users": len(self._users),
+            "db_latency_ms": round(self.latency.value * 1000, 1),
+            "shed_probability": round(self.shed_probability(), 3),
+        }
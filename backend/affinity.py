@@ -0,0 +1,96 @@
+"""
+===============================================================================
+ File: affinity.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Per-user taste vectors used to personalize the feed.
+     Provides:
+         - apply_swipe: O(1)-per-field update of a user's category and
+           ingredient weights after a like/dislike/unlike
+         - swipe_tokens: the tokens a swipe shifts, for swipe_recipe()
+           (migrations/007), which applies the same update in the database
+         - build_vector: rebuild a vector from a user's full history
+           (used by the rebuild_affinity.py batch job)
+
+     RecipeUtility.user_affinity reads the stored vector when ranking.
+
+     Vectors are stored on the profile in users_public.affinity as
+         {"category": {"dinner": 3.0, ...}, "ingredient": {"garlic": 2.0, ...}}
+     (see migrations/001_user_affinity.sql). Tokens are normalized with
+     RecipeUtility._norm_token so they match feed and allergen filtering.
+===============================================================================
+"""
+
+import os
+
+from recipe_utility import RecipeUtility
+
+
+LIKE_WEIGHT = float(os.getenv("AFFINITY_LIKE_WEIGHT", "1.0"))
+DISLIKE_WEIGHT = float(os.getenv("AFFINITY_DISLIKE_WEIGHT", "-0.5"))
+
+# Columns a recipe row needs for an affinity update
+RECIPE_COLUMNS = "category, ingredients"
+
+_util = RecipeUtility()
+
+
+def empty_vector():
+    return {"category": {}, "ingredient": {}}
+
+
+def _tokens(recipe):
+    category = _util._norm_token(str(recipe.get("category") or ""))
+    ingredients = _util._norm_set(recipe.get("ingredients")) - {""}
+    return category, ingredients
+
+
+def _bump(weights, key, delta):
+    value = weights.get(key, 0.0) + delta
+    if abs(value) < 1e-9:
+        weights.pop(key, None)
+    else:
+        weights[key] = round(value, 6)
+
+
+def _apply(vector, recipe, weight):
+    category, ingredients = _tokens(recipe)
+    if category:
+        _bump(vector["category"], category, weight)
+    for ingredient in ingredients:
+        _bump(vector["ingredient"], ingredient, weight)
+
+
+def swipe_tokens(recipe):
+    """(category or None, sorted ingredients) that a swipe on `recipe` shifts."""
+    category, ingredients = _tokens(recipe)
+    return category or None, sorted(ingredients)
+
+
+def apply_swipe(vector, recipe, weight):
+    """
+    Return a copy of `vector` with `recipe`'s category and ingredients
+    shifted by `weight` (LIKE_WEIGHT, DISLIKE_WEIGHT, or -LIKE_WEIGHT to
+    undo a like).
+    """
+    vector = vector or {}
+    updated = {
+        "category": dict(vector.get("category") or {}),
+        "ingredient": dict(vector.get("ingredient") or {}),
+    }
+    _apply(updated, recipe, weight)
+    return updated
+
+
+def build_vector(recipes_by_id, liked_ids, disliked_ids=()):
+    """Recompute a vector from scratch given the user's liked/disliked ids."""
+    vector = empty_vector()
+    for ids, weight in ((liked_ids, LIKE_WEIGHT), (disliked_ids, DISLIKE_WEIGHT)):
+        for rid in ids or []:
+            recipe = recipes_by_id.get(rid)
+            if recipe is not None:
+                _apply(vector, recipe, weight)
+    return vector
+
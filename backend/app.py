@@ -15,8 +15,8 @@ Description:
       • Maintain user profiles & preferences (e.g., allergens)
 
     This file wires together:
-      - Flask routing layer
-      - Supabase database client
+      - Flask routing layer (the `api` blueprint) and the create_app() factory
+      - Supabase database client, services and indexes (lazily, via services.py)
       - Recipe, User, and Leaderboard service classes
       - CORS handling for frontend communication
 ===============================================================================
@@ -26,47 +26,120 @@ Description:
 # IMPORTS — System, Libraries, and Application Services
 # =============================================================================
 
+from dotenv import load_dotenv              # .env → os.environ, once, before config is read
+load_dotenv()
+
 import os                                   # Reads environment variables for configuration
-from flask import Flask, jsonify, request   # Web framework utilities for JSON APIs
-from flask import render_template           # Optional: HTML rendering
+import math                                 # Rounds Retry-After up to whole seconds
+import uuid                                 # Validates UUID user identifiers
+from functools import wraps                 # Preserves route names under decorators
+from flask import Blueprint, Flask, current_app, jsonify, request  # Web framework utilities
 from flask_cors import CORS                 # Enables CORS for frontend communication
-from supabase import create_client, Client  # Supabase DB + Storage client
-import uuid                                 # Used for unique identifiers
+from werkzeug.local import LocalProxy       # `services` → the current app's Services
+from etag import conditional_json, content_etag, row_etag, rows_etag  # Conditional GET
+from json_provider import FastJSONProvider  # orjson-backed jsonify
+from compression import Compressor          # gzip/brotli response encoding
+
+# Lazily constructed Supabase client, services and in-memory indexes
+from services import Services
+from search_index import parse_query
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Largest number of recipes served by one GET /recipes?ids=... call
+MAX_BATCH_IDS = int(os.getenv("MAX_BATCH_IDS", "100"))
 
-# Internal service classes encapsulating business logic
-from recipe_service import RecipeService
-from recipe_utility import RecipeUtility
-from leaderboard_service import LeaderboardService
-from user_service import UserService
+# Default and maximum page size for /search
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+MAX_SEARCH_PAGE_SIZE = int(os.getenv("MAX_SEARCH_PAGE_SIZE", "100"))
+
+# Default number of /autocomplete suggestions (capped by AutocompleteIndex.max_results)
+AUTOCOMPLETE_LIMIT = int(os.getenv("AUTOCOMPLETE_LIMIT", "8"))
+
+# Feed page size (top-K ranked recipes per /feed call) and its upper bound
+FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "50"))
+MAX_FEED_PAGE_SIZE = int(os.getenv("MAX_FEED_PAGE_SIZE", "500"))
+
+# Default and maximum leaderboard page size (100 = the community "top 100" view)
+LEADERBOARD_PAGE_SIZE = int(os.getenv("LEADERBOARD_PAGE_SIZE", "10"))
+MAX_LEADERBOARD_PAGE_SIZE = int(os.getenv("MAX_LEADERBOARD_PAGE_SIZE", "100"))
+
+# Start the catalog warm-up and feed refill threads when an app is created
+WARM_ON_START = os.getenv("WARM_ON_START", "1") != "0"
+
+# All routes live on this blueprint; create_app() registers it
+api = Blueprint("api", __name__)
+
+# Services of the app handling the current request (see create_app)
+services = LocalProxy(lambda: current_app.extensions["services"])
 
 
 # =============================================================================
-# FLASK APP INITIALIZATION & CONFIGURATION
+# APPLICATION FACTORY
 # =============================================================================
 
-app = Flask(__name__)
+def create_app(services=None, warm=WARM_ON_START):
+    """
+    Build the Flask app.
+
+    Args:
+        services (Services | None): Shared clients/services; a new lazy
+            Services() by default. Nothing touches the network until a
+            route (or the warm-up) first needs it.
+        warm (bool): Start the background warm-up threads.
+
+    Run with:  flask --app app run   |   gunicorn "app:create_app()"
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    Compressor(app)
+
+    # Enable CORS for all routes (frontend ↔ backend communication)
+    CORS(app, supports_credentials=True, origins="*")
+
+    app.extensions["services"] = services or Services()
+    app.register_blueprint(api)
+
+    if warm:
+        app.extensions["services"].start()
+    return app
 
-# Load Supabase credentials from environment
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# Enable CORS for all routes (frontend ↔ backend communication)
-CORS(app, supports_credentials=True, origins="*")
+# =============================================================================
+# ADMISSION CONTROL — Write routes
+# =============================================================================
 
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+def admitted(field):
+    """
+    Rate-limit a write route per caller (the request's `field`, from the
+    JSON body or form; the client address when absent) and globally.
 
-# Initialize services
-service = RecipeService(supabase)
-utility = RecipeUtility(supabase)
-leaderboard_service = LeaderboardService(supabase)
-user_service = UserService(supabase)
+    Refused requests get 429 (a bucket is empty) or 503 (shedding load
+    while Supabase is slow), both with Retry-After.
+    """
+    def decorator(route):
+        @wraps(route)
+        def wrapper(*args, **kwargs):
+            body = request.get_json(silent=True) if request.is_json else request.form
+            key = (body or {}).get(field) or request.remote_addr
+            status, retry_after = services.admission.admit(str(key))
+            if status != 200:
+                error = "Too many requests" if status == 429 else "Server busy, try again shortly"
+                response = jsonify({"error": error, "retry_after": round(retry_after, 3)})
+                response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                return response, status
+            return route(*args, **kwargs)
+        return wrapper
+    return decorator
 
 
 # =============================================================================
 # ROUTE: ROOT / STATIC PAGES
 # =============================================================================
-@app.route("/")
+@api.route("/")
 def home():
     """
     Purpose:
@@ -75,48 +148,66 @@ def home():
     Returns:
         Static HTML file.
     """
-    return app.send_static_file("index.html")
+    return current_app.send_static_file("index.html")
 
 
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def error_404(e):
     """Serve custom 404 page."""
-    return app.send_static_file('404.html')
+    return current_app.send_static_file('404.html')
 
 
-@app.errorhandler(403)
+@api.app_errorhandler(403)
 def error_403(e):
     """Serve custom 403 page."""
-    return app.send_static_file('403.html')
+    return current_app.send_static_file('403.html')
 
 
 # =============================================================================
 # ROUTES: RECIPE CRUD (Create, Read, Update, Delete)
 # =============================================================================
 
-@app.route("/recipes", methods=["GET"])
+@api.route("/recipes", methods=["GET"])
 def get_recipes():
     """
     Purpose:
         Fetch recipes. If `authorid` is provided, fetch only that user's recipes.
+        If `ids` is provided, fetch exactly those recipes in one round trip.
 
     Query Params:
         authorid (str) — Optional user ID to filter recipes.
+        ids (str)      — Optional comma-separated recipe IDs, e.g. "1,2,3".
 
     Returns:
         JSON list of recipe objects.
     """
     authorid = request.args.get("authorid")
+    ids = request.args.get("ids")
+
+    if ids is not None:
+        try:
+            recipe_ids = [int(x) for x in ids.split(",") if x.strip()]
+        except ValueError:
+            return jsonify({"error": "ids must be comma-separated integers"}), 400
+
+        if not recipe_ids or len(recipe_ids) > MAX_BATCH_IDS:
+            return jsonify({"error": f"ids must list 1-{MAX_BATCH_IDS} recipes"}), 400
+
+        result, status = services.recipes.get_recipes_by_ids(recipe_ids)
+        etag = rows_etag(result["data"], "missing", *result["missing"]) if status == 200 else None
+        return conditional_json(result, status, etag)
 
     if authorid:
-        result = service.get_recipes_by_author(authorid)
-        return jsonify(result), 200
+        result = services.recipes.get_recipes_by_author(authorid)
+        return conditional_json(result, 200, rows_etag(result))
 
-    result = service.get_all_recipes()
-    return jsonify(result), 200
+    # Full catalog: stream the body so it is encoded/compressed incrementally
+    result = services.recipes.get_all_recipes()
+    etag = rows_etag(result["data"]) if "data" in result else None
+    return conditional_json(result, 200, etag, stream=True)
 
 
-@app.route("/recipes/<int:recipe_id>", methods=["GET"])
+@api.route("/recipes/<int:recipe_id>", methods=["GET"])
 def get_recipe(recipe_id):
     """
     Purpose:
@@ -128,11 +219,47 @@ def get_recipe(recipe_id):
     Returns:
         (JSON, status_code): Recipe details or error.
     """
-    result, status = service.get_recipe(recipe_id)
-    return jsonify(result), status
+    result, status = services.recipes.get_recipe(recipe_id)
+    etag = row_etag(result["data"]) if status == 200 else None
+    return conditional_json(result, status, etag)
+
+
+@api.route("/recipes/<int:recipe_id>/similar", methods=["GET"])
+def get_similar_recipes(recipe_id):
+    """
+    Purpose:
+        "More like this": recipes with the most similar ingredients/category.
+
+    Args:
+        recipe_id (int): Recipe to find neighbors for.
 
+    Query Params:
+        limit (int) — Number of results (default 10, max SIMILAR_TOP_K).
+
+    Returns:
+        {"data": [recipe + "similarity", ...]} best match first.
+    """
+    if not services.catalog.ready:
+        return jsonify({"error": "Similarity index is still loading"}), 503
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), services.similarity_index.top_k))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
 
-@app.route("/recipes", methods=["POST"])
+    neighbors = services.similarity_index.similar(recipe_id, limit)
+    if neighbors is None:
+        return jsonify({"error": "Recipe not found"}), 404
+
+    rows = [(services.catalog.get(rid), score) for rid, score in neighbors]
+    rows = [(row, score) for row, score in rows if row is not None]
+    results = [{**row, "similarity": score} for row, score in rows]
+    etag = rows_etag([row for row, _ in rows], *(score for _, score in rows))
+    return conditional_json({"data": results}, 200, etag)
+
+
+@api.route("/recipes", methods=["POST"])
+@admitted("authorid")
 def create_recipe():
     """
     Purpose:
@@ -148,11 +275,11 @@ def create_recipe():
     """
     data = dict(request.form) if request.form else request.json()
     image_file = request.files.get("image")
-    result = service.create_recipe(data, image_file)
+    result = services.recipes.create_recipe(data, image_file)
     return jsonify(result), 201 if "error" not in result else 400
 
 
-@app.route("/recipes/<int:recipe_id>", methods=["PUT"])
+@api.route("/recipes/<int:recipe_id>", methods=["PUT"])
 def update_recipe(recipe_id):
     """
     Purpose:
@@ -166,11 +293,11 @@ def update_recipe(recipe_id):
     """
     data = dict(request.form) if request.form else request.json()
     image_file = request.files.get("image")
-    result = service.update_recipe(recipe_id, data, image_file)
+    result = services.recipes.update_recipe(recipe_id, data, image_file)
     return jsonify(result), 200 if "error" not in result else 400
 
 
-@app.route("/recipes/<int:recipe_id>", methods=["DELETE"])
+@api.route("/recipes/<int:recipe_id>", methods=["DELETE"])
 def delete_recipe(recipe_id):
     """
     Purpose:
@@ -182,7 +309,7 @@ def delete_recipe(recipe_id):
     Returns:
         Confirmation JSON.
     """
-    result = service.delete_recipe(recipe_id)
+    result = services.recipes.delete_recipe(recipe_id)
     return jsonify(result), 200 if "error" not in result else 400
 
 
@@ -190,7 +317,7 @@ def delete_recipe(recipe_id):
 # FEED GENERATION — Personalized Swipe Feed
 # =============================================================================
 
-@app.route("/feed/<identifier>", methods=["GET"])
+@api.route("/feed/<identifier>", methods=["GET"])
 def get_user_feed(identifier):
     """
     Purpose:
@@ -201,37 +328,50 @@ def get_user_feed(identifier):
             - UUID user ID OR
             - Username
 
+    Query Params:
+        limit (int) — Page size, default FEED_PAGE_SIZE (max MAX_FEED_PAGE_SIZE).
+
     Logic:
         1. Determine whether identifier is UUID or username.
-        2. Load that user from DB.
-        3. Load all recipes.
-        4. Send both into RecipeUtility to compute feed ordering.
+        2. Load that user (profile cache / DB).
+        3. Serve the top `limit` from the user's precomputed feed queue;
+           on a miss, rank the in-memory catalog with RecipeUtility and
+           refill the queue.
 
     Returns:
         {"data": feed_list} or error.
     """
     try:
-        query_col = "id" if is_valid_uuid(identifier) else "username"
-
-        user_response = (
-            supabase.table("users_public")
-            .select("*")
-            .eq(query_col, identifier)
-            .execute()
-        )
-
-        if not user_response.data:
-            return jsonify({"error": "User not found"}), 404
-
-        user = user_response.data[0]
-
-        # Load all recipes
-        recipe_response = supabase.table("recipes_public").select("*").execute()
-        recipes = recipe_response.data or []
-
-        feed = utility.generate_user_feed(recipes, user)
+        limit = max(1, min(int(request.args.get("limit", FEED_PAGE_SIZE)), MAX_FEED_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
 
-        return jsonify({"data": feed}), 200
+    try:
+        if is_valid_uuid(identifier):
+            # Served from the UserService profile cache when warm
+            result, status = services.users.get_user(identifier)
+            if status != 200:
+                return jsonify(result), status
+            user = result["data"][0]
+        else:
+            user_response = (
+                services.db.table("users_public")
+                .select("*")
+                .eq("username", identifier)
+                .execute()
+            )
+
+            if not user_response.data:
+                return jsonify({"error": "User not found"}), 404
+
+            user = user_response.data[0]
+
+        if services.catalog.ready:
+            feed = services.feed_queues.feed(user, limit)
+        else:
+            feed = services.compute_feed(user, limit)
+
+        return conditional_json({"data": feed}, 200, rows_etag(feed))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -255,36 +395,134 @@ def is_valid_uuid(value):
         return False
 
 
+# =============================================================================
+# SEARCH — Ingredient include/exclude + allergen-safe lookup
+# =============================================================================
+
+def _split_terms(value):
+    return [t.strip() for t in (value or "").split(",") if t.strip()]
+
+
+@api.route("/search", methods=["GET"])
+def search_recipes():
+    """
+    Purpose:
+        Find recipes by ingredients from the in-memory inverted index.
+
+    Query Params:
+        q (str)         — Free text, e.g. "chicken, garlic, no dairy".
+        include (str)   — Comma-separated ingredients that must all appear.
+        exclude (str)   — Comma-separated ingredients/restrictions to avoid.
+        allergens (str) — Comma-separated allergens to filter out.
+        user_id (str)   — Also filter out this user's saved allergens.
+        limit, offset   — Paging (newest recipes first).
+
+    Returns:
+        {"data": [recipe, ...], "total": int}
+    """
+    if not services.catalog.ready:
+        return jsonify({"error": "Search index is still loading"}), 503
+
+    try:
+        limit = max(1, min(int(request.args.get("limit", SEARCH_PAGE_SIZE)), MAX_SEARCH_PAGE_SIZE))
+        offset = max(0, int(request.args.get("offset", 0)))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    include, exclude = parse_query(request.args.get("q"))
+    include += _split_terms(request.args.get("include"))
+    exclude += _split_terms(request.args.get("exclude"))
+    allergens = _split_terms(request.args.get("allergens"))
+
+    user_id = request.args.get("user_id")
+    if user_id:
+        result, status = services.users.get_user(user_id)
+        if status != 200:
+            return jsonify(result), status
+        allergens += services.utility._as_list(result["data"][0].get("allergens"))
+
+    # Newest first; only this page is walked and decoded
+    page_ids, total = services.search_index.page(include, exclude, allergens, limit, offset)
+    rows = [row for row in map(services.catalog.get, page_ids) if row is not None]
+
+    return conditional_json({"data": rows, "total": total}, 200, rows_etag(rows, total))
+
+
+@api.route("/autocomplete", methods=["GET"])
+def autocomplete():
+    """
+    Purpose:
+        Type-ahead suggestions for recipe titles and ingredient names,
+        answered from memory (no database query per keystroke).
+
+    Query Params:
+        q (str)     — What the user has typed so far.
+        type (str)  — Optional: "title" or "ingredient".
+        limit (int) — Max suggestions (default AUTOCOMPLETE_LIMIT).
+
+    Returns:
+        {"data": [{"text", "type", "weight", "recipeid"}, ...]}
+    """
+    if not services.catalog.ready:
+        return jsonify({"error": "Autocomplete index is still loading"}), 503
+
+    kind = request.args.get("type") or None
+    if kind not in (None, "title", "ingredient"):
+        return jsonify({"error": "type must be 'title' or 'ingredient'"}), 400
+    try:
+        limit = int(request.args.get("limit", AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    return jsonify({"data": services.autocomplete_index.suggest(request.args.get("q", ""), limit, kind)}), 200
+
+
 # =============================================================================
 # LEADERBOARD ROUTES — Daily, Weekly, Authors
 # =============================================================================
 
-@app.route("/leaderboard/daily", methods=["GET"])
+def _leaderboard_page(board):
+    """Serve ?limit=&offset= of a precomputed board (see LeaderboardService.page)."""
+    try:
+        limit = max(1, min(int(request.args.get("limit", LEADERBOARD_PAGE_SIZE)),
+                           MAX_LEADERBOARD_PAGE_SIZE))
+        offset = max(0, min(int(request.args.get("offset", 0)), services.leaderboards.size))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    result, status = services.leaderboards.page(board, limit, offset)
+    return conditional_json({"data": result}, status, content_etag(result))
+
+
+@api.route("/leaderboard/daily", methods=["GET"])
 def get_daily_leaderboard():
-    """Return top recipes of the day."""
-    result, status = leaderboard_service.get_daily_leaderboard(limit=10)
-    return jsonify({"data": result}), status
+    """
+    Return top recipes of the day (likes in the last 24 hours).
+
+    Query Params:
+        limit (int)  — Page size, default LEADERBOARD_PAGE_SIZE (max MAX_LEADERBOARD_PAGE_SIZE).
+        offset (int) — Entries to skip (up to LEADERBOARD_SIZE).
+    """
+    return _leaderboard_page("daily")
 
 
-@app.route("/leaderboard/weekly", methods=["GET"])
+@api.route("/leaderboard/weekly", methods=["GET"])
 def leaderboard_weekly():
-    """Return top recipes of the week."""
-    result, status = leaderboard_service.get_weekly_leaderboard(limit=10)
-    return jsonify({"data": result}), status
+    """Return top recipes of the week; paged like /leaderboard/daily."""
+    return _leaderboard_page("weekly")
 
 
-@app.route("/leaderboard/authors", methods=["GET"])
+@api.route("/leaderboard/authors", methods=["GET"])
 def leaderboard_authors():
-    """Return top-ranked recipe authors."""
-    result, status = leaderboard_service.get_author_leaderboard(limit=10)
-    return jsonify({"data": result}), status
+    """Return top-ranked recipe authors; paged like /leaderboard/daily."""
+    return _leaderboard_page("authors")
 
 
 # =============================================================================
 # USER MANAGEMENT — Create, Update, Likes, Collections
 # =============================================================================
 
-@app.route("/user/exists/<username>", methods=["GET"])
+@api.route("/user/exists/<username>", methods=["GET"])
 def check_username_exists(username):
     """
     Purpose:
@@ -294,21 +532,15 @@ def check_username_exists(username):
         {"exists": bool}
     """
     try:
-        result = (
-            supabase.table("users_public")
-            .select("username")
-            .eq("username", username)
-            .execute()
-        )
-
-        exists = len(result.data) > 0
+        exists = services.users.username_exists(username)
         return jsonify({"exists": exists}), 200
 
     except Exception as e:
         return jsonify({"exists": False, "error": str(e)}), 500
 
 
-@app.route("/user/create", methods=["POST"])
+@api.route("/user/create", methods=["POST"])
+@admitted("user_id")
 def create_user_route():
     """
     Purpose:
@@ -333,34 +565,37 @@ def create_user_route():
     if not re.match(r"^[a-zA-Z0-9_]{3,20}$", username):
         return jsonify({"error": "Invalid username format"}), 400
 
-    exists_check = (
-        supabase.table("users_public")
-        .select("username")
-        .eq("username", username)
-        .execute()
-    )
-    if exists_check.data:
+    if services.users.username_exists(username):
         return jsonify({"error": "Username already taken"}), 409
 
     # Load all recipes for unseen filtering
-    recipes_response = supabase.table("recipes_public").select("recipeid,dietaryrestrictions").execute()
+    recipes_response = (
+        services.db.table("recipes_public")
+        .select("recipeid,dietaryrestrictions")
+        .execute(observe=False)
+    )
     all_recipes = recipes_response.data or []
 
-    filtered_ids = utility.filter_unseen_by_allergens(all_recipes, allergens)
+    filtered_ids = services.utility.filter_unseen_by_allergens(all_recipes, allergens)
 
-    result, status = user_service.create_user(user_id, username, allergens, filtered_ids)
+    result, status = services.users.create_user(user_id, username, allergens, filtered_ids)
+
+    # Name taken on another instance since our index loaded → unique violation
+    if status == 500 and "duplicate key" in str(result.get("error", "")):
+        return jsonify({"error": "Username already taken"}), 409
 
     if status != 200:
         return jsonify(result), status
 
     # Save allergens if given
     if allergens:
-        user_service.update_allergens(user_id, allergens)
+        services.users.update_allergens(user_id, allergens)
 
     return jsonify({"message": "User created", "data": result}), 200
 
 
-@app.route("/user/like", methods=["POST"])
+@api.route("/user/like", methods=["POST"])
+@admitted("user_id")
 def like_recipe_route():
     """
     Purpose:
@@ -380,11 +615,12 @@ def like_recipe_route():
     if not user_id or recipe_id is None or not author_id:
         return jsonify({"error": "Missing required fields"}), 400
 
-    result, status = user_service.like_recipe(user_id, recipe_id, author_id)
+    result, status = services.users.like_recipe(user_id, recipe_id, author_id)
     return jsonify(result), status
 
 
-@app.route("/user/dislike", methods=["POST"])
+@api.route("/user/dislike", methods=["POST"])
+@admitted("user_id")
 def dislike_recipe_route():
     """
     Purpose:
@@ -403,11 +639,11 @@ def dislike_recipe_route():
     if not user_id or recipe_id is None:
         return jsonify({"error": "Missing required fields"}), 400
 
-    result, status = user_service.dislike_recipe(user_id, recipe_id)
+    result, status = services.users.dislike_recipe(user_id, recipe_id)
     return jsonify(result), status
 
 
-@app.route("/user/<user_id>/liked", methods=["GET"])
+@api.route("/user/<user_id>/liked", methods=["GET"])
 def get_liked_recipes(user_id):
     """
     Purpose:
@@ -419,15 +655,16 @@ def get_liked_recipes(user_id):
     Returns:
         {"data": [recipe, ...]}
     """
-    data, status = user_service.get_liked_recipes(user_id)
-    return jsonify(data), status
+    data, status = services.users.get_liked_recipes(user_id)
+    etag = rows_etag(data["data"]) if status == 200 else None
+    return conditional_json(data, status, etag)
 
 
 # =============================================================================
 # USER PROFILE — Retrieve & Update Public Data
 # =============================================================================
 
-@app.route("/api/user_public/<username>", methods=["GET"])
+@api.route("/api/user_public/<username>", methods=["GET"])
 def get_user(username):
     """
     Purpose:
@@ -440,13 +677,13 @@ def get_user(username):
         JSON profile or error.
     """
     try:
-        user = user_service.get_user_by_username(username)
+        user = services.users.get_user_by_username(username)
         return jsonify(user)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/user_public/<username>", methods=["PUT"])
+@api.route("/api/user_public/<username>", methods=["PUT"])
 def update_user(username):
     """
     Purpose:
@@ -460,12 +697,48 @@ def update_user(username):
     """
     try:
         data = request.json
-        updated = user_service.update_user_by_username(username, data)
+        updated = services.users.update_user_by_username(username, data)
+        if "allergens" in (data or {}) and isinstance(updated, dict) and updated.get("id"):
+            services.feed_queues.invalidate(updated["id"])
         return jsonify(updated)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# =============================================================================
+# METRICS — In-process cache statistics
+# =============================================================================
+
+@api.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Purpose:
+        Report in-process cache sizes and hit rates, the recipe sync
+        watermarks, write admission counters, Supabase circuit breaker
+        states, like counter folds, rolling leaderboard state and the age
+        of the precomputed leaderboards for this worker.
+
+    Returns:
+        {"caches": {name: stats}, "recipe_sync": stats, "admission": stats,
+         "db": {"retried", "hedged", "breakers": {"table.op": stats}},
+         "like_counters": stats, "rolling_leaderboard": stats,
+         "leaderboards": {board: {"size", "generated_at"}}}
+    """
+    return jsonify({
+        "caches": {
+            "profiles": services.users.cache_stats(),
+            "recipes": services.recipes.cache.stats(),
+            "feed_queues": services.feed_queues.stats(),
+        },
+        "recipe_sync": services.recipe_sync.stats(),
+        "admission": services.admission.stats(),
+        "db": services.db.stats(),
+        "like_counters": services.like_counters.stats(),
+        "rolling_leaderboard": services.rolling_leaderboard.stats(),
+        "leaderboards": services.leaderboards.stats(),
+    }), 200
+
+
 # =============================================================================
 # SERVER ENTRY POINT
 # =============================================================================
@@ -475,4 +748,4 @@ if __name__ == '__main__':
     Launch the Flask development server.
     Debug=True enables hot reload and full error traces.
     """
-    app.run(debug=True)
+    create_app().run(debug=True)
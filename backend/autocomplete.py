@@ -0,0 +1,279 @@
+"""
+===============================================================================
+ File: autocomplete.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Type-ahead index behind GET /autocomplete.
+
+     Suggestions are recipe titles and ingredient names, weighted by likes
+     (a title's weight is its recipe's likes; an ingredient's weight is
+     the sum of likes over the recipes using it). Every suggestion is
+     reachable from each of its word starts, so "chi" suggests both
+     "chicken" and "Grilled Chicken Salad".
+
+     Keys live in one sorted array; a prefix query is two binary searches
+     plus a top-K over the matching range. One- and two-character
+     prefixes match a large share of the array, so their top lists
+     (max_results entries, per suggestion type) are precomputed on load
+     and kept up to date as weights change; only a list that may have
+     lost an entry to one outside it is recomputed, on its next query.
+     Results for longer prefixes are memoized.
+
+     Recipe writes adjust only the entries the recipe contributes to
+     (a likes-only change just reweights them) and invalidate only the
+     memoized prefixes of those entries.
+
+     Subscribes to RecipeCatalog (see catalog.py).
+===============================================================================
+"""
+
+import bisect
+import heapq
+import re
+import threading
+
+from cache import LRUCache
+
+
+# Prefixes up to this long get a maintained top list
+SHORT_PREFIX_LEN = 2
+
+# Suggestion type filters a query can ask for (None = both)
+KINDS = (None, "title", "ingredient")
+
+
+def normalize_key(text):
+    """Lowercase, keep letters/digits/spaces, collapse whitespace."""
+    t = re.sub(r"[^a-z0-9 ]", " ", str(text or "").lower())
+    return re.sub(r"\s+", " ", t).strip()
+
+
+class AutocompleteIndex:
+    """
+    Sorted-array prefix index over titles and ingredients.
+
+    Attributes:
+        max_results (int): Upper bound on suggestions per query.
+    """
+
+    def __init__(self, max_results=20, memo_size=4096):
+        self.max_results = max_results
+        self._entries = {}    # (kind, key) → {"text", "type", "refs": {rid: likes}, "weight"}
+        self._keys = []       # sorted [(search key, (kind, key))]
+        self._docs = {}       # recipeid → [(kind, key, display text)]
+        self._top = {}        # (short prefix, kind) → [entry_id, ...] best first
+        self._memo = LRUCache(memo_size)    # prefix → {(limit, kind): results}
+        self._lock = threading.RLock()
+
+    # ---------- entries ----------
+
+    @staticmethod
+    def _search_keys(key):
+        words = key.split(" ")
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    def _contributions(self, recipe):
+        items = []
+        title_key = normalize_key(recipe.get("title"))
+        if title_key:
+            items.append(("title", title_key, str(recipe.get("title")).strip()))
+        seen = set()
+        for ingredient in recipe.get("ingredients") or []:
+            key = normalize_key(ingredient)
+            if key and key not in seen:
+                seen.add(key)
+                items.append(("ingredient", key, key))
+        return items
+
+    def _rank(self, entry_id):
+        # Heaviest first, alphabetical among equals
+        return (-self._entries[entry_id]["weight"], entry_id[1])
+
+    def _range(self, prefix):
+        """Entry ids with a search key starting with `prefix`."""
+        lo = bisect.bisect_left(self._keys, (prefix,))
+        hi = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        return {entry_id for _, entry_id in self._keys[lo:hi]}
+
+    def _best(self, prefix, limit, kind):
+        entry_ids = self._range(prefix)
+        if kind:
+            entry_ids = {e for e in entry_ids if e[0] == kind}
+        return heapq.nsmallest(limit, entry_ids, key=self._rank)
+
+    def _short_top(self, prefix, kind):
+        top = self._top.get((prefix, kind))
+        if top is None:
+            top = self._top[(prefix, kind)] = self._best(prefix, self.max_results, kind)
+        return top
+
+    def _changed(self, entry_id, old_weight):
+        """
+        Update memo and short-prefix lists after an entry was added
+        (old_weight None), reweighted, or removed from _entries.
+        """
+        entry = self._entries.get(entry_id)
+        for search_key in self._search_keys(entry_id[1]):
+            for n in range(1, len(search_key) + 1):
+                prefix = search_key[:n]
+                self._memo.pop(prefix)
+                if n > SHORT_PREFIX_LEN:
+                    continue
+                for kind in (None, entry_id[0]):
+                    top = self._top.get((prefix, kind))
+                    if top is None:
+                        continue
+                    full = len(top) >= self.max_results
+                    if entry_id in top:
+                        if entry is None and not full:
+                            top.remove(entry_id)
+                        elif entry is None or (full and old_weight is not None
+                                               and entry["weight"] < old_weight):
+                            # An entry outside the list may now outrank it
+                            del self._top[(prefix, kind)]
+                        else:
+                            top.sort(key=self._rank)
+                    elif entry is not None and (not full or self._rank(entry_id) < self._rank(top[-1])):
+                        top.append(entry_id)
+                        top.sort(key=self._rank)
+                        del top[self.max_results:]
+
+    def _add_ref(self, kind, key, text, recipe_id, likes):
+        entry_id = (kind, key)
+        entry = self._entries.get(entry_id)
+        old_weight = None
+        if entry is None:
+            entry = {"text": text, "type": kind, "refs": {}, "weight": 0}
+            self._entries[entry_id] = entry
+            for search_key in self._search_keys(key):
+                bisect.insort(self._keys, (search_key, entry_id))
+        else:
+            old_weight = entry["weight"]
+        entry["weight"] += likes - entry["refs"].get(recipe_id, 0)
+        entry["refs"][recipe_id] = likes
+        if entry["weight"] != old_weight:
+            self._changed(entry_id, old_weight)
+
+    def _drop_ref(self, kind, key, recipe_id):
+        entry_id = (kind, key)
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return
+        old_weight = entry["weight"]
+        entry["weight"] -= entry["refs"].pop(recipe_id, 0)
+        if not entry["refs"]:
+            del self._entries[entry_id]
+            for search_key in self._search_keys(key):
+                pos = bisect.bisect_left(self._keys, (search_key, entry_id))
+                if pos < len(self._keys) and self._keys[pos] == (search_key, entry_id):
+                    self._keys.pop(pos)
+        if entry_id not in self._entries or entry["weight"] != old_weight:
+            self._changed(entry_id, old_weight)
+
+    def _index(self, row):
+        rid = row["recipeid"]
+        likes = max(0, row.get("likes") or 0)
+        items = self._contributions(row)
+        keep = {(kind, key) for kind, key, _ in items}
+        for kind, key, _ in self._docs.get(rid, []):
+            if (kind, key) not in keep:
+                self._drop_ref(kind, key, rid)
+        for kind, key, text in items:
+            self._add_ref(kind, key, text, rid, likes)
+        self._docs[rid] = items
+
+    def _unindex(self, recipe_id):
+        for kind, key, _ in self._docs.pop(recipe_id, []):
+            self._drop_ref(kind, key, recipe_id)
+
+    # ---------- catalog listener ----------
+
+    def reset(self, rows):
+        with self._lock:
+            self._entries, self._keys, self._docs = {}, [], {}
+            for row in rows:
+                rid = row["recipeid"]
+                likes = max(0, row.get("likes") or 0)
+                items = self._contributions(row)
+                for kind, key, text in items:
+                    entry = self._entries.setdefault(
+                        (kind, key), {"text": text, "type": kind, "refs": {}, "weight": 0}
+                    )
+                    entry["weight"] += likes - entry["refs"].get(rid, 0)
+                    entry["refs"][rid] = likes
+                self._docs[rid] = items
+            self._keys = sorted(
+                (search_key, entry_id)
+                for entry_id in self._entries
+                for search_key in self._search_keys(entry_id[1])
+            )
+            self._memo.clear()
+            self._top = {}
+            short = {k[:n] for k, _ in self._keys for n in range(1, SHORT_PREFIX_LEN + 1)}
+            for prefix in short:
+                for kind in KINDS:
+                    self._short_top(prefix, kind)
+
+    def upsert(self, row):
+        with self._lock:
+            self._index(row)
+
+    def remove(self, recipe_id):
+        with self._lock:
+            self._unindex(recipe_id)
+
+    # ---------- queries ----------
+
+    def suggest(self, prefix, limit=8, kind=None):
+        """
+        Highest-weighted suggestions with a word starting with `prefix`.
+
+        Args:
+            prefix (str): Raw user input.
+            limit (int): Max suggestions (capped at max_results).
+            kind (str | None): "title", "ingredient" or None for both.
+
+        Returns:
+            list[dict]: {"text", "type", "weight", "recipeid"} best first;
+            recipeid is the most-liked recipe for titles, None otherwise.
+        """
+        p = normalize_key(prefix)
+        if not p:
+            return []
+        limit = max(1, min(limit, self.max_results))
+
+        if len(p) > SHORT_PREFIX_LEN:
+            cached = (self._memo.get(p) or {}).get((limit, kind))
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            if len(p) <= SHORT_PREFIX_LEN:
+                best = self._short_top(p, kind)[:limit]
+            else:
+                best = self._best(p, limit, kind)
+            results = []
+            for entry_id in best:
+                entry = self._entries[entry_id]
+                top_recipe = None
+                if entry["type"] == "title":
+                    top_recipe = max(entry["refs"].items(), key=lambda kv: kv[1])[0]
+                results.append({
+                    "text": entry["text"],
+                    "type": entry["type"],
+                    "weight": entry["weight"],
+                    "recipeid": top_recipe,
+                })
+            if len(p) > SHORT_PREFIX_LEN:
+                memo = self._memo.get(p)
+                if memo is None:
+                    memo = {}
+                    self._memo.set(p, memo)
+                memo[(limit, kind)] = results
+
+        return results
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,104 @@
+"""
+File: bench_json.py
+Purpose: Benchmark JSON encoding of catalog-size recipe payloads with Flask's
+         default provider versus FastJSONProvider (orjson).
+Authors: Kadee Wheeler
+
+Usage:
+    python bench_json.py                 # 5000 recipes, 20 rounds
+    python bench_json.py --recipes 20000 --rounds 10
+
+Reports best/median encode time, payload bytes and throughput for each
+provider. No database is needed; recipes are synthesized with the same
+shape as rows in recipes_public.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import FastJSONProvider
+
+
+CATEGORIES = ["breakfast", "lunch", "dinner", "dessert", "snack", "drink"]
+INGREDIENTS = [
+    "flour", "sugar", "eggs", "butter", "milk", "chicken breast", "salmon",
+    "rice", "garlic", "onion", "tomatoes", "spinach", "cheese", "peanuts",
+    "olive oil", "lemon", "basil", "black beans", "tortillas", "yogurt",
+]
+RESTRICTIONS = ["dairy", "gluten", "peanut", "treenuts", "fish", "shellfish", "egg", "vegetarian"]
+
+
+def make_catalog(count, seed=7):
+    """Build `count` synthetic recipe rows shaped like recipes_public."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for rid in range(1, count + 1):
+        rows.append({
+            "recipeid": rid,
+            "title": f"Recipe {rid} with {rng.choice(INGREDIENTS)}",
+            "description": "A tasty dish from the Tastebuddin community. " * 2,
+            "category": rng.choice(CATEGORIES),
+            "ingredients": rng.sample(INGREDIENTS, rng.randint(3, 8)),
+            "directions": [f"Step {n}: stir, season and cook until done." for n in range(1, rng.randint(3, 9))],
+            "dietaryrestrictions": rng.sample(RESTRICTIONS, rng.randint(0, 3)),
+            "minutestocomplete": rng.randint(5, 120),
+            "authorid": f"00000000-0000-4000-8000-{rng.randint(0, 999):012d}",
+            "authorname": f"cook_{rng.randint(0, 999)}",
+            "likes": rng.randint(0, 5000),
+            "photopath": f"https://example.supabase.co/storage/v1/object/public/recipe_images/{rid}.jpg",
+            "datecreated": (start + timedelta(minutes=rid)).isoformat(),
+        })
+    return rows
+
+
+def time_encoder(encode, payload, rounds):
+    timings = []
+    size = 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        body = encode(payload)
+        timings.append(time.perf_counter() - t0)
+        size = len(body)
+    return timings, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = {"data": make_catalog(args.recipes)}
+
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    # Measure the full jsonify path: what routes actually put on the wire
+    encoders = [("flask default", lambda obj: default.response(obj).get_data())]
+    if json_provider.USE_ORJSON:
+        encoders.append(("orjson", lambda obj: fast.response(obj).get_data()))
+    else:
+        print("[WARN] orjson not available; only the default provider is measured")
+
+    print(f"Payload: {args.recipes} recipes, {args.rounds} rounds")
+    print(f"{'provider':<14} {'best ms':>9} {'median ms':>10} {'bytes':>11} {'MB/s':>8}")
+    for name, encode in encoders:
+        timings, size = time_encoder(encode, payload, args.rounds)
+        best = min(timings)
+        print(
+            f"{name:<14} {best * 1000:>9.2f} {statistics.median(timings) * 1000:>10.2f} "
+            f"{size:>11} {size / best / 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+File: bench_startup.py
+Purpose: Measure worker startup cost: importing app.py, creating the Flask
+         app, and first use of the lazily built services.
+Authors: Kadee Wheeler
+
+Usage:
+    python bench_startup.py               # 5 runs, top 15 imports
+    python bench_startup.py --runs 10 --top 25
+
+Each measurement runs in a fresh interpreter (what a new worker pays).
+Reports:
+    - wall time for `import app`, `create_app()` and for building every
+      service (Supabase client included) on top of that
+    - a `python -X importtime` breakdown of the slowest imports under app
+
+No database is needed: warm-up threads are disabled and the Supabase
+client is created with placeholder credentials when none are set (the
+client does not connect until a query runs).
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STAGES = [
+    ("import app", "import app"),
+    ("create_app()", "import app; app.create_app(warm=False)"),
+    ("+ all services", (
+        "import app; a = app.create_app(warm=False); s = a.extensions['services']; "
+        "[getattr(s, n) for n in ('supabase', 'catalog', 'recipes', 'utility', "
+        "'leaderboards', 'users', 'feed_queues')]"
+    )),
+]
+
+TIMER = "import time; _t = time.perf_counter(); {code}; print(time.perf_counter() - _t)"
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _env():
+    env = dict(os.environ, WARM_ON_START="0", PYTHONDONTWRITEBYTECODE="1")
+    env.setdefault("SUPABASE_URL", "http://localhost:54321")
+    env.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.placeholder")
+    return env
+
+
+def time_stage(code, runs):
+    """Seconds taken by `code` in each of `runs` fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=HERE, env=_env(), capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def import_breakdown(top):
+    """(self µs, cumulative µs, module) for the slowest top-level imports under app."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=HERE, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if m:
+            depth = len(m.group(3)) // 2
+            rows.append((int(m.group(1)), int(m.group(2)), depth, m.group(4)))
+    # Direct imports of app (depth 1) show what each dependency costs in total
+    direct = sorted((r for r in rows if r[2] == 1), key=lambda r: r[1], reverse=True)
+    return direct[:top], sum(r[0] for r in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"Startup, {args.runs} fresh interpreters per stage")
+    print(f"{'stage':<16} {'best ms':>9} {'median ms':>10}")
+    for name, code in STAGES:
+        timings = time_stage(code, args.runs)
+        print(f"{name:<16} {min(timings) * 1000:>9.1f} {statistics.median(timings) * 1000:>10.1f}")
+
+    direct, total = import_breakdown(args.top)
+    print(f"\n`import app` imports (python -X importtime), total {total / 1000:.1f} ms")
+    print(f"{'module':<28} {'cumulative ms':>14}")
+    for _, cumulative, _, module in direct:
+        print(f"{module:<28} {cumulative / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
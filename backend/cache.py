@@ -0,0 +1,126 @@
+"""
+===============================================================================
+ File: cache.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Small in-process caching primitives shared by the backend services.
+     Provides:
+         - LRUCache: bounded, thread-safe least-recently-used map with an
+           optional time-to-live per entry and hit/miss counters.
+
+     Services keep their own cache instances; nothing here talks to
+     Supabase directly.
+===============================================================================
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept before evicting.
+        ttl (float | None): Seconds an entry stays valid; None = forever.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, expires_at, now):
+        return expires_at is not None and expires_at <= now
+
+    def get(self, key, default=None):
+        """Return the cached value for key (refreshing its recency) or default."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if self._expired(expires_at, now):
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys):
+        """
+        Look up several keys at once.
+
+        Returns:
+            tuple(dict, list): {key: value} for hits, and the missed keys
+            in the order they were requested.
+        """
+        now = time.monotonic()
+        hits, misses = {}, []
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key, _MISSING)
+                if entry is not _MISSING and not self._expired(entry[1], now):
+                    self._data.move_to_end(key)
+                    hits[key] = entry[0]
+                else:
+                    if entry is not _MISSING:
+                        del self._data[key]
+                    misses.append(key)
+            self.hits += len(hits)
+            self.misses += len(misses)
+        return hits, misses
+
+    def set(self, key, value):
+        """Insert or replace key, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Remove key and return its value (or default)."""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Snapshot of size and hit-rate counters for /metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def __contains__(self, key):
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and not self._expired(entry[1], time.monotonic())
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,254 @@
+"""
+===============================================================================
+ File: catalog.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     In-process copy of the recipes_public table that in-memory indexes
+     (similarity, search, autocomplete, ...) are built from.
+
+     RecipeCatalog loads the table once (paged) and is then kept current
+     by RecipeService, which reports every recipe it creates, edits or
+     deletes. Subscribed indexes receive the same events:
+
+         listener.reset(rows)          full (re)load
+         listener.upsert(row)          recipe created or changed
+         listener.remove(recipe_id)    recipe deleted
+
+     Rows normally live in a per-process dict. With a shared snapshot
+     (see catalog_snapshot.py) the snapshot is the read-only base and only
+     this process's writes since the snapshot are held locally. Remapping
+     a newer snapshot sends listeners only the rows that differ (upsert /
+     remove), not a reset, and closes the mapping replaced one remap
+     earlier (any reader still on it has long finished).
+===============================================================================
+"""
+
+import threading
+import time
+
+
+class RecipeCatalog:
+    """
+    Thread-safe map of recipeid → recipe row with change listeners.
+
+    Attributes:
+        ready (bool): True once the initial load has completed.
+        version (int): Incremented on every change; cheap staleness check.
+        snapshot (CatalogSnapshot | None): Shared base rows, if mapped.
+        loaded_at (float | None): Epoch seconds the loaded rows are current
+            as of (see recipe_sync.py).
+    """
+
+    def __init__(self, supabase=None, table_name="recipes_public", page_size=1000):
+        self.supabase = supabase
+        self.table_name = table_name
+        self.page_size = page_size
+        self._rows = {}          # local rows (all rows unless a snapshot is mapped)
+        self._deleted = set()    # snapshot rows deleted since it was mapped
+        self.snapshot = None
+        self._retired = None     # previous snapshot, closed on the next swap
+        self._listeners = []
+        self._lock = threading.RLock()
+        self.ready = False
+        self.version = 0
+        self.loaded_at = None
+
+    # ---------- listeners ----------
+
+    def subscribe(self, listener):
+        """Register an index; it is immediately reset with the current rows if loaded."""
+        with self._lock:
+            self._listeners.append(listener)
+            if self.ready:
+                listener.reset(self.all())
+
+    def _notify(self, method, arg):
+        for listener in self._listeners:
+            try:
+                getattr(listener, method)(arg)
+            except Exception as e:
+                print(f"[WARN] Catalog listener {type(listener).__name__}.{method} failed:", e)
+
+    # ---------- loading ----------
+
+    def fetch_all(self, after_id=None):
+        """Page every row (or every row with recipeid > after_id) out of the recipes table."""
+        rows = []
+        start = 0
+        while True:
+            query = self.supabase.table(self.table_name).select("*")
+            if after_id is not None:
+                query = query.gt("recipeid", after_id)
+            page = (
+                query
+                .order("recipeid")
+                .range(start, start + self.page_size - 1)
+                .execute()
+            ).data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            start += self.page_size
+
+    def load(self, rows=None):
+        """Replace the catalog with `rows` (fetched from the DB when None)."""
+        started = time.time()
+        if rows is None:
+            rows = self.fetch_all()
+        with self._lock:
+            self.loaded_at = started
+            self._rows = {r["recipeid"]: r for r in rows}
+            self._deleted = set()
+            self._swap(None)
+            self.version += 1
+            self.ready = True
+            self._notify("reset", list(self._rows.values()))
+        return len(rows)
+
+    def load_snapshot(self, snapshot):
+        """
+        Switch to a shared snapshot as the base rows.
+
+        Local writes are dropped: the snapshot was built from the database
+        after they were committed (up to one refresh interval of lag).
+        Listeners are reset on the first snapshot and otherwise told only
+        about the rows that changed.
+        """
+        with self._lock:
+            previous, local, deleted = self.snapshot, self._rows, self._deleted
+            self._swap(snapshot)
+            self.loaded_at = snapshot.generation / 1e9
+            self._rows = {}
+            self._deleted = set()
+            self.version += 1
+            self.ready = True
+            if previous is None:
+                self._notify("reset", self.all())
+            else:
+                self._notify_remap(previous, local, deleted)
+        return len(snapshot)
+
+    def _swap(self, snapshot):
+        if self._retired is not None and self._retired is not snapshot:
+            self._retired.close()
+        self._retired = self.snapshot
+        self.snapshot = snapshot
+
+    def _notify_remap(self, previous, local, deleted):
+        """Send listeners the difference between the old view and the new snapshot."""
+        snapshot = self.snapshot
+        changed, removed = snapshot.diff(previous)
+        changed, removed = set(changed), set(removed) - deleted
+        for rid in local:
+            if rid not in snapshot:
+                removed.add(rid)
+            elif rid not in changed and snapshot.get(rid) != local[rid]:
+                changed.add(rid)
+        changed.update(rid for rid in deleted if rid in snapshot)
+
+        if len(changed) + len(removed) > len(snapshot) // 2:
+            self._notify("reset", self.all())  # most rows moved; rebuild once
+            return
+        for rid in removed:
+            self._notify("remove", rid)
+        for rid in sorted(changed):
+            self._notify("upsert", snapshot.get(rid))
+
+    # ---------- writes ----------
+
+    def upsert(self, row):
+        if not row or row.get("recipeid") is None:
+            return
+        with self._lock:
+            current = self.get(row["recipeid"])
+            merged = {**(current or {}), **row}
+            if merged == current:
+                return  # e.g. a sync re-reading a row it already applied
+            self._rows[row["recipeid"]] = merged
+            self._deleted.discard(row["recipeid"])
+            self.version += 1
+            self._notify("upsert", merged)
+
+    def remove(self, recipe_id):
+        with self._lock:
+            if recipe_id not in self:
+                return
+            self._rows.pop(recipe_id, None)
+            if self.snapshot is not None and recipe_id in self.snapshot:
+                self._deleted.add(recipe_id)
+            self.version += 1
+            self._notify("remove", recipe_id)
+
+    # ---------- reads ----------
+
+    def get(self, recipe_id):
+        row = self._rows.get(recipe_id)
+        if row is not None or self.snapshot is None or recipe_id in self._deleted:
+            return row
+        return self.snapshot.get(recipe_id)
+
+    def all(self):
+        if self.snapshot is None:
+            return list(self._rows.values())
+        local, deleted = self._rows, self._deleted
+        rows = [
+            r for r in self.snapshot.values()
+            if r["recipeid"] not in local and r["recipeid"] not in deleted
+        ]
+        rows.extend(local.values())
+        return rows
+
+    def feed_candidates(self, ids, allergens, limit, utility, slack=None):
+        """
+        Decoded allergen-safe rows among `ids` that can make a top-`limit`
+        feed, and the max likes among all safe candidates (rank_feed's
+        popularity scale). Snapshot rows are shortlisted from its columns
+        (CatalogSnapshot.feed_shortlist) and only the survivors decoded;
+        local rows go through RecipeUtility.filter_recipes_by_allergens.
+        `slack` bounds the non-column part of a score (default: the sum of
+        the non-column weights).
+
+        Returns:
+            tuple[list[dict], int]
+        """
+        snapshot, local, deleted = self.snapshot, self._rows, self._deleted
+        local_rows, base_ids = [], []
+        for rid in ids:
+            row = local.get(rid)
+            if row is not None:
+                local_rows.append(row)
+            elif snapshot is not None and rid not in deleted and rid in snapshot:
+                base_ids.append(rid)
+
+        rows = utility.filter_recipes_by_allergens(local_rows, allergens)
+        max_likes = max((max(0, r.get("likes") or 0) for r in rows), default=0)
+        if not base_ids:
+            return rows, max_likes
+
+        if slack is None:
+            slack = utility.feed_slack(None, None)
+        shortlist = snapshot.feed_shortlist(base_ids, allergens, limit, utility, slack, max_likes)
+        if shortlist is None:  # allergen outside the mask's vocabulary
+            safe = utility.filter_recipes_by_allergens(list(map(snapshot.get, base_ids)), allergens)
+            max_likes = max([max_likes] + [max(0, r.get("likes") or 0) for r in safe])
+        else:
+            shortlisted, max_likes = shortlist
+            safe = [row for row in map(snapshot.get, shortlisted) if row is not None]
+        return rows + safe, max_likes
+
+    def __contains__(self, recipe_id):
+        if recipe_id in self._rows:
+            return True
+        return (
+            self.snapshot is not None
+            and recipe_id not in self._deleted
+            and recipe_id in self.snapshot
+        )
+
+    def __len__(self):
+        if self.snapshot is None:
+            return len(self._rows)
+        added = sum(1 for rid in self._rows if rid not in self.snapshot)
+        return len(self.snapshot) - len(self._deleted) + added
@@ -0,0 +1,494 @@
+"""
+===============================================================================
+ File: catalog_snapshot.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Memory-mapped, columnar recipe catalog shared by every worker process
+     on a host and kept on disk across restarts.
+     Provides:
+         - write_snapshot: serialize rows to a snapshot file, atomically
+         - CatalogSnapshot: read-only mapping recipeid → row over an mmap,
+           plus NumPy columns for vectorized reads
+         - SnapshotManager: keeps a RecipeCatalog on the newest snapshot;
+           one worker (holder of an flock) refreshes it from the database
+
+     The file is mapped read-only, so its pages live once in the OS page
+     cache however many workers map it; a worker only pays for the rows it
+     decodes. Refreshes write a new file and os.replace() it over the old
+     one, so a reader sees either the old or the new snapshot, never a mix.
+     Readers that still hold the old mapping keep using it until they
+     remap; RecipeCatalog closes a mapping one remap after replacing it.
+
+     A (re)starting worker maps the snapshot already on disk and then only
+     asks the database for recipes newer than the snapshot's last id, so
+     a restart or a new worker on the host does not download the catalog.
+
+     File layout (native byte order, sections 8-byte aligned):
+         magic    8 bytes  b"TBCAT03\\0"
+         header   generation (u64, ns timestamp), count (u64),
+                  layout length (u64), layout (JSON, space padded)
+         numeric columns, one array each, rows in ascending recipeid:
+             recipeid      int64
+             likes         int64
+             created       float64   datecreated as epoch seconds (NaN if unset)
+             allergens     uint64    bit i set if the recipe contains
+                                     ALLERGEN_VOCAB[i] (dietaryrestrictions
+                                     or ingredients, RecipeUtility tokens)
+             digest        uint64    hash of the whole row; remaps compare it
+                                     to find the rows that changed
+         string tables, one per other row field:
+             offsets  uint64[count + 1], blob  cell i is blob[offsets[i]:offsets[i+1]]
+             cells are JSON; an empty cell means the row lacks the field
+
+     The layout JSON records where each section starts and the allergen
+     vocabulary it was written with. Requires numpy.
+
+ Configuration (environment):
+     CATALOG_SNAPSHOT           Snapshot path; unset disables sharing  []
+     CATALOG_SNAPSHOT_INTERVAL  Seconds between full refreshes         [300]
+     CATALOG_SNAPSHOT_POLL      Seconds between checks for a new file  [5]
+===============================================================================
+"""
+
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from recipe_utility import RecipeUtility
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "")
+CATALOG_SNAPSHOT_INTERVAL = float(os.getenv("CATALOG_SNAPSHOT_INTERVAL", "300"))
+CATALOG_SNAPSHOT_POLL = float(os.getenv("CATALOG_SNAPSHOT_POLL", "5"))
+
+MAGIC = b"TBCAT03\0"
+_HEADER = struct.Struct("=8sQQQ")
+
+# Allergen tokens with a bit in the `allergens` column (at most 64)
+ALLERGEN_VOCAB = tuple(sorted(set(RecipeUtility._CANON.values())))
+
+_NUMERIC = (
+    ("recipeid", "<i8"), ("likes", "<i8"), ("created", "<f8"),
+    ("allergens", "<u8"), ("digest", "<u8"),
+)
+
+_util = RecipeUtility()
+
+
+def _dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(buf):
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(bytes(buf))
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for catalog snapshots")
+
+
+def _epoch(value):
+    ts = _util._parse_timestamp(value)
+    return ts.timestamp() if ts is not None else float("nan")
+
+
+def _allergen_bits(row, vocab=ALLERGEN_VOCAB):
+    tokens = _util._norm_set(row.get("dietaryrestrictions")) | _util._norm_set(row.get("ingredients"))
+    bits = 0
+    for i, token in enumerate(vocab):
+        if token in tokens:
+            bits |= 1 << i
+    return bits
+
+
+def _digest(row):
+    h = hashlib.blake2b(_dumps({k: row[k] for k in sorted(row)}), digest_size=8)
+    return int.from_bytes(h.digest(), "little")
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _layout(numeric, text, pos):
+    """Section positions from `pos` on → (layout dict, [(position, bytes)])."""
+    layout = {"numeric": {}, "text": {}, "allergen_vocab": list(ALLERGEN_VOCAB)}
+    sections = []
+    for name, dtype in _NUMERIC:
+        layout["numeric"][name] = [dtype, pos]
+        sections.append((pos, numeric[name].tobytes()))
+        pos = _align(pos + numeric[name].nbytes)
+    for field, (offsets, blob) in text.items():
+        blob_at = _align(pos + offsets.nbytes)
+        layout["text"][field] = [pos, blob_at]
+        sections.append((pos, offsets.tobytes()))
+        sections.append((blob_at, blob))
+        pos = _align(blob_at + len(blob))
+    return layout, sections
+
+
+def write_snapshot(path, rows, generation=None):
+    """
+    Write `rows` to `path` as a columnar snapshot, replacing any existing
+    file atomically.
+
+    Returns:
+        int: The snapshot generation (defaults to time.time_ns()); rows
+        are assumed current as of this time.
+    """
+    _require_numpy()
+    generation = generation or time.time_ns()
+    rows = sorted(rows, key=lambda r: r["recipeid"])
+
+    numeric = {
+        "recipeid": np.array([r["recipeid"] for r in rows], dtype="<i8"),
+        "likes": np.array([r.get("likes") or 0 for r in rows], dtype="<i8"),
+        "created": np.array([_epoch(r.get("datecreated")) for r in rows], dtype="<f8"),
+        "allergens": np.array([_allergen_bits(r) for r in rows], dtype="<u8"),
+        "digest": np.array([_digest(r) for r in rows], dtype="<u8"),
+    }
+
+    fields = sorted({k for r in rows for k in r} - {"recipeid"})
+    text = {}
+    for field in fields:
+        cells = [_dumps(r[field]) if field in r else b"" for r in rows]
+        offsets = np.zeros(len(rows) + 1, dtype="<u8")
+        offsets[1:] = np.cumsum([len(c) for c in cells])
+        text[field] = (offsets, b"".join(cells))
+
+    # Section positions depend on the layout's length, so reserve room for
+    # it and retry with more if the encoded layout does not fit
+    reserved = 0
+    while True:
+        layout, sections = _layout(numeric, text, _align(_HEADER.size + reserved))
+        layout_bytes = json.dumps(layout).encode("utf-8")
+        if len(layout_bytes) <= reserved:
+            break
+        reserved = len(layout_bytes) + 64
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, generation, len(rows), reserved))
+        f.write(layout_bytes.ljust(reserved))
+        end = f.tell()
+        for pos, data in sections:
+            f.seek(pos)
+            f.write(data)
+            end = max(end, _align(pos + len(data)))
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return generation
+
+
+class CatalogSnapshot:
+    """
+    Read-only recipeid → row mapping over a columnar snapshot file.
+
+    Rows are decoded on access and never cached here, so every caller gets
+    its own dict. `columns` exposes the numeric arrays directly (views into
+    the mapping, no copies).
+
+    Attributes:
+        generation (int): Identifies the snapshot (ns timestamp; the
+            writer uses the time it started reading the database).
+        columns (dict[str, numpy.ndarray]): recipeid, likes, created,
+            allergens, digest.
+    """
+
+    def __init__(self, path):
+        _require_numpy()
+        self.path = path
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.file_id = (st.st_ino, st.st_mtime_ns)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        magic, self.generation, count, layout_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        layout = json.loads(self._mm[_HEADER.size:_HEADER.size + layout_len])
+
+        self.allergen_vocab = tuple(layout["allergen_vocab"])
+        self.columns = {
+            name: np.frombuffer(self._mm, dtype=dtype, count=count, offset=pos)
+            for name, (dtype, pos) in layout["numeric"].items()
+        }
+        self._ids = self.columns["recipeid"]
+        self._view = memoryview(self._mm)
+        self._text = {
+            field: (np.frombuffer(self._mm, dtype="<u8", count=count + 1, offset=offsets_at), blob_at)
+            for field, (offsets_at, blob_at) in layout["text"].items()
+        }
+
+    def _row_at(self, i):
+        row = {"recipeid": int(self._ids[i])}
+        for field, (offsets, blob_at) in self._text.items():
+            start, end = int(offsets[i]), int(offsets[i + 1])
+            if end > start:
+                row[field] = _loads(self._view[blob_at + start:blob_at + end])
+        return row
+
+    def _index(self, recipe_id):
+        try:
+            recipe_id = int(recipe_id)
+        except (TypeError, ValueError):
+            return None
+        i = int(np.searchsorted(self._ids, recipe_id))
+        if i < len(self._ids) and self._ids[i] == recipe_id:
+            return i
+        return None
+
+    def get(self, recipe_id, default=None):
+        i = self._index(recipe_id)
+        return default if i is None else self._row_at(i)
+
+    def ids(self):
+        return self._ids.tolist()
+
+    def max_id(self):
+        return int(self._ids[-1]) if len(self._ids) else None
+
+    def values(self):
+        for i in range(len(self._ids)):
+            yield self._row_at(i)
+
+    def allergen_free_ids(self, allergens, ids=None):
+        """
+        Ids (of `ids`, default all) containing none of `allergens`, using the
+        allergen bitmask column. Returns None if an allergen is outside the
+        snapshot's vocabulary and the mask cannot answer.
+        """
+        mask = 0
+        for token in _util._norm_set(allergens):
+            if token not in self.allergen_vocab:
+                return None
+            mask |= 1 << self.allergen_vocab.index(token)
+
+        positions = slice(None)
+        if ids is not None:
+            wanted = np.asarray(sorted({int(i) for i in ids}), dtype="<i8")
+            pos = np.searchsorted(self._ids, wanted)
+            found = pos < len(self._ids)
+            found[found] = self._ids[pos[found]] == wanted[found]
+            positions = pos[found]
+        safe = (self.columns["allergens"][positions] & np.uint64(mask)) == 0
+        return self._ids[positions][safe].tolist()
+
+    def feed_shortlist(self, ids, allergens, limit, utility, slack, max_likes=0, now=None):
+        """
+        Of `ids`, the allergen-safe recipes that can still make the top
+        `limit` of RecipeUtility.rank_feed, read from the allergens, likes
+        and created columns without decoding a row.
+
+        Recency and popularity are computed here exactly as rank_feed does;
+        the other terms add at most `slack` (RecipeUtility.feed_slack), so a
+        recipe whose column score plus the slack is below the limit-th best
+        column score cannot make the cut.
+
+        Args:
+            max_likes (int): Most likes among candidates outside this
+                snapshot (rank_feed scales popularity by the overall max).
+
+        Returns:
+            tuple[list[int], int] | None: (ids, max likes over the safe
+            candidates, to pass to rank_feed); None if the allergen mask
+            cannot answer.
+        """
+        safe = self.allergen_free_ids(allergens, ids)
+        if safe is None:
+            return None
+        pos = np.searchsorted(self._ids, np.asarray(safe, dtype="<i8"))
+        likes = np.maximum(self.columns["likes"][pos], 0)
+        max_likes = max(max_likes, int(likes.max()) if len(likes) else 0)
+        if limit is None or limit >= len(safe):
+            return safe, max_likes
+
+        weights = utility.weights
+        base = np.zeros(len(pos))
+        if weights["popularity"]:
+            base += weights["popularity"] * np.log1p(likes) / (math.log1p(max_likes) or 1.0)
+        if weights["recency"]:
+            age_days = np.maximum(0.0, ((now or time.time()) - self.columns["created"][pos]) / 86400)
+            base += weights["recency"] * np.nan_to_num(0.5 ** (age_days / utility.half_life_days))
+        cutoff = np.partition(base, len(base) - max(1, limit))[len(base) - max(1, limit)]
+        keep = base + slack + 1e-9 >= cutoff   # epsilon: rank_feed rounds differently
+        return np.asarray(safe, dtype="<i8")[keep].tolist(), max_likes
+
+    def diff(self, older):
+        """
+        Rows that differ from snapshot `older`.
+
+        Returns:
+            tuple[list[int], list[int]]: (ids new or changed since `older`,
+            ids no longer present).
+        """
+        pos = np.searchsorted(older._ids, self._ids)
+        same = pos < len(older._ids)
+        same[same] = older._ids[pos[same]] == self._ids[same]
+        same[same] = older.columns["digest"][pos[same]] == self.columns["digest"][same]
+        gone = ~np.isin(older._ids, self._ids)
+        return self._ids[~same].tolist(), older._ids[gone].tolist()
+
+    def close(self):
+        """
+        Unmap the file. Only call once no thread can still be reading this
+        snapshot (RecipeCatalog waits one remap).
+        """
+        self.columns = {}
+        self._ids = np.empty(0, dtype="<i8")
+        self._text = {}
+        try:
+            self._view.release()
+            self._mm.close()
+        except BufferError:
+            pass  # a caller still holds a view; unmapped when it is collected
+
+    def __contains__(self, recipe_id):
+        return self._index(recipe_id) is not None
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class SnapshotManager:
+    """
+    Keeps a RecipeCatalog backed by the newest snapshot at `path`.
+
+    Every worker polls the file and remaps when it changes. Whichever worker
+    holds the `<path>.lock` flock also rebuilds the snapshot from the
+    database every `interval` seconds; if it exits, another worker takes
+    over on its next poll.
+    """
+
+    def __init__(self, catalog, path=CATALOG_SNAPSHOT,
+                 interval=CATALOG_SNAPSHOT_INTERVAL, poll=CATALOG_SNAPSHOT_POLL):
+        self.catalog = catalog
+        self.path = path
+        self.interval = interval
+        self.poll = poll
+        self._lock_file = None
+        self._stop = threading.Event()
+
+    # ---------- writer ----------
+
+    def _is_writer(self):
+        if self._lock_file is not None:
+            return True
+        f = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    def publish(self):
+        """Rebuild the snapshot from the database (writer only)."""
+        # Generation = fetch start, so delta sync resumes from before the read
+        generation = time.time_ns()
+        rows = self.catalog.fetch_all()
+        write_snapshot(self.path, rows, generation)
+        print(f"[SNAPSHOT] Wrote {len(rows)} recipes to {self.path}")
+
+    # ---------- readers ----------
+
+    def check(self):
+        """
+        Remap the catalog if a newer snapshot file is present, then catch up
+        on recipes created after it; True if swapped.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        current = self.catalog.snapshot
+        if current is not None and current.file_id == (st.st_ino, st.st_mtime_ns):
+            return False
+        try:
+            snapshot = CatalogSnapshot(self.path)
+        except ValueError as e:
+            print("[WARN] Ignoring catalog snapshot:", e)
+            return False
+        self.catalog.load_snapshot(snapshot)
+        self.catch_up()
+        return True
+
+    def catch_up(self):
+        """Apply recipes newer than the mapped snapshot (delta query)."""
+        snapshot = self.catalog.snapshot
+        if snapshot is None or self.catalog.supabase is None:
+            return 0
+        rows = self.catalog.fetch_all(after_id=snapshot.max_id())
+        for row in rows:
+            self.catalog.upsert(row)
+        return len(rows)
+
+    def _age(self):
+        try:
+            return time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return float("inf")
+
+    def tick(self):
+        if self._is_writer() and self._age() >= self.interval:
+            self.publish()
+        self.check()
+
+    def warm(self, wait=None):
+        """
+        Initial load: map the snapshot on disk (however old; the writer
+        refreshes it in the background) and catch up, writing it first if
+        there is none and this worker is the writer. Readers wait up to `wait` seconds for the
+        writer, then fall back to loading the catalog themselves.
+        """
+        wait = self.interval if wait is None else wait
+        deadline = time.monotonic() + wait
+        while True:
+            if self.check():
+                return len(self.catalog)
+            if self._is_writer():
+                self.publish()
+                self.check()
+                return len(self.catalog)
+            if time.monotonic() >= deadline:
+                return self.catalog.load()
+            time.sleep(min(self.poll, 0.5))
+
+    def run(self):
+        """Refresh/poll loop; call from a daemon thread."""
+        while not self._stop.wait(self.poll):
+            try:
+                self.tick()
+            except Exception as e:
+                print("[WARN] Catalog snapshot refresh failed:", e)
+
+    def stop(self):
+        self._stop.set()
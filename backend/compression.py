@@ -0,0 +1,154 @@
+"""
+===============================================================================
+ File: compression.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Response compression negotiated from the client's Accept-Encoding.
+     Provides:
+         - Compressor: after_request hook that gzip/brotli-encodes JSON and
+           text responses above a size threshold
+         - Streamed responses (e.g. the chunked GET /recipes body) are
+           compressed incrementally, chunk by chunk, without buffering
+
+     Brotli is used when the `brotli` package is installed and the client
+     prefers it; gzip is always available.
+
+ Configuration (environment):
+     COMPRESS_MIN_SIZE    Smallest body (bytes) worth compressing   [1024]
+     COMPRESS_GZIP_LEVEL  zlib level 1-9                            [6]
+     COMPRESS_BR_QUALITY  brotli quality 0-11                       [4]
+===============================================================================
+"""
+
+import os
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BR_QUALITY = int(os.getenv("COMPRESS_BR_QUALITY", "4"))
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+}
+
+# Suffixes appended to the ETag of an encoded representation
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 → gzip container
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._z.compress(chunk)
+
+    def flush(self):
+        return self._z.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._b = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._b.process(chunk)
+
+    def flush(self):
+        return self._b.finish()
+
+
+class Compressor:
+    """
+    Compresses eligible responses for clients that accept it.
+
+    Attributes:
+        min_size (int): Bodies smaller than this are sent as-is.
+        gzip_level (int): zlib compression level.
+        br_quality (int): brotli quality.
+    """
+
+    def __init__(self, app=None, min_size=COMPRESS_MIN_SIZE,
+                 gzip_level=COMPRESS_GZIP_LEVEL, br_quality=COMPRESS_BR_QUALITY):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.br_quality = br_quality
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    # ---------- negotiation ----------
+
+    def choose_encoding(self, accept_encodings):
+        """Pick the best supported encoding the client accepts (None = identity)."""
+        return accept_encodings.best_match(ENCODINGS)
+
+    def _stream(self, encoding):
+        if encoding == "br":
+            return _BrotliStream(self.br_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _compress_chunks(self, chunks, encoding):
+        stream = self._stream(encoding)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = stream.compress(chunk)
+            if out:
+                yield out
+        yield stream.flush()
+
+    # ---------- hook ----------
+
+    def after_request(self, response):
+        if response.status_code == 304:
+            # Carries no body, but caches must still key it by encoding
+            response.vary.add("Accept-Encoding")
+            return response
+        if (
+            response.status_code < 200
+            or response.status_code == 204
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers
+            or response.direct_passthrough
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_chunks(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            response.set_data(b"".join(self._compress_chunks([body], encoding)))
+
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+
+        return response
@@ -0,0 +1,140 @@
+"""
+===============================================================================
+ File: etag.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Strong ETag computation and conditional GET helpers for read routes.
+     Provides:
+         - row_etag / rows_etag: ETags built from per-recipe digests that are
+           cached and reused while the row content is unchanged
+         - content_etag: digest of an arbitrary JSON-able value (small
+           payloads such as leaderboards)
+         - conditional_json: answers If-None-Match with 304, otherwise
+           serializes the payload and attaches the ETag
+
+     A 304 never serializes the payload; only the digest is computed.
+     Compressed representations carry the ETag with an encoding suffix
+     (see compression.py); a client revalidating with that tag still gets
+     its 304.
+===============================================================================
+"""
+
+import hashlib
+import json
+
+from flask import current_app, jsonify, make_response, request
+
+from cache import LRUCache
+from compression import ENCODINGS
+
+
+class DigestCache:
+    """
+    Remembers the digest of each row keyed by its id.
+
+    A cached digest is reused when the incoming row compares equal to the
+    row it was computed from, so unchanged rows are never re-serialized.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._cache = LRUCache(maxsize)
+
+    def digest(self, key, row):
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == row:
+            return cached[1]
+        value = content_digest(row)
+        self._cache.set(key, (dict(row), value))
+        return value
+
+
+def content_digest(obj):
+    """Return a hex digest of obj's canonical JSON form."""
+    raw = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _combine(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# Shared digest cache for recipe rows (keyed by recipeid)
+recipe_digests = DigestCache()
+
+
+def _row_digest(row):
+    rid = row.get("recipeid")
+    if rid is None:
+        return content_digest(row)
+    return recipe_digests.digest(rid, row)
+
+
+def row_etag(row, *extra):
+    """ETag for a single recipe row (plus any extra discriminators)."""
+    return _combine([_row_digest(row), *map(str, extra)])
+
+
+def rows_etag(rows, *extra):
+    """ETag for a list of recipe rows, combined from cached per-row digests."""
+    parts = [_row_digest(r) for r in rows]
+    parts.extend(map(str, extra))
+    return _combine(parts)
+
+
+def content_etag(obj):
+    """ETag for an arbitrary JSON-able value; use for small payloads."""
+    return content_digest(obj)
+
+
+def _matching_tag(etag):
+    """Return the representation tag the client already holds, if any."""
+    if_none_match = request.if_none_match
+    for candidate in (etag, *(f"{etag}-{enc}" for enc in ENCODINGS)):
+        if if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def _json_body(payload, stream):
+    provider = current_app.json
+    if stream and "data" in payload and hasattr(provider, "stream_rows"):
+        return current_app.response_class(
+            provider.stream_rows(payload["data"]), mimetype=provider.mimetype
+        )
+    return jsonify(payload)
+
+
+def conditional_json(payload, status, etag, stream=False):
+    """
+    Build a JSON response honoring If-None-Match.
+
+    Args:
+        payload: JSON-able body (only serialized when actually sent).
+        status (int): HTTP status; ETags are only attached to 200s.
+        etag (str | None): Strong ETag value (unquoted).
+        stream (bool): Encode a {"data": [...]} payload incrementally so
+            large lists are never held as one serialized buffer.
+
+    Returns:
+        Response: 304 with the ETag when the client copy is current,
+        otherwise the JSON body.
+    """
+    if status != 200 or etag is None:
+        return _json_body(payload, stream), status
+
+    matched = _matching_tag(etag)
+    if matched is not None:
+        response = make_response("", 304)
+        etag = matched
+    else:
+        response = make_response(_json_body(payload, stream), status)
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,246 @@
+"""
+===============================================================================
+ File: feed_queue.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Materialized per-user feed queues behind GET /feed.
+
+     A queue is the user's next `depth` ranked recipe ids, computed by the
+     same RecipeUtility.generate_user_feed the live path uses. /feed serves
+     a page from the queue, skipping recipes the user has swiped since it
+     was built (they are no longer in unseen_recipes), and falls back to a
+     live computation when there is no usable queue.
+
+     A background worker refills queues for users seen in the last
+     FEED_ACTIVE_WINDOW seconds, so active users rarely pay for a full
+     recompute on the request path.
+
+     Invalidation (catalog listener):
+         - a new recipe is appended to every queue (served after the
+           queued ones; the user's unseen_recipes, which create_recipe only
+           extends for users it is safe for, decides who actually gets it)
+         - a change to a recipe's ingredients or dietary restrictions
+           drops every queue; other edits (likes, title, photo, ...) keep
+           them, as rows are read from the catalog when served and the
+           ranking is refreshed within FEED_QUEUE_TTL
+         - a deleted recipe is skipped when served
+         - an allergen change drops that user's queue; queues also carry a
+           fingerprint of the allergens they were built with and are
+           discarded on mismatch
+===============================================================================
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from cache import LRUCache
+
+
+# Ranked recipe ids kept per user
+FEED_QUEUE_DEPTH = int(os.getenv("FEED_QUEUE_DEPTH", "200"))
+# Users with a materialized queue
+FEED_QUEUE_USERS = int(os.getenv("FEED_QUEUE_USERS", "10000"))
+# Seconds a queue is served before it is rebuilt (bounds affinity drift)
+FEED_QUEUE_TTL = float(os.getenv("FEED_QUEUE_TTL", "600"))
+# A user counts as active for this many seconds after a /feed call
+FEED_ACTIVE_WINDOW = float(os.getenv("FEED_ACTIVE_WINDOW", "900"))
+# Seconds between background refill passes
+FEED_REFRESH_INTERVAL = float(os.getenv("FEED_REFRESH_INTERVAL", "30"))
+
+
+def _fingerprint(values):
+    return tuple(sorted(str(v).strip().lower() for v in values or ()))
+
+
+def _feed_fields(row, as_list):
+    """The parts of a recipe row that decide which feeds it may appear in."""
+    return (
+        _fingerprint(as_list(row.get("ingredients"))),
+        _fingerprint(as_list(row.get("dietaryrestrictions"))),
+    )
+
+
+class FeedQueues:
+    """
+    Per-user precomputed feeds with live fallback.
+
+    Args:
+        compute (callable): compute(user, limit) → ranked recipe rows.
+        load_user (callable): load_user(user_id) → profile dict or None;
+            used by the background worker.
+        get_recipe (callable): get_recipe(recipe_id) → current row or None.
+        as_list (callable): Parses list columns (RecipeUtility._as_list).
+    """
+
+    def __init__(self, compute, load_user, get_recipe, as_list=list,
+                 depth=FEED_QUEUE_DEPTH, maxsize=FEED_QUEUE_USERS, ttl=FEED_QUEUE_TTL,
+                 active_window=FEED_ACTIVE_WINDOW):
+        self.compute = compute
+        self.load_user = load_user
+        self.get_recipe = get_recipe
+        self.as_list = as_list
+        self.depth = depth
+        self.active_window = active_window
+        self.queues = LRUCache(maxsize, ttl=ttl)
+        self._active = OrderedDict()    # user_id → last /feed time (oldest first)
+        self._active_max = maxsize
+        self._lock = threading.Lock()
+        self._generation = 0            # bumped on global invalidation
+        self._recipes = None            # recipeid → _feed_fields, once reset
+        self._inserted = []             # recipes added since the last invalidation
+        self._stop = threading.Event()
+
+    # ---------- building ----------
+
+    def _build(self, user):
+        generation = self._generation
+        inserted = len(self._inserted)
+        rows = self.compute(user, self.depth + 1)
+        queue = {
+            "ids": [r["recipeid"] for r in rows[:self.depth]],
+            "complete": len(rows) <= self.depth,   # every candidate is in the queue
+            "allergens": _fingerprint(self.as_list(user.get("allergens"))),
+            "inserted": inserted,                  # new recipes after this are appended
+        }
+        # Don't store a queue computed against a catalog that changed meanwhile
+        if generation == self._generation:
+            self.queues.set(user["id"], queue)
+        return rows
+
+    def _serve(self, queue, user, limit):
+        unseen = set(self.as_list(user.get("unseen_recipes")))
+        page = []
+        served = set()
+        for rid in queue["ids"] + self._inserted[queue["inserted"]:]:
+            if rid not in unseen or rid in served:
+                continue
+            served.add(rid)
+            row = self.get_recipe(rid)
+            if row is not None:
+                page.append(row)
+                if len(page) == limit:
+                    return page
+        # Queue ran short; only an exhaustive queue may serve a short page
+        return page if queue["complete"] else None
+
+    # ---------- requests ----------
+
+    def feed(self, user, limit):
+        """Top `limit` feed rows for `user`, from its queue when possible."""
+        user_id = user.get("id")
+        if user_id is None:
+            return self.compute(user, limit)
+
+        self.touch(user_id)
+        queue = self.queues.get(user_id)
+        if queue is not None:
+            if queue["allergens"] != _fingerprint(self.as_list(user.get("allergens"))):
+                self.queues.pop(user_id)
+            else:
+                page = self._serve(queue, user, limit)
+                if page is not None:
+                    return page
+
+        if limit > self.depth:
+            return self.compute(user, limit)
+        return self._build(user)[:limit]
+
+    def touch(self, user_id):
+        with self._lock:
+            self._active[user_id] = time.monotonic()
+            self._active.move_to_end(user_id)
+            while len(self._active) > self._active_max:
+                self._active.popitem(last=False)
+
+    # ---------- invalidation ----------
+
+    def invalidate(self, user_id):
+        self.queues.pop(user_id)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._generation += 1
+            self._inserted = []
+        self.queues.clear()
+
+    def _insert(self, recipe_id):
+        with self._lock:
+            self._inserted.append(recipe_id)
+            overflow = len(self._inserted) > self.depth
+        if overflow:
+            # A queue's worth of new recipes: rebuild rather than keep appending
+            self.invalidate_all()
+
+    # ---------- catalog listener ----------
+
+    def reset(self, rows):
+        fields = {r["recipeid"]: _feed_fields(r, self.as_list) for r in rows}
+        previous, self._recipes = self._recipes, fields
+        if previous is None:
+            return
+        if any(previous.get(rid, f) != f for rid, f in fields.items()):
+            self.invalidate_all()
+            return
+        # Same content (e.g. a snapshot remap); only additions to apply
+        for rid in fields:
+            if rid not in previous:
+                self._insert(rid)
+
+    def upsert(self, row):
+        rid = row["recipeid"]
+        fields = _feed_fields(row, self.as_list)
+        if self._recipes is None:
+            self._recipes = {}
+        previous = self._recipes.get(rid)
+        self._recipes[rid] = fields
+        if previous is None:
+            self._insert(rid)
+        elif previous != fields:
+            self.invalidate_all()
+
+    def remove(self, recipe_id):
+        if self._recipes is not None:
+            self._recipes.pop(recipe_id, None)
+
+    # ---------- background refill ----------
+
+    def active_users(self):
+        cutoff = time.monotonic() - self.active_window
+        with self._lock:
+            while self._active and next(iter(self._active.values())) < cutoff:
+                self._active.popitem(last=False)
+            return list(self._active)
+
+    def refill(self):
+        """Build queues for active users that have none; returns how many were built."""
+        built = 0
+        for user_id in self.active_users():
+            if self._stop.is_set():
+                break
+            if user_id in self.queues:
+                continue
+            try:
+                user = self.load_user(user_id)
+                if user:
+                    self._build(user)
+                    built += 1
+            except Exception as e:
+                print(f"[WARN] Feed queue refill failed for {user_id}:", e)
+        return built
+
+    def run(self, interval=FEED_REFRESH_INTERVAL):
+        """Worker loop; call from a daemon thread."""
+        while not self._stop.wait(interval):
+            self.refill()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        stats = self.queues.stats()
+        stats["active_users"] = len(self._active)
+        return stats
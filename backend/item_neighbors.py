@@ -0,0 +1,179 @@
+"""
+File: item_neighbors.py
+Purpose: Nightly batch job that turns users_public.liked_recipes into
+         item-item collaborative-filtering neighbors ("people who liked this
+         also liked") and stores the top N per recipe in recipe_neighbors.
+Authors: Kadee Wheeler
+
+Usage:
+    python item_neighbors.py                      # rebuild recipe_neighbors
+    python item_neighbors.py --dry-run            # compute only, no writes
+    python item_neighbors.py --workers 8 --top-n 50
+
+How it works:
+    Users are streamed a page at a time and grouped into chunks. Each chunk
+    becomes a sparse binary user × recipe matrix X, and a worker process
+    returns its co-like counts Xᵀ·X. The parent sums the partial matrices
+    (at most 2 × workers chunks in flight, so memory stays bounded by the
+    co-occurrence matrix itself), turns counts into cosine scores
+    C_ij / sqrt(C_ii · C_jj), and keeps the top N per recipe.
+
+    Pairs liked together by fewer than --min-co-likes users are dropped as
+    noise. The backend reads the table back (recipe_neighbors.py) and boosts
+    feed candidates co-liked with a user's recent likes. Requires numpy and scipy; apply migrations/002_recipe_neighbors.sql
+    first.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from dotenv import load_dotenv
+from scipy import sparse
+from supabase import create_client
+
+from rebuild_affinity import fetch_pages
+from recipe_utility import RecipeUtility
+
+load_dotenv()
+
+TOP_N = 50
+MIN_CO_LIKES = 2
+USERS_PER_CHUNK = 50_000
+WRITE_BATCH = 500
+
+
+def co_likes(n_items, rows, cols):
+    """Xᵀ·X for one chunk of users, given the (user, item) coordinates of X."""
+    n_users = int(rows.max()) + 1 if len(rows) else 0
+    x = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n_users, n_items)
+    )
+    return (x.T @ x).tocsr()
+
+
+def _liked_ids(user, util):
+    ids = set()
+    for value in util._as_list(user.get("liked_recipes")):
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def user_chunks(users, column_of, chunk_size=USERS_PER_CHUNK):
+    """Yield (rows, cols) coordinate arrays for chunks of `chunk_size` users."""
+    util = RecipeUtility()
+    rows, cols = [], []
+    user_row = 0
+    for user in users:
+        liked = [column_of[rid] for rid in _liked_ids(user, util) if rid in column_of]
+        if len(liked) < 2:
+            continue  # a single like contributes no pairs
+        rows.extend([user_row] * len(liked))
+        cols.extend(liked)
+        user_row += 1
+        if user_row == chunk_size:
+            yield np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32)
+            rows, cols, user_row = [], [], 0
+    if rows:
+        yield np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32)
+
+
+def count_co_likes(chunks, n_items, workers=os.cpu_count()):
+    """Sum co_likes over every chunk, fanned out over a process pool."""
+    total = sparse.csr_matrix((n_items, n_items), dtype=np.float32)
+    if not workers or workers <= 1:
+        for rows, cols in chunks:
+            total = total + co_likes(n_items, rows, cols)
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for rows, cols in chunks:
+            pending.append(pool.submit(co_likes, n_items, rows, cols))
+            if len(pending) >= 2 * workers:
+                total = total + pending.pop(0).result()
+        for future in pending:
+            total = total + future.result()
+    return total
+
+
+def top_neighbors(counts, recipe_ids, top_n=TOP_N, min_co_likes=MIN_CO_LIKES):
+    """
+    Cosine-normalize co-like counts and keep the best `top_n` per recipe.
+
+    Returns:
+        dict[int, list[dict]]: recipeid → [{"recipeid", "score"}, ...] best first.
+    """
+    counts = counts.tocsr()
+    likes = counts.diagonal()
+    counts.setdiag(0)
+    counts.data[counts.data < min_co_likes] = 0
+    counts.eliminate_zeros()
+
+    inv = np.zeros_like(likes, dtype=np.float64)
+    np.divide(1.0, np.sqrt(likes), out=inv, where=likes > 0)
+    scores = (sparse.diags(inv) @ counts @ sparse.diags(inv)).tocsr()
+
+    neighbors = {}
+    for i in range(scores.shape[0]):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        if start == end:
+            continue
+        data, cols = scores.data[start:end], scores.indices[start:end]
+        if len(data) > top_n:
+            keep = np.argpartition(-data, top_n)[:top_n]
+            data, cols = data[keep], cols[keep]
+        order = np.lexsort((cols, -data))
+        neighbors[recipe_ids[i]] = [
+            {"recipeid": int(recipe_ids[cols[j]]), "score": round(float(data[j]), 4)}
+            for j in order
+        ]
+    return neighbors
+
+
+def rebuild(supabase, top_n=TOP_N, min_co_likes=MIN_CO_LIKES, workers=os.cpu_count(),
+            chunk_size=USERS_PER_CHUNK, dry_run=False):
+    recipe_ids = [r["recipeid"] for r in fetch_pages(supabase, "recipes_public", "recipeid", "recipeid")]
+    column_of = {rid: i for i, rid in enumerate(recipe_ids)}
+    print(f"[NEIGHBORS] Loaded {len(recipe_ids)} recipes")
+
+    users = fetch_pages(supabase, "users_public", "id, liked_recipes", "id")
+    counts = count_co_likes(user_chunks(users, column_of, chunk_size), len(recipe_ids), workers)
+    neighbors = top_neighbors(counts, recipe_ids, top_n, min_co_likes)
+    print(f"[NEIGHBORS] Computed neighbors for {len(neighbors)} recipes")
+
+    if not dry_run:
+        rows = [{"recipeid": rid, "neighbors": items} for rid, items in neighbors.items()]
+        for start in range(0, len(rows), WRITE_BATCH):
+            supabase.table("recipe_neighbors").upsert(rows[start:start + WRITE_BATCH]).execute()
+        # Recipes that lost all neighbors keep no stale row
+        stale = [rid for rid in recipe_ids if rid not in neighbors]
+        for start in range(0, len(stale), WRITE_BATCH):
+            supabase.table("recipe_neighbors").delete().in_("recipeid", stale[start:start + WRITE_BATCH]).execute()
+        print(f"[NEIGHBORS] Wrote {len(rows)} rows")
+
+    return neighbors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild recipe_neighbors from co-likes")
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    parser.add_argument("--min-co-likes", type=int, default=MIN_CO_LIKES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=USERS_PER_CHUNK)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    rebuild(
+        client,
+        top_n=args.top_n,
+        min_co_likes=args.min_co_likes,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+    )
@@ -0,0 +1,107 @@
+"""
+===============================================================================
+ File: json_provider.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Flask JSON provider backed by orjson for the large recipe lists
+     returned by /recipes, /feed and /user/<id>/liked.
+
+     orjson is optional. When it is not installed, when JSON_PROVIDER=std
+     is set, or when a value is something orjson refuses (e.g. integers
+     wider than 64 bits), encoding falls back to Flask's default provider,
+     so responses stay identical in shape either way. Dates and datetimes
+     are handed to the provider's `default` rather than orjson's own
+     ISO-8601 encoder, so they keep Flask's HTTP-date format.
+
+     stream_rows() encodes a {"data": [...]} body in chunks so large lists
+     can be sent (and compressed) incrementally.
+
+     Installed in app.py with:  app.json = FastJSONProvider(app)
+===============================================================================
+"""
+
+import os
+from itertools import islice
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+USE_ORJSON = orjson is not None and os.getenv("JSON_PROVIDER", "orjson") != "std"
+
+# Rows encoded per chunk by stream_rows()
+STREAM_CHUNK_ROWS = int(os.getenv("JSON_STREAM_CHUNK_ROWS", "256"))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider with an orjson fast path.
+
+    Honors the usual provider attributes (`sort_keys`, `compact`,
+    `mimetype`, `default`) so it can be swapped in without changing routes.
+    """
+
+    def _orjson_options(self):
+        # Dates go through self.default (HTTP-date, as Flask writes them)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps_bytes(self, obj):
+        """Encode obj to UTF-8 JSON bytes, preferring orjson."""
+        if USE_ORJSON:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+            except TypeError:
+                pass
+        return super().dumps(obj).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not USE_ORJSON:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs or not USE_ORJSON:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed debug output keeps the stdlib path
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+
+        # Same argument rules as jsonify()
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+
+        return self._app.response_class(
+            self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype
+        )
+
+    def stream_rows(self, rows, key="data", chunk_rows=STREAM_CHUNK_ROWS):
+        """
+        Yield the JSON encoding of {key: rows} in chunks of `chunk_rows` rows.
+
+        The concatenated output is a valid JSON document equivalent to
+        dumps_bytes({key: rows}).
+        """
+        yield b'{' + self.dumps_bytes(key) + b':['
+        it = iter(rows)
+        first = True
+        while True:
+            chunk = list(islice(it, chunk_rows))
+            if not chunk:
+                break
+            body = b",".join(self.dumps_bytes(row) for row in chunk)
+            yield body if first else b"," + body
+            first = False
+        yield b']}\n'
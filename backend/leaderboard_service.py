@@ -8,42 +8,273 @@
  Description:
      Defines leaderboard logic for the Tastebuddin application.
      Provides:
-         - Daily leaderboard (last 24 hours)
-         - Weekly leaderboard (last 7 days)
+         - Daily leaderboard (likes received in the last 24 hours)
+         - Weekly leaderboard (likes received in the last 7 days)
          - Author leaderboard (ranked by total likes)
 
+     Daily/weekly boards come from the RollingLeaderboard's hourly like
+     buckets once loaded; until then they fall back to ranking recipes
+     created in the window by all-time likes.
+
+     Every board is precomputed to its top LEADERBOARD_SIZE entries and
+     rebuilt by refresh() (on a background thread, see services.py):
+     daily/weekly every LEADERBOARD_REFRESH_INTERVAL seconds, from the
+     in-memory like buckets and catalog, and the author board, the one
+     that reads the database, every AUTHOR_BOARD_REFRESH_INTERVAL seconds.
+     Requests page through the stored list with limit/offset, so no page,
+     however deep, queries the database. A board that has never been
+     built, or whose refresh has stalled for three intervals, is built on
+     the request path (one build per board at a time).
+
+     The author board is a single ordered, limited read of
+     users_public.total_likes (indexed, see migrations/006), one entry per
+     author id; authors without likes are not listed. Every
+     AUTHOR_RECONCILE_INTERVAL seconds refresh() also runs
+     reconcile_authors(), which compares those totals with the sum of each
+     author's recipe likes in the database and logs any drift. The run is
+     claimed through claim_job() first, so only one worker across the
+     deployment does it per interval.
+
      This service is consumed by app.py routes.
 
 
 ===============================================================================
 """
 # leaderboard_service.py
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 
+from resilience import DBCaller, error_status
+from singleflight import SingleFlight
+
+# Entries precomputed per board (deepest rank that can be paged to)
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "1000"))
+# Seconds between rebuilds of the precomputed boards
+LEADERBOARD_REFRESH_INTERVAL = float(os.getenv("LEADERBOARD_REFRESH_INTERVAL", "30"))
+# Seconds between rebuilds of the author board (a database read per worker)
+AUTHOR_BOARD_REFRESH_INTERVAL = float(os.getenv("AUTHOR_BOARD_REFRESH_INTERVAL", "300"))
+# Seconds between checks of total_likes against per-recipe sums (0 = never)
+AUTHOR_RECONCILE_INTERVAL = float(os.getenv("AUTHOR_RECONCILE_INTERVAL", "3600"))
+
+BOARDS = ("daily", "weekly", "authors")
+
 class LeaderboardService:
-    def __init__(self, supabase):
+    def __init__(self, supabase, db=None, rolling=None, catalog=None):
         self.supabase = supabase
+        self.db = db or DBCaller(supabase)
         self.table_name = "recipes_public"
+        self.rolling = rolling      # RollingLeaderboard | None
+        self.catalog = catalog      # RecipeCatalog | None, for recipe details
+        self.size = LEADERBOARD_SIZE
+        self.interval = LEADERBOARD_REFRESH_INTERVAL
+        self.author_interval = AUTHOR_BOARD_REFRESH_INTERVAL
+        self.boards = {}            # name → {"result", "entries", "generated_at"}
+        self._builds = SingleFlight()
+        self._stop = threading.Event()
+        self.reconcile_interval = AUTHOR_RECONCILE_INTERVAL
+        self.reconciled_at = None
+        self.reconcile_checked_at = None
+        self.drift = []             # authors whose total_likes ≠ recipe sum
+
+    def get_daily_leaderboard(self, limit=10, offset=0):
+        """Top recipes by likes in the last 24 hours."""
+        return self.page("daily", limit, offset)
+
+    def get_weekly_leaderboard(self, limit=10, offset=0):
+        """Top recipes by likes in the last 7 days."""
+        return self.page("weekly", limit, offset)
+
+    def get_author_leaderboard(self, limit=10, offset=0):
+        """Authors ranked by total likes."""
+        return self.page("authors", limit, offset)
+
+    # ---------- precomputed boards ----------
+
+    def _compute(self, name):
+        if name == "authors":
+            return self._author_leaderboard(self.size)
+        return self._get_leaderboard(days=1 if name == "daily" else 7, limit=self.size)
 
-    def get_daily_leaderboard(self, limit=10):
-        """Top recipes from the last 24 hours."""
-        return self._get_leaderboard(days=1, limit=limit)
+    def _interval(self, name):
+        return self.author_interval if name == "authors" else self.interval
 
-    def get_weekly_leaderboard(self, limit=10):
-        """Top recipes from the last 7 days."""
-        return self._get_leaderboard(days=7, limit=limit)
+    def _due(self, name):
+        board = self.boards.get(name)
+        return board is None or time.time() - board["generated_at"] >= self._interval(name)
+
+    def _build(self, name):
+        """Recompute one board; failures leave the previous one in place."""
+        result, status = self._compute(name)
+        if status == 200:
+            self.boards[name] = {
+                "result": result,
+                "entries": result.get("leaderboard", []),
+                "generated_at": time.time(),
+            }
+        return result, status
+
+    def refresh(self):
+        """Rebuild the boards that are due, and reconcile author totals when due."""
+        for name in BOARDS:
+            if not self._due(name):
+                continue
+            try:
+                _, status = self._builds.do(name, lambda: self._build(name))
+                if status != 200:
+                    print(f"[WARN] Leaderboard {name} not refreshed ({status})")
+            except Exception as e:
+                print(f"[WARN] Leaderboard {name} not refreshed:", e)
+
+        checked = self.reconcile_checked_at
+        due = checked is None or time.time() - checked >= self.reconcile_interval
+        if self.reconcile_interval and due:
+            self.reconcile_checked_at = time.time()
+            if not self._claim("reconcile_author_likes", self.reconcile_interval):
+                return  # another worker ran it within the interval
+            result, status = self.reconcile_authors()
+            if status != 200:
+                print("[WARN] Author likes not reconciled:", result.get("error"))
+            elif result["drift"]:
+                print(f"[WARN] {len(result['drift'])} author(s) with total_likes "
+                      f"differing from their recipes' likes")
+
+    def _claim(self, job, interval):
+        """Whether this worker runs `job` now (claim_job(), migrations/006)."""
+        try:
+            response = (
+                self.db.rpc("claim_job", {"p_job": job, "p_interval_seconds": interval})
+                .execute(observe=False)
+            )
+        except Exception as e:
+            print(f"[WARN] Could not claim {job}:", e)
+            return False
+        return bool(response.data)
+
+    def reconcile_authors(self, fix=False):
+        """
+        Compare users_public.total_likes with the sum of each author's
+        recipe likes (reconcile_author_likes(), migrations/006).
+
+        Args:
+            fix (bool): Also set the differing totals to the recipe sums.
+
+        Returns:
+            tuple(dict, int): {"drift": [{"id", "username", "total_likes",
+            "recipe_likes"}, ...]} + HTTP status.
+        """
+        try:
+            response = (
+                self.db.rpc("reconcile_author_likes", {"p_fix": fix})
+                .execute(observe=False)
+            )
+        except Exception as e:
+            return {"error": str(e)}, error_status(e)
+        self.drift = response.data or []
+        self.reconciled_at = time.time()
+        return {"drift": self.drift}, 200
+
+    def page(self, name, limit=10, offset=0):
+        """
+        Entries offset … offset+limit of a precomputed board.
+
+        Returns:
+            tuple(dict, int): {"leaderboard": [...], "offset", "limit",
+            "total", "generated_at"} (ranks are absolute), or the board's
+            "message" when it is empty, + HTTP status.
+        """
+        board = self.boards.get(name)
+        if board is None or time.time() - board["generated_at"] > 3 * self._interval(name):
+            result, status = self._builds.do(name, lambda: self._build(name))
+            board = self.boards.get(name)
+            if board is None:
+                return result, status
+
+        if not board["entries"]:
+            return board["result"], 200
+        return {
+            "leaderboard": board["entries"][offset:offset + limit],
+            "offset": offset,
+            "limit": limit,
+            "total": len(board["entries"]),
+            "generated_at": board["generated_at"],
+        }, 200
+
+    def run(self):
+        """Refresh loop; call from a daemon thread."""
+        while True:
+            self.refresh()
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        stats = {
+            name: {"size": len(b["entries"]), "generated_at": b["generated_at"]}
+            for name, b in self.boards.items()
+        }
+        stats["author_drift"] = len(self.drift)
+        stats["reconciled_at"] = self.reconciled_at
+        return stats
+
+    # ---------- board builders ----------
+
+    def _recipe_rows(self, recipe_ids):
+        """recipeid → row, from the catalog when loaded, else one DB query."""
+        if self.catalog is not None and self.catalog.ready:
+            rows = (self.catalog.get(rid) for rid in recipe_ids)
+            return {r["recipeid"]: r for r in rows if r is not None}
+        response = (
+            self.db.table(self.table_name)
+            .select("recipeid, title, authorname, likes, datecreated")
+            .in_("recipeid", list(recipe_ids))
+            .execute(shared=True, observe=False)
+        )
+        return {r["recipeid"]: r for r in response.data or []}
+
+    def _rolling_leaderboard(self, window, days, limit):
+        """Top recipes by likes received in the window (O(limit) ranking)."""
+        ranked = self.rolling.top(window, limit)
+        if not ranked:
+            return {"message": f"No recipes liked in the last {days} day(s)"}, 200
+
+        rows = self._recipe_rows([rid for rid, _ in ranked])
+        leaderboard = []
+        for rid, likes in ranked:
+            r = rows.get(rid)
+            if r is None:       # deleted since it was liked
+                continue
+            leaderboard.append({
+                "rank": len(leaderboard) + 1,
+                "recipeid": rid,
+                "author": r.get("authorname"),
+                "title": r.get("title"),
+                "likes": likes,
+                "total_likes": r.get("likes", 0),
+                "datecreated": r.get("datecreated"),
+            })
+        return {"leaderboard": leaderboard}, 200
 
     def _get_leaderboard(self, days, limit=10):
         """Generic helper for daily/weekly leaderboards."""
         try:
-            since = datetime.utcnow() - timedelta(days=days)
+            if self.rolling is not None and self.rolling.ready:
+                window = "daily" if days == 1 else "weekly"
+                return self._rolling_leaderboard(window, days, limit)
+
+            # Whole minutes, so concurrent requests build the same query
+            # and share one call (see DBCaller shared=True)
+            since = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(days=days)
             response = (
-                self.supabase.table(self.table_name)
+                self.db.table(self.table_name)
                 .select("recipeid, title, authorname, likes, datecreated")
                 .gte("datecreated", since.isoformat())
                 .order("likes", desc=True)
                 .limit(limit)
-                .execute()
+                .execute(shared=True, observe=False)
             )
 
             if not response.data:
@@ -63,33 +294,33 @@ class LeaderboardService:
             return {"leaderboard": leaderboard}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
-    def get_author_leaderboard(self, limit=10):
-        """Ranks authors by total likes across all their recipes."""
+    def _author_leaderboard(self, limit=10):
+        """Ranks authors by users_public.total_likes (top `limit`, one indexed read)."""
         try:
-            # Step 1: fetch all recipes
             response = (
-                self.supabase.table(self.table_name)
-                .select("authorname, likes")
-                .execute()
+                self.db.table("users_public")
+                .select("id, username, total_likes")
+                .gt("total_likes", 0)
+                .order("total_likes", desc=True)
+                .order("id")
+                .limit(limit)
+                .execute(shared=True, observe=False)
             )
             if not response.data:
                 return {"message": "No author data found"}, 200
 
-            # Step 2: aggregate total likes per author
-            totals = {}
-            for row in response.data:
-                author = row.get("authorname", "Unknown")
-                totals[author] = totals.get(author, 0) + (row.get("likes", 0) or 0)
-
-            # Step 3: rank by total likes
-            ranked = sorted(totals.items(), key=lambda x: x[1], reverse=True)[:limit]
             leaderboard = [
-                {"rank": idx + 1, "author": author, "total_likes": likes}
-                for idx, (author, likes) in enumerate(ranked)
+                {
+                    "rank": idx + 1,
+                    "authorid": r["id"],
+                    "author": r.get("username"),
+                    "total_likes": r.get("total_likes", 0),
+                }
+                for idx, r in enumerate(response.data)
             ]
             return {"leaderboard": leaderboard}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
\ No newline at end of file
+            return {"error": str(e)}, error_status(e)
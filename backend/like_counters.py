@@ -0,0 +1,87 @@
+"""
+===============================================================================
+ File: like_counters.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Sharded like counters for recipes and authors
+     (see migrations/004_like_counter_shards.sql).
+
+     A like used to read recipes_public.likes / users_public.total_likes
+     and write back the incremented value, so every like of a viral
+     recipe queued on the same row (and concurrent likes could be lost).
+     Now each like adds ±1 to one of LIKE_COUNTER_SHARDS slots picked at
+     random, with one atomic upsert (increment_like_shard); contention is
+     spread over the slots and nothing is read first.
+
+     Readers keep using the existing `likes` and `total_likes` columns:
+     a background fold (fold_like_shards, every LIKE_FOLD_INTERVAL
+     seconds) sums the slots into them, so they lag new likes by at most
+     one interval.
+
+ Configuration (environment):
+     LIKE_COUNTER_SHARDS   Slots per recipe / author                [16]
+     LIKE_FOLD_INTERVAL    Seconds between folds into the columns   [5]
+===============================================================================
+"""
+
+import os
+import random
+import threading
+
+
+LIKE_COUNTER_SHARDS = int(os.getenv("LIKE_COUNTER_SHARDS", "16"))
+LIKE_FOLD_INTERVAL = float(os.getenv("LIKE_FOLD_INTERVAL", "5"))
+
+
+class LikeCounters:
+    """
+    Increment and fold sharded like counters.
+
+    Args:
+        db (DBCaller): Supabase wrapper used for the RPCs.
+        shards (int): Slots per counter.
+        on_fold (callable | None): Called with the fold's
+            [{"kind", "key", "delta"}] rows after each non-empty fold.
+    """
+
+    def __init__(self, db, shards=LIKE_COUNTER_SHARDS, interval=LIKE_FOLD_INTERVAL,
+                 on_fold=None, rand=random.randrange):
+        self.db = db
+        self.shards = max(1, shards)
+        self.interval = interval
+        self.on_fold = on_fold
+        self.rand = rand
+        self.folded = 0
+        self._stop = threading.Event()
+
+    def increment(self, kind, key, delta=1):
+        """Add `delta` to one randomly chosen slot of the (kind, key) counter."""
+        self.db.rpc("increment_like_shard", {
+            "p_kind": kind, "p_key": str(key),
+            "p_shard": self.rand(self.shards), "p_delta": delta,
+        }).execute()
+
+    def fold(self):
+        """Sum every slot into likes / total_likes; returns counters changed."""
+        rows = self.db.rpc("fold_like_shards", {}).execute(observe=False).data or []
+        if rows:
+            self.folded += len(rows)
+            if self.on_fold is not None:
+                self.on_fold(rows)
+        return len(rows)
+
+    def run(self):
+        """Fold loop; call from a daemon thread."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.fold()
+            except Exception as e:
+                print("[WARN] Like counter fold failed:", e)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"shards": self.shards, "interval": self.interval, "folded": self.folded}
@@ -0,0 +1,334 @@
+"""
+File: loadtest.py
+Purpose: Load generator replaying scripted swipe sessions against the
+         backend, reporting throughput and latency percentiles per route.
+Authors: Kadee Wheeler
+
+Usage:
+    python loadtest.py --local                       # app + in-memory DB
+    python loadtest.py --local --users 200 --rate 20 --db-latency-ms 15
+    python loadtest.py --url http://localhost:5000 --users 50 --rate 5
+
+Each simulated user arrives (Poisson arrivals at --rate users/second)
+and runs one session:
+    1. POST /user/create (skipped with --user-ids: reuse existing users)
+    2. GET /feed/<id>, then swipe through it: POST /user/like or
+       /user/dislike after a human-ish think time, fetching the next page
+       when the current one runs out
+    3. now and then GET /leaderboard/daily|weekly|authors
+    4. sometimes POST /recipes
+
+--local runs the Flask app in this process on an ephemeral port with a
+MemorySupabase stand-in seeded with --recipes synthetic recipes, so no
+database is needed; --db-latency-ms adds a fixed delay to every query to
+stand in for the network round trip. --url targets a live instance (its
+database must accept the new user ids, or pass --user-ids).
+
+Requests answered 429/503 by admission control are counted as "limited",
+not as errors. Report columns: requests, errors (5xx other than 503 and
+connection failures), limited, requests/second over the run, and
+p50/p95/p99 latency in ms.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import string
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode, urlsplit
+
+from memory_supabase import MemorySupabase
+
+
+CATEGORIES = ["breakfast", "lunch", "dinner", "dessert", "snack"]
+INGREDIENTS = [
+    "eggs", "flour", "butter", "milk", "rice", "chicken", "beef", "tofu", "spinach",
+    "onion", "garlic", "tomato", "cheese", "pasta", "beans", "lemon", "basil",
+    "peanuts", "shrimp", "mushroom", "potato", "carrot", "honey", "oats",
+]
+ALLERGENS = ["dairy", "gluten", "nuts", "shellfish", "eggs", "soy"]
+
+
+# =============================================================================
+# IN-MEMORY DATABASE
+# =============================================================================
+
+def seed(db, recipes, authors, rng):
+    """Fill `db` with `authors` users and `recipes` synthetic recipes."""
+    now = datetime.now(timezone.utc)
+    users = db.tables["users_public"]
+    for i in range(authors):
+        users.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))), "username": f"author_{i}",
+            "allergens": [], "liked_recipes": [], "disliked_recipes": [],
+            "unseen_recipes": [], "total_likes": 0, "affinity": {},
+        })
+    for i in range(recipes):
+        author = rng.choice(users)
+        db.tables["recipes_public"].append({
+            "recipeid": db.next_id(),
+            "title": f"{rng.choice(INGREDIENTS).title()} {rng.choice(CATEGORIES)} #{i}",
+            "description": "Synthetic load-test recipe",
+            "category": rng.choice(CATEGORIES),
+            "ingredients": rng.sample(INGREDIENTS, 5),
+            "directions": ["Mix", "Cook", "Serve"],
+            "dietaryrestrictions": rng.sample(ALLERGENS, rng.randint(0, 2)),
+            "minutestocomplete": rng.randint(5, 90),
+            "authorid": author["id"], "authorname": author["username"],
+            "likes": rng.randint(0, 200),
+            "datecreated": (now - timedelta(hours=rng.uniform(0, 24 * 14))).isoformat(),
+        })
+        author["total_likes"] += db.tables["recipes_public"][-1]["likes"]
+    every_id = [r["recipeid"] for r in db.tables["recipes_public"]]
+    for user in users:
+        user["unseen_recipes"] = list(every_id)
+
+
+def start_local(args, rng):
+    """Run the app on an ephemeral port against a seeded MemorySupabase."""
+    from werkzeug.serving import make_server
+    import app as backend
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)    # no per-request lines
+    from services import Services
+
+    db = MemorySupabase(latency=args.db_latency_ms / 1000)
+    seed(db, args.recipes, args.authors, rng)
+    services = Services(supabase=db)
+    services.users.load_usernames()
+    services.catalog.load()
+    threading.Thread(target=services.like_counters.run, daemon=True).start()
+    threading.Thread(target=services.rolling_leaderboard.run, daemon=True).start()
+    flask_app = backend.create_app(services, warm=False)
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server, db
+
+
+# =============================================================================
+# SESSIONS & MEASUREMENT
+# =============================================================================
+
+class Client:
+    """Keep-alive HTTP connection for one simulated user."""
+
+    def __init__(self, base):
+        parts = urlsplit(base)
+        self.prefix = parts.path.rstrip("/")
+        connection = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = connection(parts.netloc, timeout=30)
+
+    def request(self, method, path, json_body=None, form=None, params=None):
+        """Returns (status, parsed JSON body or None)."""
+        url = self.prefix + path + ("?" + urlencode(params) if params else "")
+        headers, body = {}, None
+        if json_body is not None:
+            headers["Content-Type"], body = "application/json", json.dumps(json_body)
+        elif form is not None:
+            headers["Content-Type"], body = "application/x-www-form-urlencoded", urlencode(form)
+        try:
+            self.conn.request(method, url, body=body, headers=headers)
+            response = self.conn.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()           # reconnects on the next request
+            return 599, None
+        try:
+            return response.status, json.loads(payload) if payload else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        self.conn.close()
+
+
+class Recorder:
+    """Latency samples and outcome counts per route."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.limited = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def call(self, client, route, method, path, **kwargs):
+        """Time one request; returns its JSON body on success, else None."""
+        started = time.perf_counter()
+        status, body = client.request(method, path, **kwargs)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.samples[route].append(elapsed)
+            if status in (429, 503):
+                self.limited[route] += 1
+            elif status >= 500:
+                self.errors[route] += 1
+        return body if status < 400 else None
+
+
+def _think(rng, mean):
+    if mean > 0:
+        time.sleep(rng.expovariate(1 / mean))
+
+
+def session(base, user_id, args, recorder, rng):
+    """One user's visit."""
+    client = Client(base)
+    try:
+        _session(client, user_id, args, recorder, rng)
+    finally:
+        client.close()
+
+
+def _session(client, user_id, args, recorder, rng):
+    if not args.user_ids:
+        username = "lt_" + "".join(rng.choices(string.ascii_lowercase + string.digits, k=10))
+        allergens = rng.sample(ALLERGENS, rng.choice([0, 0, 1]))
+        created = recorder.call(client, "POST /user/create", "POST", "/user/create", json_body={
+            "user_id": user_id, "username": username, "allergens": allergens,
+        })
+        if created is None:
+            return
+
+    swipes, queue = 0, []
+    while swipes < args.swipes:
+        if not queue:
+            page = recorder.call(client, "GET /feed", "GET", f"/feed/{user_id}",
+                                 params={"limit": args.page})
+            queue = list((page or {}).get("data") or [])
+            if not queue:
+                break
+        recipe = queue.pop(0)
+        _think(rng, args.think)
+        if rng.random() < args.like_ratio:
+            recorder.call(client, "POST /user/like", "POST", "/user/like", json_body={
+                "user_id": user_id, "recipeid": recipe["recipeid"], "author_id": recipe.get("authorid"),
+            })
+        else:
+            recorder.call(client, "POST /user/dislike", "POST", "/user/dislike", json_body={
+                "user_id": user_id, "recipe_id": recipe["recipeid"],
+            })
+        swipes += 1
+
+        if rng.random() < args.leaderboard_ratio:
+            board = rng.choice(["daily", "weekly", "authors"])
+            recorder.call(client, f"GET /leaderboard/{board}", "GET", f"/leaderboard/{board}")
+
+    if rng.random() < args.post_ratio:
+        _think(rng, args.think * 5)
+        recorder.call(client, "POST /recipes", "POST", "/recipes", form={
+            "title": "Load test special",
+            "description": "Posted by the load generator",
+            "category": rng.choice(CATEGORIES),
+            "ingredients": json.dumps(rng.sample(INGREDIENTS, 4)),
+            "directions": json.dumps(["Mix", "Serve"]),
+            "dietaryrestrictions": json.dumps(rng.sample(ALLERGENS, 1)),
+            "authorid": user_id,
+        })
+
+
+def run(base, args, recorder, rng):
+    """Start sessions at Poisson arrivals; wait for them (or --duration)."""
+    ids = _read_ids(args.user_ids) if args.user_ids else None
+    threads = []
+    started = time.perf_counter()
+    for i in range(args.users):
+        if args.duration and time.perf_counter() - started > args.duration:
+            break
+        user_id = ids[i % len(ids)] if ids else str(uuid.uuid4())
+        worker_rng = random.Random(rng.random())
+        thread = threading.Thread(target=session, args=(base, user_id, args, recorder, worker_rng),
+                                  daemon=True)
+        thread.start()
+        threads.append(thread)
+        if args.rate > 0:
+            time.sleep(rng.expovariate(args.rate))
+
+    for thread in threads:
+        remaining = None
+        if args.duration:
+            remaining = max(0.0, args.duration - (time.perf_counter() - started))
+        thread.join(remaining)
+    return time.perf_counter() - started
+
+
+def _read_ids(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def report(recorder, elapsed):
+    with recorder.lock:
+        routes = {route: sorted(values) for route, values in recorder.samples.items()}
+        errors, limited = dict(recorder.errors), dict(recorder.limited)
+    routes["ALL"] = sorted(v for values in routes.values() for v in values)
+    errors["ALL"], limited["ALL"] = sum(errors.values()), sum(limited.values())
+
+    print(f"\n{elapsed:.1f}s wall clock")
+    print(f"{'route':<26} {'reqs':>7} {'errors':>7} {'limited':>8} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route in sorted(routes, key=lambda r: (r == "ALL", r)):
+        values = routes[route]
+        print(f"{route:<26} {len(values):>7} {errors.get(route, 0):>7} {limited.get(route, 0):>8} "
+              f"{len(values) / elapsed:>8.1f} "
+              + " ".join(f"{percentile(values, q) * 1000:>8.1f}" for q in (50, 95, 99)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1].split(": ", 1)[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running backend")
+    target.add_argument("--local", action="store_true", help="Run the app here on an in-memory DB")
+    parser.add_argument("--users", type=int, default=50, help="Sessions to run")
+    parser.add_argument("--rate", type=float, default=5.0, help="New users per second")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds")
+    parser.add_argument("--swipes", type=int, default=20, help="Swipes per session")
+    parser.add_argument("--page", type=int, default=10, help="Feed page size")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean seconds between swipes")
+    parser.add_argument("--like-ratio", type=float, default=0.35)
+    parser.add_argument("--leaderboard-ratio", type=float, default=0.05, help="Per swipe")
+    parser.add_argument("--post-ratio", type=float, default=0.05, help="Per session")
+    parser.add_argument("--user-ids", help="File of existing user ids (skips sign-up)")
+    parser.add_argument("--recipes", type=int, default=500, help="--local: recipes to seed")
+    parser.add_argument("--authors", type=int, default=50, help="--local: authors to seed")
+    parser.add_argument("--db-latency-ms", type=float, default=0, help="--local: delay per query")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = db = None
+    if args.local:
+        os.environ.setdefault("WARM_ON_START", "0")
+        base, server, db = start_local(args, rng)
+        print(f"Local app at {base}: {args.recipes} recipes, {args.authors} authors, "
+              f"{args.db_latency_ms:g} ms per query")
+    else:
+        base = args.url.rstrip("/")
+
+    print(f"{args.users} users arriving at {args.rate:g}/s, {args.swipes} swipes each, "
+          f"{args.think:g}s mean think time")
+    recorder = Recorder()
+    elapsed = run(base, args, recorder, rng)
+    report(recorder, elapsed)
+    if db is not None:
+        print(f"\n{db.queries} database queries")
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
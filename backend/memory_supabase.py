@@ -0,0 +1,333 @@
+"""
+===============================================================================
+ File: memory_supabase.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     In-memory stand-in for the Supabase client, used by the load
+     generator (loadtest.py --local) and by the unit tests that need a
+     database which keeps state between queries.
+
+     Covers the query builder calls the backend makes (select / insert /
+     update / upsert / delete with the eq / gt / gte / in_ filters, order,
+     range, limit, single) and emulates the Postgres functions of the
+     migrations called through rpc() (like counter shards, author
+     reconcile, claim_job, swipe_recipe).
+===============================================================================
+"""
+
+import copy
+import itertools
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+class MemorySupabase:
+    """
+    Thread-safe in-memory stand-in for the parts of the Supabase client the
+    backend uses: table(name) with select / insert / update / upsert /
+    delete, the eq / gt / gte / in_ filters, order, range, limit, single;
+    and rpc() for the like counter functions of the migrations.
+
+    Args:
+        latency (float): Seconds slept per executed query.
+    """
+
+    PRIMARY_KEYS = {"recipes_public": "recipeid", "recipe_neighbors": "recipeid"}
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = defaultdict(list)
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.queries = 0
+
+    def table(self, name):
+        return _MemoryQuery(self, name)
+
+    def rpc(self, name, params):
+        return _MemoryRPC(self, name, params)
+
+    def next_id(self):
+        return next(self._ids)
+
+    def key_of(self, table, row):
+        return row.get(self.PRIMARY_KEYS.get(table, "id"))
+
+
+class _MemoryQuery:
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.columns = "*"
+        self.payload = None
+        self.filters = []
+        self.ordering = []
+        self.window = None
+        self.one = False
+
+    # ---------- builder ----------
+
+    def select(self, columns="*", **_):
+        self.op, self.columns = "select", columns
+        return self
+
+    def insert(self, payload, **_):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def update(self, payload, **_):
+        self.op, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, **_):
+        self.op, self.payload = "upsert", payload
+        return self
+
+    def delete(self, **_):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and r.get(column) > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and r.get(column) >= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda r: r.get(column) in values)
+        return self
+
+    def order(self, column, desc=False, **_):
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def single(self):
+        self.one = True
+        return self
+
+    # ---------- execution ----------
+
+    def _matches(self, row):
+        return all(f(row) for f in self.filters)
+
+    def _project(self, row):
+        if self.columns.strip() == "*":
+            return copy.deepcopy(row)
+        return {c.strip(): copy.deepcopy(row.get(c.strip())) for c in self.columns.split(",")}
+
+    def _select(self, rows):
+        rows = [r for r in rows if self._matches(r)]
+        for column, desc in reversed(self.ordering):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if self.window:
+            rows = rows[self.window[0]:self.window[1]]
+        return [self._project(r) for r in rows]
+
+    def _write(self, rows):
+        now = datetime.now(timezone.utc).isoformat()
+        if self.op == "delete":
+            kept, gone = [], []
+            for r in rows:
+                (gone if self._matches(r) else kept).append(r)
+            rows[:] = kept
+            return gone
+        if self.op == "update":
+            changed = []
+            for r in rows:
+                if self._matches(r):
+                    r.update(copy.deepcopy(self.payload))
+                    r["updated_at"] = now
+                    changed.append(r)
+            return copy.deepcopy(changed)
+
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        written = []
+        for item in payload:
+            row = copy.deepcopy(item)
+            if self.table == "recipes_public":
+                row.setdefault("recipeid", self.db.next_id())
+                row.setdefault("likes", 0)
+            row["updated_at"] = now
+            key = self.db.key_of(self.table, row)
+            existing = next((r for r in rows if self.db.key_of(self.table, r) == key), None)
+            if existing is not None:
+                if self.op == "insert":
+                    raise RuntimeError(f'duplicate key value violates unique constraint "{self.table}_pkey"')
+                existing.update(row)
+                row = existing
+            else:
+                rows.append(row)
+            written.append(copy.deepcopy(row))
+        return written
+
+    def execute(self):
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        with self.db.lock:
+            self.db.queries += 1
+            rows = self.db.tables[self.table]
+            data = self._select(rows) if self.op == "select" else self._write(rows)
+        if self.one:
+            data = data[0] if data else None
+        return SimpleNamespace(data=data, count=None)
+
+
+class _MemoryRPC:
+    """
+    increment_like_shard / fold_like_shards / reconcile_author_likes /
+    claim_job / swipe_recipe (migrations/004-007).
+    """
+
+    def __init__(self, db, name, params):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def _increment(self, shards):
+        p = self.params
+        key = (p["p_kind"], p["p_key"], p["p_shard"])
+        row = next((r for r in shards if (r["kind"], r["key"], r["shard"]) == key), None)
+        if row is None:
+            shards.append({"kind": key[0], "key": key[1], "shard": key[2], "count": p["p_delta"]})
+        else:
+            row["count"] += p["p_delta"]
+        return None
+
+    def _fold(self, shards):
+        totals = defaultdict(int)
+        for r in shards:
+            totals[(r["kind"], r["key"])] += r["count"]
+        shards.clear()
+        tables = {"recipe": ("recipes_public", "recipeid", "likes"),
+                  "author": ("users_public", "id", "total_likes")}
+        now = datetime.now(timezone.utc).isoformat()
+        for (kind, key), delta in totals.items():
+            table, key_column, column = tables[kind]
+            for row in self.db.tables[table]:
+                if str(row.get(key_column)) == key:
+                    row[column] = max(0, (row.get(column) or 0) + delta)
+                    row["updated_at"] = now
+        hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0).isoformat()
+        buckets = self.db.tables["recipe_like_hours"]
+        for (kind, key), delta in totals.items():
+            if kind != "recipe" or not delta:
+                continue
+            row = next((r for r in buckets if r["hour"] == hour and r["recipeid"] == int(key)), None)
+            if row is None:
+                buckets.append({"hour": hour, "recipeid": int(key), "likes": max(0, delta)})
+            else:
+                row["likes"] = max(0, row["likes"] + delta)
+        return [{"kind": k, "key": key, "delta": d} for (k, key), d in totals.items() if d]
+
+    def _reconcile(self):
+        sums = defaultdict(int)
+        for r in self.db.tables["recipes_public"]:
+            sums[r.get("authorid")] += r.get("likes") or 0
+        drift = []
+        for u in self.db.tables["users_public"]:
+            stored, summed = u.get("total_likes") or 0, sums.get(u["id"], 0)
+            if stored != summed:
+                drift.append({"id": u["id"], "username": u.get("username"),
+                              "total_likes": stored, "recipe_likes": summed})
+                if self.params.get("p_fix"):
+                    u["total_likes"] = summed
+        return drift
+
+    def _claim(self):
+        jobs = self.db.tables["scheduled_jobs"]
+        now = time.time()
+        row = next((r for r in jobs if r["job"] == self.params["p_job"]), None)
+        if row is None:
+            jobs.append({"job": self.params["p_job"], "ran_at": now})
+            return True
+        if now - row["ran_at"] < self.params["p_interval_seconds"]:
+            return False
+        row["ran_at"] = now
+        return True
+
+    @staticmethod
+    def _shift(weights, keys, delta):
+        weights = dict(weights or {})
+        for key in keys:
+            value = weights.get(key, 0.0) + delta
+            if abs(value) < 1e-9:
+                weights.pop(key, None)
+            else:
+                weights[key] = round(value, 6)
+        return weights
+
+    def _swipe(self):
+        p = self.params
+        user = next((u for u in self.db.tables["users_public"] if str(u["id"]) == p["p_user_id"]), None)
+        if user is None:
+            return []
+        rid, action = p["p_recipe_id"], p["p_action"]
+        lists = {k: list(user.get(k) or []) for k in ("liked_recipes", "disliked_recipes", "unseen_recipes")}
+        if action in ("like", "dislike"):
+            column = "liked_recipes" if action == "like" else "disliked_recipes"
+            hit = rid not in lists[column]
+            if hit:
+                lists[column].append(rid)
+            lists["unseen_recipes"] = [r for r in lists["unseen_recipes"] if r != rid]
+        elif action == "unlike":
+            hit = rid in lists["liked_recipes"]
+            lists["liked_recipes"] = [r for r in lists["liked_recipes"] if r != rid]
+        elif action == "unseen":
+            hit = rid not in lists["unseen_recipes"]
+            if hit:
+                lists["unseen_recipes"].append(rid)
+        else:
+            raise RuntimeError(f"unknown swipe action {action}")
+        user.update(lists)
+
+        weight = p.get("p_weight") or 0
+        if hit and weight:
+            vector = user.get("affinity") or {}
+            category = [p["p_category"]] if p.get("p_category") else []
+            user["affinity"] = {
+                "category": self._shift(vector.get("category"), category, weight),
+                "ingredient": self._shift(vector.get("ingredient"), p.get("p_ingredients") or [], weight),
+            }
+        return [{"profile": copy.deepcopy(user), "applied": hit}]
+
+    def execute(self):
+        if self.db.latency:
+            time.sleep(self.db.latency)
+        with self.db.lock:
+            self.db.queries += 1
+            shards = self.db.tables["like_counter_shards"]
+            if self.name == "increment_like_shard":
+                data = self._increment(shards)
+            elif self.name == "fold_like_shards":
+                data = self._fold(shards)
+            elif self.name == "reconcile_author_likes":
+                data = self._reconcile()
+            elif self.name == "claim_job":
+                data = self._claim()
+            elif self.name == "swipe_recipe":
+                data = self._swipe()
+            else:
+                raise RuntimeError(f"unknown function {self.name}")
+        return SimpleNamespace(data=data, count=None)
@@ -0,0 +1,10 @@
+-- =============================================================================
+-- 001_user_affinity.sql
+-- Per-user taste vector maintained by UserService on every like/dislike/unlike
+-- (see affinity.py). Shape:
+--   {"category": {"dinner": 3.0}, "ingredient": {"garlic": 2.0}}
+-- Backfill/rebuild existing users with:  python rebuild_affinity.py
+-- =============================================================================
+
+alter table users_public
+    add column if not exists affinity jsonb not null default '{}'::jsonb;
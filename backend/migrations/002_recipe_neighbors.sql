@@ -0,0 +1,13 @@
+-- =============================================================================
+-- 002_recipe_neighbors.sql
+-- Item-item collaborative-filtering neighbors ("liked together") per recipe,
+-- written nightly by item_neighbors.py. Shape of neighbors:
+--   [{"recipeid": 42, "score": 0.31}, ...]   best first
+-- Populate with:  python item_neighbors.py
+-- =============================================================================
+
+create table if not exists recipe_neighbors (
+    recipeid   bigint primary key references recipes_public (recipeid) on delete cascade,
+    neighbors  jsonb not null default '[]'::jsonb,
+    updated_at timestamptz not null default now()
+);
@@ -0,0 +1,50 @@
+-- =============================================================================
+-- 003_recipe_sync.sql
+-- Change tracking for recipes_public so backends can delta-sync their
+-- in-memory catalog (see recipe_sync.py) instead of re-reading the table:
+--   * updated_at    set on insert and bumped on every update
+--   * recipe_tombstones   one row per deleted recipe
+-- Tombstones only need to outlive the longest sync gap; prune with e.g.
+--   delete from recipe_tombstones where deleted_at < now() - interval '7 days';
+-- (RECIPE_SYNC_TOMBSTONE_DAYS must not exceed the retention.)
+-- =============================================================================
+
+alter table recipes_public
+    add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists recipes_public_updated_at_idx
+    on recipes_public (updated_at);
+
+create or replace function recipes_public_touch() returns trigger as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists recipes_public_touch on recipes_public;
+create trigger recipes_public_touch
+    before update on recipes_public
+    for each row execute function recipes_public_touch();
+
+create table if not exists recipe_tombstones (
+    recipeid   bigint primary key,
+    deleted_at timestamptz not null default now()
+);
+
+create index if not exists recipe_tombstones_deleted_at_idx
+    on recipe_tombstones (deleted_at);
+
+create or replace function recipes_public_tombstone() returns trigger as $$
+begin
+    insert into recipe_tombstones (recipeid, deleted_at)
+    values (old.recipeid, now())
+    on conflict (recipeid) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$ language plpgsql;
+
+drop trigger if exists recipes_public_tombstone on recipes_public;
+create trigger recipes_public_tombstone
+    after delete on recipes_public
+    for each row execute function recipes_public_tombstone();
@@ -0,0 +1,56 @@
+-- =============================================================================
+-- 004_like_counter_shards.sql
+-- Sharded like counters (see like_counters.py). A like no longer does a
+-- read-then-write on recipes_public.likes / users_public.total_likes:
+--   * increment_like_shard() adds to one of N slots for the recipe (and
+--     one for its author) with a single atomic upsert, so concurrent likes
+--     of a viral recipe land on different rows instead of queueing on one
+--   * fold_like_shards() drains the slots and adds their sums to the
+--     existing likes / total_likes columns in one statement; backends run
+--     it every LIKE_FOLD_INTERVAL seconds, so readers of those columns are
+--     at most that far behind. Concurrent folds are safe: each slot row is
+--     deleted, and counted, by exactly one of them.
+-- =============================================================================
+
+create table if not exists like_counter_shards (
+    kind   text     not null check (kind in ('recipe', 'author')),
+    key    text     not null,             -- recipeid or author user id
+    shard  smallint not null,
+    count  bigint   not null default 0,
+    primary key (kind, key, shard)
+);
+
+create or replace function increment_like_shard(
+    p_kind text, p_key text, p_shard integer, p_delta integer default 1
+) returns void as $$
+    insert into like_counter_shards (kind, key, shard, count)
+    values (p_kind, p_key, p_shard, p_delta)
+    on conflict (kind, key, shard)
+    do update set count = like_counter_shards.count + excluded.count;
+$$ language sql;
+
+create or replace function fold_like_shards()
+returns table (kind text, key text, delta bigint) as $$
+begin
+    return query
+    with moved as (
+        delete from like_counter_shards s
+        returning s.kind, s.key, s.count
+    ), totals as (
+        select m.kind, m.key, sum(m.count)::bigint as delta
+        from moved m
+        group by m.kind, m.key
+    ), recipes as (
+        update recipes_public r
+        set likes = greatest(0, coalesce(r.likes, 0) + t.delta)
+        from totals t
+        where t.kind = 'recipe' and t.delta <> 0 and r.recipeid = t.key::bigint
+    ), authors as (
+        update users_public u
+        set total_likes = greatest(0, coalesce(u.total_likes, 0) + t.delta)
+        from totals t
+        where t.kind = 'author' and t.delta <> 0 and u.id::text = t.key
+    )
+    select t.kind, t.key, t.delta from totals t where t.delta <> 0;
+end;
+$$ language plpgsql;
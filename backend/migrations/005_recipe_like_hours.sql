@@ -0,0 +1,50 @@
+-- =============================================================================
+-- 005_recipe_like_hours.sql
+-- Hourly like counts per recipe for the rolling daily / weekly leaderboards
+-- (see rolling_leaderboard.py). fold_like_shards() (004) now also adds each
+-- recipe's folded likes to the bucket of the current hour, so the hot
+-- (recipe, hour) row is written once per fold rather than once per like,
+-- and prunes buckets older than 8 days.
+-- =============================================================================
+
+create table if not exists recipe_like_hours (
+    hour      timestamptz not null,        -- date_trunc('hour', like time)
+    recipeid  bigint      not null,
+    likes     bigint      not null default 0,
+    primary key (hour, recipeid)
+);
+
+create or replace function fold_like_shards()
+returns table (kind text, key text, delta bigint) as $$
+begin
+    return query
+    with moved as (
+        delete from like_counter_shards s
+        returning s.kind, s.key, s.count
+    ), totals as (
+        select m.kind, m.key, sum(m.count)::bigint as delta
+        from moved m
+        group by m.kind, m.key
+    ), recipes as (
+        update recipes_public r
+        set likes = greatest(0, coalesce(r.likes, 0) + t.delta)
+        from totals t
+        where t.kind = 'recipe' and t.delta <> 0 and r.recipeid = t.key::bigint
+    ), authors as (
+        update users_public u
+        set total_likes = greatest(0, coalesce(u.total_likes, 0) + t.delta)
+        from totals t
+        where t.kind = 'author' and t.delta <> 0 and u.id::text = t.key
+    ), hours as (
+        insert into recipe_like_hours as h (hour, recipeid, likes)
+        select date_trunc('hour', now()), t.key::bigint, t.delta
+        from totals t
+        where t.kind = 'recipe' and t.delta <> 0
+        on conflict (hour, recipeid)
+        do update set likes = greatest(0, h.likes + excluded.likes)
+    )
+    select t.kind, t.key, t.delta from totals t where t.delta <> 0;
+
+    delete from recipe_like_hours where hour < now() - interval '8 days';
+end;
+$$ language plpgsql;
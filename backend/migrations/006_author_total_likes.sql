@@ -0,0 +1,80 @@
+-- =============================================================================
+-- 006_author_total_likes.sql
+-- Author leaderboard from users_public.total_likes (see leaderboard_service.py).
+-- The board used to sum recipes_public.likes per authorname on every build, a
+-- full scan that also merged authors sharing a name and split a renamed
+-- author. It is now one ordered, limited read of total_likes (kept current by
+-- fold_like_shards(), 004) keyed by users_public.id, served by the index below.
+--
+-- The board lists authors with total_likes > 0. users_public holds every
+-- user, not only authors, so authors whose recipes have no likes yet are
+-- left off (the old per-name sum listed them with 0 likes).
+--
+-- reconcile_author_likes() compares total_likes with the sum of the author's
+-- recipes' likes and returns every author where they differ; the backend
+-- runs it every AUTHOR_RECONCILE_INTERVAL seconds and logs the drift. Pass
+-- true to also set total_likes to the recipe sum:
+--   select * from reconcile_author_likes(true);
+-- (done once below, as the backfill for authors predating the counters).
+--
+-- claim_job() lets one caller per interval run a periodic job however many
+-- workers ask: it returns true, and records the run, only if the job last
+-- ran at least p_interval_seconds ago. The backend claims
+-- 'reconcile_author_likes' before each reconcile.
+-- =============================================================================
+
+create index if not exists users_public_total_likes_idx
+    on users_public (total_likes desc, id);
+
+create index if not exists recipes_public_authorid_idx
+    on recipes_public (authorid);
+
+create or replace function reconcile_author_likes(p_fix boolean default false)
+returns table (id text, username text, total_likes bigint, recipe_likes bigint) as $$
+begin
+    if p_fix then
+        -- Hold folds (and new shard increments) off while totals are rewritten,
+        -- so a fold landing in between is not overwritten
+        lock table like_counter_shards in exclusive mode;
+    end if;
+
+    return query
+    with sums as (
+        select r.authorid, sum(coalesce(r.likes, 0))::bigint as likes
+        from recipes_public r
+        group by r.authorid
+    ), drift as (
+        select u.id as uid, u.username as uname,
+               coalesce(u.total_likes, 0)::bigint as stored,
+               coalesce(s.likes, 0)::bigint as summed
+        from users_public u
+        left join sums s on s.authorid = u.id
+        where coalesce(u.total_likes, 0) <> coalesce(s.likes, 0)
+    ), fixed as (
+        update users_public u
+        set total_likes = d.summed
+        from drift d
+        where p_fix and u.id = d.uid
+    )
+    select d.uid::text, d.uname::text, d.stored, d.summed from drift d;
+end;
+$$ language plpgsql;
+
+select count(*) as authors_backfilled from reconcile_author_likes(true);
+
+create table if not exists scheduled_jobs (
+    job     text primary key,
+    ran_at  timestamptz not null
+);
+
+create or replace function claim_job(p_job text, p_interval_seconds double precision)
+returns boolean as $$
+    -- A concurrent claim waits on the row lock, then sees the new ran_at
+    with claimed as (
+        insert into scheduled_jobs as s (job, ran_at) values (p_job, now())
+        on conflict (job) do update set ran_at = excluded.ran_at
+        where s.ran_at <= now() - make_interval(secs => p_interval_seconds)
+        returning 1
+    )
+    select exists (select 1 from claimed);
+$$ language sql;
@@ -0,0 +1,98 @@
+-- =============================================================================
+-- 007_swipe_recipe.sql
+-- Atomic swipes (see UserService in user_service.py). A like, dislike,
+-- unlike or add-to-unseen used to read the user's row and write back whole
+-- liked_recipes / disliked_recipes / unseen_recipes arrays, so it had to
+-- start from the current row (a cached copy could miss another worker's
+-- write). swipe_recipe() changes the arrays in place under the row lock and
+-- returns the updated row, which the backend caches; swipes read nothing.
+--
+--   p_action   'like' | 'dislike' | 'unlike' | 'unseen'
+--   p_category, p_ingredients, p_weight
+--              affinity tokens of the recipe (affinity.py) and the weight
+--              to shift them by; applied only when the swipe changed the
+--              user's lists (a repeat like counts once)
+--
+-- Returns one row, (profile jsonb, applied boolean), or none when the user
+-- does not exist. `applied` tells the backend whether to move the like
+-- counters (an unlike of a recipe that was not liked does not).
+-- =============================================================================
+
+create or replace function shift_weights(
+    p_weights jsonb, p_keys text[], p_delta double precision
+) returns jsonb as $$
+declare
+    k text;
+    v double precision;
+begin
+    p_weights := coalesce(p_weights, '{}'::jsonb);
+    foreach k in array coalesce(p_keys, '{}') loop
+        v := coalesce((p_weights ->> k)::double precision, 0) + p_delta;
+        if abs(v) < 1e-9 then
+            p_weights := p_weights - k;
+        else
+            p_weights := jsonb_set(p_weights, array[k], to_jsonb(round(v::numeric, 6)));
+        end if;
+    end loop;
+    return p_weights;
+end;
+$$ language plpgsql immutable;
+
+create or replace function swipe_recipe(
+    p_user_id text,
+    p_recipe_id bigint,
+    p_action text,
+    p_category text default null,
+    p_ingredients text[] default '{}',
+    p_weight double precision default 0
+) returns table (profile jsonb, applied boolean) as $$
+declare
+    u users_public%rowtype;
+    hit boolean;
+begin
+    select * into u from users_public where id::text = p_user_id for update;
+    if not found then
+        return;
+    end if;
+
+    if p_action = 'like' then
+        hit := not (p_recipe_id = any(coalesce(u.liked_recipes, '{}')));
+        if hit then
+            u.liked_recipes := array_append(coalesce(u.liked_recipes, '{}'), p_recipe_id);
+        end if;
+        u.unseen_recipes := array_remove(u.unseen_recipes, p_recipe_id);
+    elsif p_action = 'dislike' then
+        hit := not (p_recipe_id = any(coalesce(u.disliked_recipes, '{}')));
+        if hit then
+            u.disliked_recipes := array_append(coalesce(u.disliked_recipes, '{}'), p_recipe_id);
+        end if;
+        u.unseen_recipes := array_remove(u.unseen_recipes, p_recipe_id);
+    elsif p_action = 'unlike' then
+        hit := p_recipe_id = any(coalesce(u.liked_recipes, '{}'));
+        u.liked_recipes := array_remove(u.liked_recipes, p_recipe_id);
+    elsif p_action = 'unseen' then
+        hit := not (p_recipe_id = any(coalesce(u.unseen_recipes, '{}')));
+        if hit then
+            u.unseen_recipes := array_append(coalesce(u.unseen_recipes, '{}'), p_recipe_id);
+        end if;
+    else
+        raise exception 'unknown swipe action %', p_action;
+    end if;
+
+    if hit and p_weight <> 0 then
+        u.affinity := jsonb_build_object(
+            'category', shift_weights(u.affinity -> 'category', array_remove(array[p_category], null), p_weight),
+            'ingredient', shift_weights(u.affinity -> 'ingredient', p_ingredients, p_weight)
+        );
+    end if;
+
+    update users_public
+    set liked_recipes = u.liked_recipes,
+        disliked_recipes = u.disliked_recipes,
+        unseen_recipes = u.unseen_recipes,
+        affinity = u.affinity
+    where id = u.id;
+
+    return query select to_jsonb(u), hit;
+end;
+$$ language plpgsql;
@@ -0,0 +1,72 @@
+"""
+File: rebuild_affinity.py
+Purpose: Batch job that recomputes users_public.affinity for every user from
+         their liked_recipes / disliked_recipes history.
+Authors: Kadee Wheeler
+
+Usage:
+    python rebuild_affinity.py              # rebuild all users
+    python rebuild_affinity.py --dry-run    # compute only, no writes
+
+UserService keeps the vectors current per swipe; run this after applying
+migrations/001_user_affinity.sql, or whenever the weights or token
+normalization in affinity.py change.
+"""
+
+import argparse
+import os
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+import affinity
+
+load_dotenv()
+
+PAGE_SIZE = 1000
+
+
+def fetch_pages(supabase, table, columns, order_col):
+    """Yield rows of `table` a page at a time."""
+    start = 0
+    while True:
+        rows = (
+            supabase.table(table)
+            .select(columns)
+            .order(order_col)
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+
+
+def rebuild(supabase, dry_run=False):
+    recipes_by_id = {
+        r["recipeid"]: r
+        for r in fetch_pages(supabase, "recipes_public", "recipeid, " + affinity.RECIPE_COLUMNS, "recipeid")
+    }
+    print(f"[AFFINITY] Loaded {len(recipes_by_id)} recipes")
+
+    updated = 0
+    for user in fetch_pages(supabase, "users_public", "id, liked_recipes, disliked_recipes", "id"):
+        vector = affinity.build_vector(
+            recipes_by_id, user.get("liked_recipes"), user.get("disliked_recipes")
+        )
+        if not dry_run:
+            supabase.table("users_public").update({"affinity": vector}).eq("id", user["id"]).execute()
+        updated += 1
+
+    print(f"[AFFINITY] {'Computed' if dry_run else 'Rebuilt'} {updated} user vectors")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild users_public.affinity")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    rebuild(client, dry_run=args.dry_run)
@@ -0,0 +1,110 @@
+"""
+===============================================================================
+ File: recipe_neighbors.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     In-memory copy of recipe_neighbors, the "people who liked this also
+     liked" lists written nightly by item_neighbors.py.
+
+     RecipeNeighbors pages the table in on load() and re-reads it every
+     NEIGHBORS_REFRESH_INTERVAL seconds (run(), on a background thread,
+     see services.py). The feed ranks a user's candidates with
+     co_likes(liked_ids): each candidate's summed neighbor score over the
+     user's NEIGHBOR_SEEDS most recent likes (see RecipeUtility.rank_feed).
+
+     Until the table has been read (or if migrations/002 is not applied)
+     co_likes() is empty and the feed ranks as before.
+===============================================================================
+"""
+
+import os
+import threading
+
+
+# Seconds between re-reads of recipe_neighbors (the job runs nightly)
+NEIGHBORS_REFRESH_INTERVAL = float(os.getenv("NEIGHBORS_REFRESH_INTERVAL", "3600"))
+# Most recent likes whose neighbors feed a user's co-like scores
+NEIGHBOR_SEEDS = int(os.getenv("NEIGHBOR_SEEDS", "50"))
+
+
+class RecipeNeighbors:
+    """
+    recipeid → [(neighbor recipeid, score), ...] from recipe_neighbors.
+
+    Attributes:
+        ready (bool): True once the table has been read.
+    """
+
+    def __init__(self, db, interval=NEIGHBORS_REFRESH_INTERVAL, seeds=NEIGHBOR_SEEDS,
+                 page_size=1000):
+        self.db = db                # resilience.DBCaller
+        self.interval = interval
+        self.seeds = seeds
+        self.page_size = page_size
+        self._neighbors = {}
+        self._stop = threading.Event()
+        self.ready = False
+
+    def load(self):
+        """Read the whole table and swap it in; returns the number of recipes."""
+        neighbors = {}
+        start = 0
+        while True:
+            rows = (
+                self.db.table("recipe_neighbors")
+                .select("recipeid, neighbors")
+                .order("recipeid")
+                .range(start, start + self.page_size - 1)
+                .execute(observe=False)
+            ).data or []
+            for row in rows:
+                neighbors[row["recipeid"]] = tuple(
+                    (n["recipeid"], n["score"]) for n in row.get("neighbors") or ()
+                )
+            if len(rows) < self.page_size:
+                break
+            start += self.page_size
+
+        self._neighbors = neighbors
+        self.ready = True
+        return len(neighbors)
+
+    def neighbors(self, recipe_id):
+        return self._neighbors.get(recipe_id, ())
+
+    def co_likes(self, liked_ids):
+        """
+        Co-like score per recipe for a user who liked `liked_ids` (oldest
+        first, as stored in liked_recipes).
+
+        Returns:
+            dict[int, float]: recipeid → summed neighbor score.
+        """
+        scores = {}
+        for seed in list(liked_ids)[-self.seeds:]:
+            try:
+                seed = int(seed)
+            except (TypeError, ValueError):
+                continue
+            for rid, score in self._neighbors.get(seed, ()):
+                scores[rid] = scores.get(rid, 0.0) + score
+        return scores
+
+    def run(self):
+        """Refresh loop; call from a daemon thread."""
+        while True:
+            try:
+                count = self.load()
+                print(f"[NEIGHBORS] Loaded neighbors for {count} recipes")
+            except Exception as e:
+                print("[WARN] recipe_neighbors not loaded:", e)
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"ready": self.ready, "recipes": len(self._neighbors)}
@@ -22,17 +22,17 @@
 # Imports & Environment Setup
 # -----------------------------
 from datetime import datetime, timezone
-from flask import jsonify
-from supabase import create_client, Client
 import os
-from dotenv import load_dotenv
 import uuid
 import json
 
-load_dotenv()
+from cache import LRUCache
+from resilience import DBCaller, error_status
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Upper bound on recipes kept in the per-process read-through cache
+RECIPE_CACHE_SIZE = int(os.getenv("RECIPE_CACHE_SIZE", "2048"))
+# Seconds before a cached recipe is re-read (picks up edits from other instances)
+RECIPE_CACHE_TTL = float(os.getenv("RECIPE_CACHE_TTL", "300"))
 
 
 # ===============================================================
@@ -48,13 +48,34 @@ class RecipeService:
         supabase (Client): Supabase database client instance.
         table_name (str): Name of the Supabase table storing recipes.
         bucket (str): Name of the Supabase Storage bucket for images.
+        cache (LRUCache): Read-through cache of recipe rows keyed by recipeid.
+        catalog (RecipeCatalog | None): In-memory catalog told about every
+            recipe write so its indexes stay current.
     """
 
-    def __init__(self, supabase):
-        """Initialize service with Supabase client."""
+    def __init__(self, supabase, catalog=None, db=None, on_unseen=None):
+        """
+        Initialize service with Supabase client.
+
+        `on_unseen(user_id)` is called for each user whose unseen_recipes
+        create_recipe extends (Services drops the cached profile).
+        """
         self.supabase = supabase
+        self.db = db or DBCaller(supabase)
         self.table_name = "recipes_public"
         self.bucket = "recipe_images"
+        self.cache = LRUCache(RECIPE_CACHE_SIZE, ttl=RECIPE_CACHE_TTL)
+        self.catalog = catalog
+        self.on_unseen = on_unseen
+
+    def _publish(self, rows=(), removed=None):
+        """Forward written rows (or a deleted id) to the in-memory catalog."""
+        if self.catalog is None:
+            return
+        for row in rows or []:
+            self.catalog.upsert(row)
+        if removed is not None:
+            self.catalog.remove(removed)
 
     # ===========================================================
     # IMAGE UPLOAD FUNCTIONS
@@ -141,7 +162,8 @@ class RecipeService:
             dict: { data: [...] } on success or { error: "..."} on failure.
         """
         try:
-            response = self.supabase.table(self.table_name).select("*").execute()
+            # Identical concurrent reads share one call
+            response = self.db.table(self.table_name).select("*").execute(shared=True)
             return {"data": response.data}
         except Exception as e:
             return {"error": str(e)}
@@ -158,22 +180,69 @@ class RecipeService:
             Returns:
                 tuple(dict, int): Response JSON + HTTP status.
         """
+        cached = self.cache.get(recipe_id)
+        if cached is not None:
+            return {"data": cached}, 200
+
         try:
             response = (
-                self.supabase.table(self.table_name)
+                self.db.table(self.table_name)
                 .select("*")
                 .eq("recipeid", recipe_id)
-                .execute()
+                .execute(shared=True)
             )
 
             if not response.data:
                 return {"error": "Recipe not found"}, 404
 
+            recipe = response.data[0]
+            self.cache.set(recipe_id, recipe)
+
             # Consistent with all other endpoints
-            return {"data": response.data[0]}, 200
+            return {"data": recipe}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
+
+    # -----------------------------------------------------------
+
+    def get_recipes_by_ids(self, recipe_ids):
+        """
+        Fetch several recipes in one call.
+
+        Cached rows are served from memory; the remaining ids are loaded
+        with a single `in_` query and added to the cache.
+
+        Args:
+            recipe_ids (list[int]): Recipe identifiers, in display order.
+
+        Returns:
+            tuple(dict, int): { data: [...], missing: [...] } + HTTP status.
+                `data` follows the order of `recipe_ids` (duplicates
+                collapsed); ids that do not exist are listed in `missing`.
+        """
+        ordered = list(dict.fromkeys(recipe_ids))
+        found, misses = self.cache.get_many(ordered)
+
+        if misses:
+            try:
+                response = (
+                    self.db.table(self.table_name)
+                    .select("*")
+                    .in_("recipeid", misses)
+                    .execute()
+                )
+            except Exception as e:
+                return {"error": str(e)}, error_status(e)
+
+            for recipe in response.data or []:
+                found[recipe["recipeid"]] = recipe
+                self.cache.set(recipe["recipeid"], recipe)
+
+        return {
+            "data": [found[rid] for rid in ordered if rid in found],
+            "missing": [rid for rid in ordered if rid not in found],
+        }, 200
 
 
     # -----------------------------------------------------------
@@ -202,7 +271,7 @@ class RecipeService:
 
             # Lookup author_name from users_public
             lookup = (
-                self.supabase.table("users_public")
+                self.db.table("users_public")
                 .select("username")
                 .eq("id", data["authorid"])
                 .execute()
@@ -227,7 +296,7 @@ class RecipeService:
             data["dietaryrestrictions"] = parse_list("dietaryrestrictions")
 
             # Insert recipe WITHOUT image first
-            response = self.supabase.table(self.table_name).insert(data).execute()
+            response = self.db.table(self.table_name).insert(data).execute()
             recipe = response.data[0]
             recipe_id = recipe["recipeid"]
 
@@ -236,7 +305,7 @@ class RecipeService:
             # ------------------------------------------------------
             try:
                 all_users = (
-                    self.supabase.table("users_public")
+                    self.db.table("users_public")
                     .select("*")
                     .execute()
                 ).data or []
@@ -251,10 +320,12 @@ class RecipeService:
                     unseen = user.get("unseen_recipes", []) or []
                     if recipe_id not in unseen:
                         unseen.append(recipe_id)
-                        self.supabase.table("users_public") \
+                        self.db.table("users_public") \
                             .update({"unseen_recipes": unseen}) \
                             .eq("id", user["id"]) \
                             .execute()
+                        if self.on_unseen is not None:
+                            self.on_unseen(user["id"])
 
             except Exception as e:
                 print("[WARN] Failed unseen-update:", e)
@@ -264,12 +335,15 @@ class RecipeService:
             # ------------------------------------------------------
             if image_file:
                 url = self.upload_image(image_file, recipe_id)
-                self.supabase.table(self.table_name) \
+                self.db.table(self.table_name) \
                     .update({"photopath": url}) \
                     .eq("recipeid", recipe_id) \
                     .execute()
                 recipe["photopath"] = url
 
+            self.cache.set(recipe_id, recipe)
+            self._publish([recipe])
+
             # Return created recipe id and data (no human-facing message)
             return {
                 "message": "Recipe created successfully",
@@ -279,7 +353,7 @@ class RecipeService:
 
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
     # -----------------------------------------------------------
 
@@ -301,15 +375,18 @@ class RecipeService:
                 updates["photopath"] = url
 
             response = (
-                self.supabase.table(self.table_name)
+                self.db.table(self.table_name)
                 .update(updates)
                 .eq("recipeid", recipe_id)
                 .execute()
             )
 
+            self.cache.pop(recipe_id)
+
             if not response.data:
                 return {"error": "Recipe not found"}, 404
 
+            self._publish(response.data)
 
             return {
                 "message": "Recipe updated successfully",
@@ -318,7 +395,7 @@ class RecipeService:
 
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
     # -----------------------------------------------------------
 
@@ -336,21 +413,23 @@ class RecipeService:
             self.delete_all_images_for_recipe(recipe_id)
 
             response = (
-                self.supabase.table(self.table_name)
+                self.db.table(self.table_name)
                 .delete()
                 .eq("recipeid", recipe_id)
                 .execute()
             )
+            self.cache.pop(recipe_id)
 
             if not response.data:
                 return {"error": "Recipe not found"}, 404
 
+            self._publish(removed=recipe_id)
 
             return {"message": "Recipe deleted successfully"}
 
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
     # -----------------------------------------------------------
 
@@ -370,7 +449,7 @@ class RecipeService:
         try:
             # 1) Fetch recipe
             res = (
-                self.supabase.table(self.table_name)
+                self.db.table(self.table_name)
                 .select("*")
                 .eq("recipeid", recipe_id)
                 .execute()
@@ -415,16 +494,18 @@ class RecipeService:
 
             # 5) Update row
             response = (
-                self.supabase.table(self.table_name)
+                self.db.table(self.table_name)
                 .update(parsed)
                 .eq("recipeid", recipe_id)
                 .execute()
             )
+            self.cache.pop(recipe_id)
+            self._publish(response.data)
 
             return {"message": "Recipe updated successfully", "data": response.data}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
     # -----------------------------------------------------------
 
@@ -439,7 +520,7 @@ class RecipeService:
             list: Recipe rows or empty list.
         """
         res = (
-            self.supabase
+            self.db
                 .table(self.table_name)
                 .select("*")
                 .eq("authorid", authorid)
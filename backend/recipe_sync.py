@@ -0,0 +1,174 @@
+"""
+===============================================================================
+ File: recipe_sync.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Background delta sync of recipes_public into the in-process catalog
+     (and, through its listeners, every in-memory index), plus the
+     RecipeService read-through cache.
+
+     Each poll reads only
+         - recipes_public rows with updated_at after the watermark, and
+         - recipe_tombstones rows with deleted_at after the watermark
+     (see migrations/003_recipe_sync.sql), so writes from other backend
+     instances, the seeder or the dashboard show up within
+     RECIPE_SYNC_INTERVAL seconds without reloading the table.
+
+     The watermark starts at the time the catalog's rows were read
+     (RecipeCatalog.loaded_at) and then follows the newest updated_at /
+     deleted_at seen. Each poll re-reads a short overlap window, so rows
+     committed slightly out of timestamp order are not missed; re-applied
+     rows are no-ops in the catalog. If nothing has been synced for longer
+     than the tombstone retention, deletions may have been pruned and the
+     catalog is fully reloaded instead.
+
+ Configuration (environment):
+     RECIPE_SYNC_INTERVAL        Seconds between polls                 [5]
+     RECIPE_SYNC_OVERLAP         Seconds re-read behind the watermark   [30]
+     RECIPE_SYNC_TOMBSTONE_DAYS  Tombstone retention (see migration)    [7]
+===============================================================================
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+RECIPE_SYNC_INTERVAL = float(os.getenv("RECIPE_SYNC_INTERVAL", "5"))
+RECIPE_SYNC_OVERLAP = float(os.getenv("RECIPE_SYNC_OVERLAP", "30"))
+RECIPE_SYNC_TOMBSTONE_DAYS = float(os.getenv("RECIPE_SYNC_TOMBSTONE_DAYS", "7"))
+
+
+def _parse(value):
+    ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class RecipeSync:
+    """
+    Polls recipes_public and recipe_tombstones for changes and applies them.
+
+    Args:
+        catalog (RecipeCatalog): Catalog to keep current.
+        supabase (Client): Supabase client.
+        caches (Iterable[LRUCache]): Caches keyed by recipeid to invalidate
+            on every change (e.g. RecipeService.cache).
+    """
+
+    def __init__(self, catalog, supabase, caches=(), interval=RECIPE_SYNC_INTERVAL,
+                 overlap=RECIPE_SYNC_OVERLAP, tombstone_days=RECIPE_SYNC_TOMBSTONE_DAYS,
+                 page_size=1000):
+        self.catalog = catalog
+        self.supabase = supabase
+        self.caches = list(caches)
+        self.interval = interval
+        self.overlap = timedelta(seconds=overlap)
+        self.retention = timedelta(days=tombstone_days)
+        self.page_size = page_size
+        self.updated_after = None     # datetime watermarks
+        self.deleted_after = None
+        self._loaded_at = None        # catalog.loaded_at the watermarks derive from
+        self.last_poll = None
+        self.applied = 0
+        self.removed = 0
+        self._stop = threading.Event()
+
+    # ---------- queries ----------
+
+    def _pages(self, table, column, after):
+        start = 0
+        while True:
+            page = (
+                self.supabase.table(table)
+                .select("*")
+                .gt(column, (after - self.overlap).isoformat())
+                .order(column)
+                .range(start, start + self.page_size - 1)
+                .execute()
+            ).data or []
+            yield from page
+            if len(page) < self.page_size:
+                return
+            start += self.page_size
+
+    # ---------- polling ----------
+
+    def _reset_watermarks(self):
+        loaded = datetime.fromtimestamp(self.catalog.loaded_at, timezone.utc)
+        self.updated_after = self.deleted_after = loaded
+        self._loaded_at = self.catalog.loaded_at
+
+    def _invalidate(self, recipe_id):
+        for cache in self.caches:
+            cache.pop(recipe_id)
+
+    def poll(self):
+        """
+        Apply changes since the watermark.
+
+        Returns:
+            tuple(int, int): (rows changed, rows removed) by this poll;
+            rows re-read from the overlap window that were already
+            applied are not counted.
+        """
+        if not self.catalog.ready or self.catalog.loaded_at is None:
+            return 0, 0
+        if self.catalog.loaded_at != self._loaded_at:
+            self._reset_watermarks()
+            self.last_poll = None
+
+        synced_at = self.last_poll or self.catalog.loaded_at
+        if time.time() - synced_at > self.retention.total_seconds():
+            # Tombstones we have not seen may already be pruned; start over
+            self.catalog.load()
+            self._reset_watermarks()
+            self.last_poll = time.time()
+            return 0, 0
+
+        upserted = removed = 0
+        newest = self.updated_after
+        for row in self._pages("recipes_public", "updated_at", self.updated_after):
+            version = self.catalog.version
+            self.catalog.upsert(row)
+            if self.catalog.version != version:
+                self._invalidate(row["recipeid"])
+                upserted += 1
+            if row.get("updated_at"):
+                newest = max(newest, _parse(row["updated_at"]))
+
+        newest_delete = self.deleted_after
+        for tombstone in self._pages("recipe_tombstones", "deleted_at", self.deleted_after):
+            if tombstone["recipeid"] in self.catalog:
+                self.catalog.remove(tombstone["recipeid"])
+                self._invalidate(tombstone["recipeid"])
+                removed += 1
+            newest_delete = max(newest_delete, _parse(tombstone["deleted_at"]))
+
+        self.updated_after, self.deleted_after = newest, newest_delete
+        self.last_poll = time.time()
+        self.applied += upserted
+        self.removed += removed
+        return upserted, removed
+
+    def run(self):
+        """Poll loop; call from a daemon thread."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print("[WARN] Recipe sync failed:", e)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "updated_after": self.updated_after.isoformat() if self.updated_after else None,
+            "deleted_after": self.deleted_after.isoformat() if self.deleted_after else None,
+            "last_poll": self.last_poll,
+            "applied": self.applied,
+            "removed": self.removed,
+        }
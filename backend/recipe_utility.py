@@ -9,24 +9,49 @@ Part of System:
     Used by backend logic in `app.py` and `RecipeService`. This class does not
     directly access Flask, but is used to compute dynamic feeds for each user.
     Functions include token normalization, allergen filtering, unseen filtering,
-    and feed generation used in the swipe UI.
+    feed ranking, and feed generation used in the swipe UI.
 
 """
 
+from datetime import datetime, timezone
 from typing import Iterable, List, Dict, Any, Optional
 import ast
+import heapq
+import math
+import os
 import re
 
+from resilience import DBCaller, error_status
+
+
+# Feed ranking weights; override per deployment via FEED_WEIGHT_* env vars
+DEFAULT_FEED_WEIGHTS = {
+    "recency": float(os.getenv("FEED_WEIGHT_RECENCY", "1.0")),
+    "popularity": float(os.getenv("FEED_WEIGHT_POPULARITY", "1.0")),
+    "affinity": float(os.getenv("FEED_WEIGHT_AFFINITY", "1.0")),
+    "ingredient": float(os.getenv("FEED_WEIGHT_INGREDIENT", "0.5")),
+    "collaborative": float(os.getenv("FEED_WEIGHT_COLLABORATIVE", "1.0")),
+}
+# Age (days) at which a recipe's recency score halves
+FEED_RECENCY_HALF_LIFE_DAYS = float(os.getenv("FEED_RECENCY_HALF_LIFE_DAYS", "7"))
+
 
 class RecipeUtility:
     """
     Works in two modes:
       - Offline (tests): pass `recipes` explicitly to generate_user_feed(...)
       - Online (runtime): construct with a supabase client and call generate_user_feed(None, user_data)
+
+    Feed ranking weights can be overridden per instance with `weights`
+    (keys: recency, popularity, affinity, ingredient, collaborative).
     """
 
-    def __init__(self, supabase=None):
+    def __init__(self, supabase=None, weights=None, half_life_days=FEED_RECENCY_HALF_LIFE_DAYS,
+                 db=None):
         self.supabase = supabase
+        self.db = db or DBCaller(supabase)
+        self.weights = {**DEFAULT_FEED_WEIGHTS, **(weights or {})}
+        self.half_life_days = half_life_days
 
     # ---------- helpers ----------
 
@@ -177,14 +202,145 @@ class RecipeUtility:
         if not self.supabase:
             return []
         resp = (
-            self.supabase.table("recipes_public")
+            self.db.table("recipes_public")
             .select("*")
             .order("datecreated", desc=True)
             .execute()
         )
         return resp.data or []
 
-    def generate_user_feed(self, recipes_or_none, user_data):
+    # ---------- ranking ----------
+
+    def _parse_timestamp(self, value) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+    def _shares(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """Scale positive weights to shares of their total (disliked/negative → 0)."""
+        positive = {k: v for k, v in (weights or {}).items() if v > 0}
+        total = sum(positive.values())
+        return {k: v / total for k, v in positive.items()} if total else {}
+
+    def category_affinity(self, recipes: List[Dict[str, Any]], user_data: Dict[str, Any]) -> Dict[str, float]:
+        """Share of the user's liked recipes in each category (values sum to 1)."""
+        return self.user_affinity(recipes, user_data)["category"]
+
+    def user_affinity(self, recipes: List[Dict[str, Any]], user_data: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        """
+        Category and ingredient shares for ranking.
+
+        Uses the incrementally maintained `affinity` vector on the profile
+        (see affinity.py) when present; otherwise falls back to scanning
+        the user's liked recipes in `recipes`.
+        """
+        stored = user_data.get("affinity") or {}
+        if stored.get("category") or stored.get("ingredient"):
+            return {
+                "category": self._shares(stored.get("category")),
+                "ingredient": self._shares(stored.get("ingredient")),
+            }
+
+        liked = set(self._as_list(user_data.get("liked_recipes")))
+        categories: Dict[str, float] = {}
+        ingredients: Dict[str, float] = {}
+        if liked:
+            for r in recipes:
+                if self._recipe_id(r) in liked:
+                    cat = self._norm_token(str(r.get("category") or ""))
+                    if cat:
+                        categories[cat] = categories.get(cat, 0) + 1
+                    for ing in self._norm_set(r.get("ingredients")):
+                        ingredients[ing] = ingredients.get(ing, 0) + 1
+
+        return {"category": self._shares(categories), "ingredient": self._shares(ingredients)}
+
+    def rank_feed(
+        self,
+        candidates: List[Dict[str, Any]],
+        affinity: Dict[str, Dict[str, float]],
+        limit: Optional[int] = None,
+        now: Optional[datetime] = None,
+        co_likes: Optional[Dict[int, float]] = None,
+        max_likes: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Order candidates by a weighted score of recency, popularity and
+        category/ingredient affinity, keeping only the top `limit`.
+
+        Scores are each scaled to [0, 1]:
+            recency    = 0.5 ** (age_days / half_life_days)
+            popularity = log1p(likes) / log1p(max likes among candidates)
+            affinity   = user's share of likes in the recipe's category
+            ingredient = summed shares of the recipe's ingredients (capped at 1)
+            collaborative = co-like score from the user's liked recipes'
+                         neighbors (capped at 1)
+
+        `affinity` is the output of user_affinity(); `co_likes` maps
+        recipeid → score (RecipeNeighbors.co_likes, item_neighbors.py).
+        `max_likes` overrides the popularity scale when `candidates` is a
+        shortlist of a larger set (RecipeCatalog.feed_candidates).
+
+        Top-K uses a heap (O(n log k)); limit=None ranks everything.
+        """
+        if not candidates:
+            return []
+
+        now = now or datetime.now(timezone.utc)
+        w_rec = self.weights["recency"]
+        w_pop = self.weights["popularity"]
+        w_aff = self.weights["affinity"]
+        w_ing = self.weights["ingredient"]
+        w_cf = self.weights["collaborative"]
+        cat_shares = (affinity or {}).get("category") or {}
+        ing_shares = (affinity or {}).get("ingredient") or {}
+
+        if max_likes is None:
+            max_likes = max((r.get("likes") or 0) for r in candidates)
+        pop_norm = math.log1p(max_likes) or 1.0
+
+        def score(r):
+            total = 0.0
+            if w_rec:
+                created = self._parse_timestamp(r.get("datecreated"))
+                if created is not None:
+                    age_days = max(0.0, (now - created).total_seconds() / 86400)
+                    total += w_rec * 0.5 ** (age_days / self.half_life_days)
+            if w_pop:
+                total += w_pop * math.log1p(max(0, r.get("likes") or 0)) / pop_norm
+            if w_aff and cat_shares:
+                total += w_aff * cat_shares.get(self._norm_token(str(r.get("category") or "")), 0.0)
+            if w_ing and ing_shares:
+                total += w_ing * min(1.0, sum(ing_shares.get(i, 0.0) for i in self._norm_set(r.get("ingredients"))))
+            if w_cf and co_likes:
+                total += w_cf * min(1.0, co_likes.get(r.get("recipeid"), 0.0))
+            return total
+
+        if limit is None or limit >= len(candidates):
+            return sorted(candidates, key=score, reverse=True)
+        return heapq.nlargest(max(0, limit), candidates, key=score)
+
+    def feed_slack(self, affinity, co_likes):
+        """
+        Most that affinity, ingredient and collaborative can add to one
+        recipe's rank_feed score for this `affinity` and `co_likes`
+        (None: no bound beyond the weights).
+        """
+        cat_shares = (affinity or {}).get("category") or {}
+        ing_shares = (affinity or {}).get("ingredient") or {}
+        terms = (
+            ("affinity", max(cat_shares.values(), default=0.0) if affinity is not None else 1.0),
+            ("ingredient", min(1.0, sum(ing_shares.values())) if affinity is not None else 1.0),
+            ("collaborative", min(1.0, max(co_likes.values(), default=0.0)) if co_likes is not None else 1.0),
+        )
+        return sum(max(0.0, self.weights[name] * bound) for name, bound in terms)
+
+    def generate_user_feed(self, recipes_or_none, user_data, limit=None, co_likes=None,
+                           max_likes=None):
         # Load recipes
         recipes = recipes_or_none if recipes_or_none is not None else self._fetch_all_recipes()
 
@@ -199,7 +355,10 @@ class RecipeUtility:
             # Apply allergen filter to unseen
             safe_unseen = self.filter_recipes_by_allergens(unseen_recipes, allergens)
 
-            return safe_unseen
+            # Best recipes first
+            affinity = self.user_affinity(recipes, user_data)
+            return self.rank_feed(safe_unseen, affinity, limit, co_likes=co_likes,
+                                  max_likes=max_likes)
 
         # 2) If no unseen remain → return empty feed
         return []
@@ -208,7 +367,7 @@ class RecipeUtility:
         """Return a single recipe row by its ID."""
         try:
             res = (
-                self.supabase
+                self.db
                 .table(self.recipe_table)
                 .select("*")
                 .eq("id", recipe_id)
@@ -222,4 +381,4 @@ class RecipeUtility:
             return {"data": res.data[0]}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
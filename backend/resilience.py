@@ -0,0 +1,360 @@
+"""
+===============================================================================
+ File: resilience.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Shared wrapper for Supabase calls made by the services
+     (RecipeService, UserService, LeaderboardService, RecipeUtility).
+
+     Provides:
+         - CircuitBreaker: one per (table, operation). After
+           BREAKER_FAILURES consecutive transient failures it opens and
+           calls fail fast with CircuitOpenError for BREAKER_RESET
+           seconds, then lets a single probe through (half-open); the
+           probe's outcome closes or re-opens it.
+         - DBCaller: wraps the Supabase client. Services build queries with
+           db.table(name) exactly as with supabase.table(name); the
+           query's execute() then runs behind the (table, operation)
+           breaker, the operation being the builder's first call
+           (select / insert / update / upsert / delete); db.rpc(name,
+           params) does the same for a Postgres function, as operation
+           "rpc" on table `name`. Idempotent
+           calls (selects, by default) are retried up to DB_RETRIES times
+           with full-jitter exponential backoff; writes are not retried. With DB_HEDGE_MS set, a read
+           that has not answered after that long is sent a second time
+           and the first response wins. Reads executed with shared=True
+           are coalesced: identical concurrent queries (same table,
+           method, path, filters and Accept/Range headers) share one
+           call and its result (see singleflight.py).
+         - error_status(e): the HTTP status services return for an error
+           (503 while a circuit is open, else 500).
+
+     Only transient errors (network failures and timeouts, gateway 5xx /
+     429, PostgREST connection errors, and Postgres connection / resource
+     / serialization errors) are retried or count against a breaker; a
+     constraint violation, or any other error, means the database is
+     answering and is raised at once.
+
+     Every attempt's latency is reported to the `observers` (e.g. write
+     admission control's load shedding), except for calls executed with
+     observe=False: bulk and background reads, whose latency says little
+     about how fast request-path queries are served.
+
+ Configuration (environment):
+     DB_RETRIES          Extra attempts for idempotent calls       [2]
+     DB_BACKOFF_MS       Base backoff before the first retry        [50]
+     DB_BACKOFF_MAX_MS   Backoff cap                                [1000]
+     DB_HEDGE_MS         Hedge reads slower than this; 0 = off      [0]
+     BREAKER_FAILURES    Consecutive failures that open a breaker   [5]
+     BREAKER_RESET       Seconds a breaker stays open               [30]
+===============================================================================
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from singleflight import SingleFlight
+
+try:
+    from httpx import TransportError
+except ImportError:  # optional dependency (installed with supabase)
+    TransportError = OSError
+
+
+DB_RETRIES = int(os.getenv("DB_RETRIES", "2"))
+DB_BACKOFF_MS = float(os.getenv("DB_BACKOFF_MS", "50"))
+DB_BACKOFF_MAX_MS = float(os.getenv("DB_BACKOFF_MAX_MS", "1000"))
+DB_HEDGE_MS = float(os.getenv("DB_HEDGE_MS", "0"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "30"))
+
+# SQLSTATE classes worth retrying: connection exception, transaction
+# rollback (deadlock/serialization), insufficient resources, operator
+# intervention (statement timeout, shutdown)
+_TRANSIENT_SQLSTATE = ("08", "40", "53", "57")
+
+# PostgREST errors for a database it cannot reach: connection failed,
+# schema cache not loaded, pool acquisition timed out
+_TRANSIENT_PGRST = ("PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+# Query builder calls that name the operation
+_OPS = ("select", "insert", "update", "upsert", "delete")
+
+# Operations retried unless the caller says otherwise
+_IDEMPOTENT_OPS = ("select",)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Supabase while a breaker is open."""
+
+
+def is_transient(exc):
+    """True for failures that say nothing about the request itself."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    code = getattr(exc, "code", None)
+    if isinstance(code, str) and code:
+        if code.isdigit() and len(code) == 3:        # HTTP status from the gateway
+            return code.startswith("5") or code == "429"
+        if code.startswith("PGRST"):
+            return code in _TRANSIENT_PGRST
+        return code[:2] in _TRANSIENT_SQLSTATE
+    # No code: only network failures and timeouts
+    return isinstance(exc, (OSError, TimeoutError, TransportError))
+
+
+def error_status(exc):
+    """HTTP status for a failed service call."""
+    return 503 if isinstance(exc, CircuitOpenError) else 500
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    States: "closed" (calls flow), "open" (calls fail fast until
+    `reset_timeout` has passed), "half_open" (one probe call allowed).
+    """
+
+    def __init__(self, name, failures=BREAKER_FAILURES, reset_timeout=BREAKER_RESET,
+                 clock=time.monotonic):
+        self.name = name
+        self.max_failures = failures
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now."""
+        with self._lock:
+            if self.state == "open":
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:
+                    self.rejected += 1
+                    return False
+                self._probing = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = self.clock()
+                self._probing = False
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+def _signature(table, builder):
+    """Key under which identical queries are coalesced."""
+    headers = getattr(builder, "headers", None) or {}
+    return (
+        table,
+        str(getattr(builder, "http_method", "")),
+        str(getattr(builder, "path", "")),
+        str(getattr(builder, "params", "")),
+        str(headers.get("accept")),
+        str(headers.get("range")),
+    )
+
+
+class _Query:
+    """Query-builder proxy whose execute() goes through a DBCaller."""
+
+    __slots__ = ("_caller", "_builder", "_table", "_op")
+
+    def __init__(self, caller, builder, table, op=None):
+        self._caller = caller
+        self._builder = builder
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            op = self._op or (name if name in _OPS else None)
+            return _Query(self._caller, attr(*args, **kwargs), self._table, op)
+        return call
+
+    def execute(self, idempotent=None, shared=False, observe=True):
+        return self._caller.execute(
+            self._builder, self._table, self._op or "query", idempotent, shared, observe
+        )
+
+
+class DBCaller:
+    """
+    Retries, backoff, circuit breaking and hedging for Supabase queries.
+
+    Args:
+        supabase (Client): Client whose tables table() wraps.
+        retries (int): Extra attempts for idempotent calls.
+        backoff, backoff_max (float): Backoff base and cap, in seconds.
+        hedge_after (float): Seconds before a read is hedged; 0 disables.
+        observers (Iterable[callable]): Called with each attempt's latency.
+    """
+
+    def __init__(self, supabase=None, retries=DB_RETRIES, backoff=DB_BACKOFF_MS / 1000,
+                 backoff_max=DB_BACKOFF_MAX_MS / 1000, hedge_after=DB_HEDGE_MS / 1000,
+                 breaker_failures=BREAKER_FAILURES, breaker_reset=BREAKER_RESET,
+                 observers=(), sleep=time.sleep):
+        self.supabase = supabase
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self.observers = list(observers)
+        self.sleep = sleep
+        self.breakers = {}
+        self.retried = 0
+        self.hedged = 0
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def table(self, name):
+        """supabase.table(name), with execute() routed through this caller."""
+        return _Query(self, self.supabase.table(name), name)
+
+    def rpc(self, name, params=None):
+        """supabase.rpc(name, params), executed as a non-idempotent call."""
+        return _Query(self, self.supabase.rpc(name, params or {}), name, "rpc")
+
+    def breaker(self, table, op):
+        key = f"{table}.{op}"
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.setdefault(
+                    key, CircuitBreaker(key, self.breaker_failures, self.breaker_reset)
+                )
+        return breaker
+
+    def _observe(self, seconds):
+        for observe in self.observers:
+            observe(seconds)
+
+    def _timed(self, query, observe=True):
+        if not observe:
+            return query.execute()
+        started = time.perf_counter()
+        try:
+            return query.execute()
+        finally:
+            self._observe(time.perf_counter() - started)
+
+    def _hedged(self, query, observe):
+        """First response of the query, sent twice if the first is slow."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="db-hedge")
+        first = self._pool.submit(self._timed, query, observe)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self.hedged += 1
+        pending = {first, self._pool.submit(self._timed, query, observe)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def execute(self, query, table, op, idempotent=None, shared=False, observe=True):
+        """
+        Run `query.execute()` for `op` ("select", "insert", "update",
+        "delete", ...) on `table`.
+
+        Args:
+            shared (bool): Let identical concurrent idempotent queries share
+                this call's outcome. Callers must not mutate the result.
+            observe (bool): Report latency to the observers; off for bulk
+                and background work.
+
+        Raises:
+            CircuitOpenError: The (table, op) breaker is open.
+            Exception: The query's own error once retries are used up.
+        """
+        if idempotent is None:
+            idempotent = op in _IDEMPOTENT_OPS
+        if shared and idempotent:
+            return self.flights.do(
+                _signature(table, query),
+                lambda: self._execute(query, table, op, idempotent, observe),
+            )
+        return self._execute(query, table, op, idempotent, observe)
+
+    def _execute(self, query, table, op, idempotent, observe):
+        breaker = self.breaker(table, op)
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f"{table} {op} unavailable (circuit open)")
+            try:
+                if idempotent and self.hedge_after > 0:
+                    result = self._hedged(query, observe)
+                else:
+                    result = self._timed(query, observe)
+            except Exception as e:
+                if not is_transient(e):
+                    breaker.success()       # the database answered
+                    raise
+                breaker.failure()
+                if attempt + 1 == attempts:
+                    raise
+                self.retried += 1
+                delay = min(self.backoff_max, self.backoff * 2 ** attempt)
+                self.sleep(random.uniform(0, delay))
+                continue
+            breaker.success()
+            return result
+
+    def stats(self):
+        return {
+            "retried": self.retried,
+            "hedged": self.hedged,
+            "single_flight": self.flights.stats(),
+            "breakers": {key: b.stats() for key, b in sorted(self.breakers.items())},
+        }
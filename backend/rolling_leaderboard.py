@@ -0,0 +1,261 @@
+"""
+===============================================================================
+ File: rolling_leaderboard.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Rolling daily / weekly recipe leaderboards ranked by likes received
+     in the window, not by all-time likes of recipes posted in it.
+
+     Likes are counted per recipe per hour in recipe_like_hours (written
+     by the like counter fold, see migrations/005_recipe_like_hours.sql).
+     Each backend keeps the last ROLLING_HOURS hourly buckets in a ring
+     buffer, with a running per-recipe total for every window (24 h and
+     168 h). When the hour turns, the bucket leaving a window is
+     subtracted from that window's totals.
+
+     Each window also keeps its top LEADERBOARD_TOP_K recipes as a sorted
+     list, updated as likes arrive: a recipe whose total rises is moved
+     up or enters the list in O(K). Only when a listed recipe loses likes
+     (its bucket expired, or likes were removed) is the list rebuilt from
+     the totals, lazily on the next read. Reads slice the list: O(K).
+
+     A background poll re-reads the buckets of the current and previous
+     hour every LEADERBOARD_POLL_INTERVAL seconds; bucket counts are
+     absolute, so re-reading is idempotent.
+
+ Configuration (environment):
+     LEADERBOARD_TOP_K            Recipes ranked per window         [1000]
+                                  (at least LEADERBOARD_SIZE)
+     LEADERBOARD_POLL_INTERVAL    Seconds between bucket polls        [10]
+===============================================================================
+"""
+
+import bisect
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+
+LEADERBOARD_TOP_K = int(os.getenv("LEADERBOARD_TOP_K", "1000"))
+LEADERBOARD_POLL_INTERVAL = float(os.getenv("LEADERBOARD_POLL_INTERVAL", "10"))
+
+# Ring size: one week of hourly buckets
+ROLLING_HOURS = 168
+
+# Window name → hours
+WINDOWS = {"daily": 24, "weekly": 168}
+
+
+def hour_of(value):
+    """Hours since the epoch for a timestamp (epoch seconds or ISO string)."""
+    if isinstance(value, (int, float)):
+        return int(value // 3600)
+    ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() // 3600)
+
+
+class _Window:
+    """Running totals and incrementally maintained top-K for one window."""
+
+    def __init__(self, hours, k):
+        self.hours = hours
+        self.k = k
+        self.totals = {}
+        self.top = []           # sorted [(-likes, recipeid)]
+        self.ranked = {}        # recipeid → likes, for entries in self.top
+        self.dirty = False
+
+    def add(self, recipe_id, delta):
+        total = self.totals.get(recipe_id, 0) + delta
+        if total > 0:
+            self.totals[recipe_id] = total
+        else:
+            self.totals.pop(recipe_id, None)
+
+        if delta < 0:
+            # Something outside the list may now outrank this recipe
+            if recipe_id in self.ranked:
+                self.dirty = True
+            return
+        if self.dirty:
+            return
+        if recipe_id in self.ranked:
+            self.top.remove((-self.ranked[recipe_id], recipe_id))
+        elif len(self.top) >= self.k and (-total, recipe_id) >= self.top[-1]:
+            return
+        bisect.insort(self.top, (-total, recipe_id))
+        self.ranked[recipe_id] = total
+        if len(self.top) > self.k:
+            _, dropped = self.top.pop()
+            del self.ranked[dropped]
+
+    def rebuild(self):
+        best = heapq.nsmallest(self.k, ((-n, rid) for rid, n in self.totals.items()))
+        self.top = best
+        self.ranked = {rid: -n for n, rid in best}
+        self.dirty = False
+
+    def clear(self):
+        self.totals.clear()
+        self.top, self.ranked, self.dirty = [], {}, False
+
+
+class RollingLeaderboard:
+    """
+    Hourly like buckets in a ring buffer with per-window top-K.
+
+    Args:
+        db (DBCaller | None): Supabase wrapper for load() / poll().
+        k (int): Recipes ranked per window (largest servable limit).
+        clock (callable): Current time in epoch seconds.
+    """
+
+    def __init__(self, db=None, k=LEADERBOARD_TOP_K, interval=LEADERBOARD_POLL_INTERVAL,
+                 clock=time.time, page_size=1000):
+        self.db = db
+        self.k = k
+        self.interval = interval
+        self.clock = clock
+        self.page_size = page_size
+        self.ready = False
+        self.last_poll = None
+        self._buckets = [{} for _ in range(ROLLING_HOURS)]
+        self._bucket_hour = [None] * ROLLING_HOURS
+        self._windows = {name: _Window(hours, k) for name, hours in WINDOWS.items()}
+        self._hour = hour_of(clock())
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ---------- time ----------
+
+    def _advance(self, hour):
+        """Move the current hour forward, expiring buckets that leave a window."""
+        if hour <= self._hour:
+            return
+        if hour - self._hour >= ROLLING_HOURS:
+            for window in self._windows.values():
+                window.clear()
+            self._buckets = [{} for _ in range(ROLLING_HOURS)]
+            self._bucket_hour = [None] * ROLLING_HOURS
+            self._hour = hour
+            return
+        for current in range(self._hour + 1, hour + 1):
+            for window in self._windows.values():
+                leaving = current - window.hours
+                slot = leaving % ROLLING_HOURS
+                if self._bucket_hour[slot] == leaving:
+                    for recipe_id, likes in self._buckets[slot].items():
+                        window.add(recipe_id, -likes)
+            # The slot for `current` last held hour current - ROLLING_HOURS
+            slot = current % ROLLING_HOURS
+            self._buckets[slot] = {}
+            self._bucket_hour[slot] = current
+        self._hour = hour
+
+    # ---------- updates ----------
+
+    def _apply(self, hour, recipe_id, delta):
+        if not delta or hour <= self._hour - ROLLING_HOURS or hour > self._hour:
+            return
+        slot = hour % ROLLING_HOURS
+        if self._bucket_hour[slot] != hour:
+            self._buckets[slot] = {}
+            self._bucket_hour[slot] = hour
+        bucket = self._buckets[slot]
+        bucket[recipe_id] = bucket.get(recipe_id, 0) + delta
+        for window in self._windows.values():
+            if hour > self._hour - window.hours:
+                window.add(recipe_id, delta)
+
+    def record(self, recipe_id, delta=1, at=None):
+        """Count `delta` likes for `recipe_id` at time `at` (now by default)."""
+        with self._lock:
+            self._advance(hour_of(self.clock()))
+            self._apply(hour_of(self.clock() if at is None else at), recipe_id, delta)
+
+    def set_bucket(self, hour, recipe_id, likes):
+        """Set the absolute like count of one (hour, recipe) bucket."""
+        with self._lock:
+            self._advance(hour_of(self.clock()))
+            slot = hour % ROLLING_HOURS
+            current = self._buckets[slot].get(recipe_id, 0) if self._bucket_hour[slot] == hour else 0
+            self._apply(hour, recipe_id, likes - current)
+
+    # ---------- reads ----------
+
+    def top(self, window, limit):
+        """[(recipeid, likes)] of the best `limit` (≤ k) recipes in the window."""
+        with self._lock:
+            self._advance(hour_of(self.clock()))
+            board = self._windows[window]
+            if board.dirty:
+                board.rebuild()
+            return [(rid, -n) for n, rid in board.top[:limit]]
+
+    # ---------- database ----------
+
+    def _rows(self, since_hour):
+        since = datetime.fromtimestamp(since_hour * 3600, timezone.utc).isoformat()
+        start = 0
+        while True:
+            page = (
+                self.db.table("recipe_like_hours")
+                .select("hour, recipeid, likes")
+                .gte("hour", since)
+                .order("hour")
+                .range(start, start + self.page_size - 1)
+                .execute(observe=False)
+            ).data or []
+            yield from page
+            if len(page) < self.page_size:
+                return
+            start += self.page_size
+
+    def _load_rows(self, since_hour):
+        count = 0
+        for row in self._rows(since_hour):
+            self.set_bucket(hour_of(row["hour"]), row["recipeid"], row.get("likes") or 0)
+            count += 1
+        self.last_poll = time.time()
+        return count
+
+    def load(self):
+        """Read the last week of buckets; returns rows read."""
+        count = self._load_rows(hour_of(self.clock()) - ROLLING_HOURS + 1)
+        self.ready = True
+        return count
+
+    def poll(self):
+        """Re-read the current and previous hour's buckets."""
+        return self._load_rows(hour_of(self.clock()) - 1)
+
+    def run(self):
+        """Load, then poll; call from a daemon thread."""
+        while not self.ready and not self._stop.is_set():
+            try:
+                count = self.load()
+                print(f"[INDEX] Loaded {count} hourly like buckets")
+            except Exception as e:
+                print("[WARN] Rolling leaderboard not loaded:", e)
+                self._stop.wait(self.interval)
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print("[WARN] Rolling leaderboard poll failed:", e)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "last_poll": self.last_poll,
+            "recipes": {name: len(w.totals) for name, w in self._windows.items()},
+        }
@@ -0,0 +1,261 @@
+"""
+===============================================================================
+ File: search_index.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Inverted index behind GET /search.
+     Provides:
+         - SearchIndex: normalized ingredient tokens → sorted recipe-id
+           posting lists, plus allergen postings that mirror
+           RecipeUtility.filter_recipes_by_allergens (dietaryrestrictions
+           and ingredients, whole tokens)
+         - parse_query: "chicken, garlic, no dairy" → include/exclude terms
+
+     "Must include" terms are answered by intersecting sorted posting lists
+     (smallest first); "must exclude" and allergen terms subtract the union
+     of their postings. GET /search asks for one page (page()): the
+     matches are walked newest first only until the page is full, and the
+     total comes from the banned count, so no query scans the catalog.
+
+     Ingredient postings hold both the whole normalized ingredient and its
+     words ("chicken breast" → "chicken breast", "chicken", "breast") so a
+     search for "chicken" finds it.
+
+     Subscribes to RecipeCatalog (see catalog.py).
+===============================================================================
+"""
+
+import bisect
+import threading
+
+from recipe_utility import RecipeUtility
+
+
+def _intersect(a, b):
+    """Intersection of two ascending id lists."""
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            out.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def _contains(ids, recipe_id):
+    """Whether ascending id list `ids` holds `recipe_id`."""
+    pos = bisect.bisect_left(ids, recipe_id)
+    return pos < len(ids) and ids[pos] == recipe_id
+
+
+class SearchIndex:
+    """
+    Ingredient and allergen inverted index over the recipe catalog.
+
+    Posting lists are kept sorted so intersections are linear merges.
+    """
+
+    def __init__(self):
+        self._util = RecipeUtility()
+        self._ingredients = {}   # token → sorted [recipeid]
+        self._allergens = {}     # token → sorted [recipeid]
+        self._all_ids = []       # sorted [recipeid]
+        self._doc_tokens = {}    # recipeid → (ingredient tokens, allergen tokens)
+        self._lock = threading.RLock()
+
+    # ---------- tokenizing ----------
+
+    def normalize(self, term):
+        return self._util._norm_token(str(term))
+
+    def _tokens(self, recipe):
+        whole = self._util._norm_set(recipe.get("ingredients")) - {""}
+        ingredient_tokens = set(whole)
+        for token in whole:
+            ingredient_tokens.update(token.split())
+        allergen_tokens = whole | (self._util._norm_set(recipe.get("dietaryrestrictions")) - {""})
+        return frozenset(ingredient_tokens), frozenset(allergen_tokens)
+
+    # ---------- posting maintenance ----------
+
+    @staticmethod
+    def _insert(postings, token, recipe_id):
+        posting = postings.setdefault(token, [])
+        pos = bisect.bisect_left(posting, recipe_id)
+        if pos == len(posting) or posting[pos] != recipe_id:
+            posting.insert(pos, recipe_id)
+
+    @staticmethod
+    def _delete(postings, token, recipe_id):
+        posting = postings.get(token)
+        if not posting:
+            return
+        pos = bisect.bisect_left(posting, recipe_id)
+        if pos < len(posting) and posting[pos] == recipe_id:
+            posting.pop(pos)
+        if not posting:
+            del postings[token]
+
+    def _add(self, recipe_id, tokens):
+        ingredient_tokens, allergen_tokens = tokens
+        self._doc_tokens[recipe_id] = tokens
+        for token in ingredient_tokens:
+            self._insert(self._ingredients, token, recipe_id)
+        for token in allergen_tokens:
+            self._insert(self._allergens, token, recipe_id)
+        pos = bisect.bisect_left(self._all_ids, recipe_id)
+        if pos == len(self._all_ids) or self._all_ids[pos] != recipe_id:
+            self._all_ids.insert(pos, recipe_id)
+
+    def _drop(self, recipe_id):
+        tokens = self._doc_tokens.pop(recipe_id, None)
+        if tokens is None:
+            return
+        ingredient_tokens, allergen_tokens = tokens
+        for token in ingredient_tokens:
+            self._delete(self._ingredients, token, recipe_id)
+        for token in allergen_tokens:
+            self._delete(self._allergens, token, recipe_id)
+        pos = bisect.bisect_left(self._all_ids, recipe_id)
+        if pos < len(self._all_ids) and self._all_ids[pos] == recipe_id:
+            self._all_ids.pop(pos)
+
+    # ---------- catalog listener ----------
+
+    def reset(self, rows):
+        ingredients, allergens, doc_tokens = {}, {}, {}
+        for row in sorted(rows, key=lambda r: r["recipeid"]):
+            rid = row["recipeid"]
+            tokens = self._tokens(row)
+            doc_tokens[rid] = tokens
+            for token in tokens[0]:
+                ingredients.setdefault(token, []).append(rid)
+            for token in tokens[1]:
+                allergens.setdefault(token, []).append(rid)
+        with self._lock:
+            self._ingredients, self._allergens, self._doc_tokens = ingredients, allergens, doc_tokens
+            self._all_ids = sorted(doc_tokens)
+
+    def upsert(self, row):
+        tokens = self._tokens(row)
+        with self._lock:
+            if self._doc_tokens.get(row["recipeid"]) == tokens:
+                return
+            self._drop(row["recipeid"])
+            self._add(row["recipeid"], tokens)
+
+    def remove(self, recipe_id):
+        with self._lock:
+            self._drop(recipe_id)
+
+    # ---------- queries ----------
+
+    def _normalized(self, terms):
+        return {self.normalize(t) for t in terms} - {""}
+
+    def _candidates(self, include):
+        """Ascending ids holding every `include` token (all ids if none); do not mutate."""
+        if not include:
+            return self._all_ids
+        postings = [self._ingredients.get(t, []) for t in include]
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not result:
+                break
+            result = _intersect(result, posting)
+        return result
+
+    def _banned(self, exclude, allergens):
+        banned = set()
+        for token in exclude:
+            banned.update(self._ingredients.get(token, ()))
+            banned.update(self._allergens.get(token, ()))
+        for token in allergens:
+            banned.update(self._allergens.get(token, ()))
+        return banned
+
+    def search(self, include=(), exclude=(), allergens=()):
+        """
+        Recipe ids matching every `include` term and none of the `exclude`
+        or `allergens` terms, in ascending id order.
+
+        Args:
+            include (Iterable[str]): Ingredient terms that must all appear.
+            exclude (Iterable[str]): Ingredient/restriction terms to avoid.
+            allergens (Iterable[str]): User allergens (same matching as
+                RecipeUtility.filter_recipes_by_allergens).
+        """
+        with self._lock:
+            result = self._candidates(self._normalized(include))
+            banned = self._banned(self._normalized(exclude), self._normalized(allergens))
+            return [rid for rid in result if rid not in banned]
+
+    def page(self, include=(), exclude=(), allergens=(), limit=20, offset=0):
+        """
+        One page of search() results, newest (highest id) first, plus the
+        number of matches.
+
+        Candidates are walked from the end and the walk stops after
+        offset + limit matches; the total is the candidate count less the
+        banned candidates, so an exclude- or allergen-only query does not
+        copy the catalog.
+
+        Returns:
+            tuple[list[int], int]: (page ids, total matches).
+        """
+        with self._lock:
+            result = self._candidates(self._normalized(include))
+            banned = self._banned(self._normalized(exclude), self._normalized(allergens))
+
+            if result is self._all_ids:
+                hidden = len(banned)     # postings only hold indexed ids
+            elif len(banned) < len(result):
+                hidden = sum(1 for rid in banned if _contains(result, rid))
+            else:
+                hidden = sum(1 for rid in result if rid in banned)
+
+            ids = []
+            skip = offset
+            for rid in reversed(result):
+                if len(ids) >= limit:
+                    break
+                if rid in banned:
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                ids.append(rid)
+            return ids, len(result) - hidden
+
+    def __len__(self):
+        return len(self._all_ids)
+
+
+def parse_query(q):
+    """
+    Split a free-text query into include/exclude terms.
+
+    Terms are comma-separated; a term prefixed with "no ", "without " or
+    "-" is an exclusion.  "chicken, garlic, no dairy" →
+    (["chicken", "garlic"], ["dairy"]).
+    """
+    include, exclude = [], []
+    for raw in (q or "").split(","):
+        term = raw.strip()
+        lowered = term.lower()
+        for prefix in ("no ", "without ", "-"):
+            if lowered.startswith(prefix):
+                exclude.append(term[len(prefix):].strip())
+                break
+        else:
+            if term:
+                include.append(term)
+    return include, exclude
@@ -0,0 +1,275 @@
+"""
+===============================================================================
+ File: services.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Lazily constructed clients, services and in-memory indexes used by the
+     routes in app.py (one Services instance per app, see create_app).
+
+     Nothing is built at import time. The Supabase client (and the
+     supabase package itself, the slowest import in the backend) is
+     created on first use, so importing app.py or any service module needs
+     no network setup, and worker spawn stays cheap. Tests can pass their
+     own client: Services(supabase=MagicMock()).
+
+     start() launches the background warm-up (username index, recipe
+     catalog) followed by the recipe delta sync, the feed-queue refill
+     worker, the like counter fold, the rolling leaderboard poll, the
+     precomputed leaderboard refresh and the recipe_neighbors reload.
+===============================================================================
+"""
+
+import os
+import threading
+
+
+def lazy(build):
+    """Property that runs `build(self)` once, on first access, under the instance lock."""
+    name = build.__name__
+
+    def get(self):
+        try:
+            return self._built[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = build(self)
+            return self._built[name]
+
+    return property(get, doc=build.__doc__)
+
+
+class Services:
+    """
+    Container for the backend's shared objects, each built on first access.
+
+    Attributes (all lazy):
+        supabase, db, catalog, similarity_index, search_index,
+        autocomplete_index, recipe_sync, recipes, utility, leaderboards,
+        users, like_counters, rolling_leaderboard, recipe_neighbors,
+        feed_queues, admission
+    """
+
+    def __init__(self, supabase=None):
+        self._built = {}
+        self._lock = threading.RLock()
+        if supabase is not None:
+            self._built["supabase"] = supabase
+
+    # ---------- clients ----------
+
+    @lazy
+    def supabase(self):
+        """Supabase client from SUPABASE_URL / SUPABASE_KEY."""
+        from supabase import create_client
+        return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    @lazy
+    def db(self):
+        """
+        Retrying, circuit-breaking wrapper shared by the services; the
+        latency of its request-path calls drives write load shedding
+        (bulk and background reads run with observe=False).
+        """
+        from resilience import DBCaller
+        return DBCaller(self.supabase, observers=[self.admission.observe])
+
+    # ---------- catalog & indexes ----------
+
+    @lazy
+    def catalog(self):
+        """In-memory recipe catalog; indexes subscribe and follow every recipe write."""
+        from catalog import RecipeCatalog
+        catalog = RecipeCatalog(self.supabase)
+        catalog.subscribe(self.similarity_index)
+        catalog.subscribe(self.search_index)
+        catalog.subscribe(self.autocomplete_index)
+        return catalog
+
+    @lazy
+    def similarity_index(self):
+        from similarity_index import SimilarityIndex
+        return SimilarityIndex()
+
+    @lazy
+    def search_index(self):
+        from search_index import SearchIndex
+        return SearchIndex()
+
+    @lazy
+    def autocomplete_index(self):
+        from autocomplete import AutocompleteIndex
+        return AutocompleteIndex()
+
+    @lazy
+    def recipe_sync(self):
+        """Delta sync of recipes_public into the catalog and the recipe cache."""
+        from recipe_sync import RecipeSync
+        return RecipeSync(self.catalog, self.supabase, caches=[self.recipes.cache])
+
+    # ---------- services ----------
+
+    @lazy
+    def recipes(self):
+        from recipe_service import RecipeService
+        return RecipeService(
+            self.supabase, catalog=self.catalog, db=self.db, on_unseen=self._on_unseen_added
+        )
+
+    def _on_unseen_added(self, user_id):
+        # create_recipe wrote unseen_recipes directly; the cached profile is stale
+        self.users.profiles.pop(user_id)
+
+    @lazy
+    def utility(self):
+        from recipe_utility import RecipeUtility
+        return RecipeUtility(self.supabase, db=self.db)
+
+    @lazy
+    def leaderboards(self):
+        from leaderboard_service import LeaderboardService
+        return LeaderboardService(
+            self.supabase, db=self.db, rolling=self.rolling_leaderboard, catalog=self.catalog
+        )
+
+    @lazy
+    def rolling_leaderboard(self):
+        """Hourly like buckets behind the daily/weekly leaderboards."""
+        from rolling_leaderboard import RollingLeaderboard
+        return RollingLeaderboard(self.db)
+
+    @lazy
+    def users(self):
+        from user_service import UserService
+        return UserService(
+            self.supabase, db=self.db, counters=self.like_counters, catalog=self.catalog
+        )
+
+    @lazy
+    def like_counters(self):
+        """Sharded recipe/author like counters, folded into likes / total_likes."""
+        from like_counters import LikeCounters
+        return LikeCounters(self.db, on_fold=self._on_like_fold)
+
+    def _on_like_fold(self, rows):
+        # Folded counts reach the catalog through the recipe sync; drop the
+        # per-row caches so direct reads see them now. This worker's rolling
+        # leaderboard counts them at once; others pick them up on their poll.
+        for row in rows:
+            if row["kind"] == "recipe":
+                self.recipes.cache.pop(int(row["key"]))
+                self.rolling_leaderboard.record(int(row["key"]), row["delta"])
+            else:
+                self.users.profiles.pop(row["key"])
+
+    @lazy
+    def admission(self):
+        """Token buckets and load shedding in front of the write routes."""
+        from admission import AdmissionControl
+        return AdmissionControl()
+
+    # ---------- feed ----------
+
+    @lazy
+    def recipe_neighbors(self):
+        """Nightly co-like neighbors (item_neighbors.py), used in feed ranking."""
+        from recipe_neighbors import RecipeNeighbors
+        return RecipeNeighbors(self.db)
+
+    def compute_feed(self, user, limit):
+        """Rank `user`'s feed live, boosted by the recipes their likes are co-liked with."""
+        liked = self.utility._as_list(user.get("liked_recipes"))
+        co_likes = self.recipe_neighbors.co_likes(liked)
+        recipes, max_likes = self.feed_recipes(user, limit, co_likes)
+        return self.utility.generate_user_feed(
+            recipes, user, limit=limit, co_likes=co_likes, max_likes=max_likes,
+        )
+
+    def feed_recipes(self, user, limit=None, co_likes=None):
+        """
+        Rows the feed needs for `user`, and the popularity scale to rank
+        them by (None: from the rows).
+
+        From the in-memory catalog once loaded: the allergen-safe unseen
+        recipes that can make the top `limit` (with a shared snapshot these
+        are picked from its columns, so only they are decoded), plus the
+        liked recipes when the profile has no stored affinity. Else every
+        recipe from the DB.
+        """
+        if not self.catalog.ready:
+            return self.supabase.table("recipes_public").select("*").execute().data or [], None
+
+        unseen = self.utility._as_list(user.get("unseen_recipes"))
+        rows = []
+        stored = user.get("affinity") or {}
+        if not (stored.get("category") or stored.get("ingredient")):
+            # user_affinity() falls back to scanning the liked rows
+            liked = set(self.utility._as_list(user.get("liked_recipes"))) - set(unseen)
+            rows = [row for row in map(self.catalog.get, liked) if row is not None]
+
+        slack = self.utility.feed_slack(self.utility.user_affinity(rows, user), co_likes or {})
+        candidates, max_likes = self.catalog.feed_candidates(
+            unseen, self.utility._as_list(user.get("allergens")), limit, self.utility, slack,
+        )
+        return candidates + rows, max_likes
+
+    def _load_feed_user(self, user_id):
+        result, status = self.users.get_user(user_id)
+        return result["data"][0] if status == 200 else None
+
+    @lazy
+    def feed_queues(self):
+        """Precomputed per-user feeds; dropped on recipe writes and allergen changes."""
+        from feed_queue import FeedQueues
+        queues = FeedQueues(
+            compute=self.compute_feed,
+            load_user=self._load_feed_user,
+            get_recipe=self.catalog.get,
+            as_list=self.utility._as_list,
+        )
+        self.catalog.subscribe(queues)
+        return queues
+
+    # ---------- background work ----------
+
+    def warm(self):
+        """Load the username index and recipe catalog; until ready, routes fall back or 503."""
+        try:
+            count = self.users.load_usernames()
+            print(f"[INDEX] Loaded {count} usernames")
+        except Exception as e:
+            print("[WARN] Username index not loaded:", e)
+
+        try:
+            from catalog_snapshot import CATALOG_SNAPSHOT, SnapshotManager
+            if CATALOG_SNAPSHOT:
+                # Shared across worker processes via a memory-mapped snapshot
+                snapshots = SnapshotManager(self.catalog)
+                count = snapshots.warm()
+                threading.Thread(target=snapshots.run, daemon=True).start()
+            else:
+                count = self.catalog.load()
+            print(f"[INDEX] Loaded {count} recipes into the catalog")
+        except Exception as e:
+            print("[WARN] Recipe catalog not loaded:", e)
+
+    def _warm_then_sync(self):
+        self.warm()
+        self.recipe_sync.run()
+
+    def start(self):
+        """
+        Run warm(), the recipe sync, the username sync, the feed-queue
+        refill worker, the like counter fold, the rolling leaderboard poll, the leaderboard
+        refresh and the recipe neighbor reload on daemon threads.
+        """
+        threading.Thread(target=self._warm_then_sync, daemon=True).start()
+        threading.Thread(target=lambda: self.users.run(), daemon=True).start()
+        threading.Thread(target=lambda: self.feed_queues.run(), daemon=True).start()
+        threading.Thread(target=lambda: self.like_counters.run(), daemon=True).start()
+        threading.Thread(target=lambda: self.rolling_leaderboard.run(), daemon=True).start()
+        threading.Thread(target=lambda: self.leaderboards.run(), daemon=True).start()
+        threading.Thread(target=lambda: self.recipe_neighbors.run(), daemon=True).start()
@@ -0,0 +1,210 @@
+"""
+===============================================================================
+ File: similarity_index.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     "More like this" index behind GET /recipes/<id>/similar.
+
+     Each recipe is a sparse TF-IDF vector over its normalized ingredients
+     and category (tokens from RecipeUtility._norm_token, binary tf).
+     Similarity is cosine. Candidates come from an inverted index
+     (term → recipe ids), so only recipes sharing a term are scored.
+     Terms in more than SIMILAR_MAX_DF recipes (e.g. "cat:dinner") still
+     count towards scores but do not generate candidates, so scoring one
+     recipe costs O(rare postings) rather than O(df) per common term.
+
+     A full load (reset) only rebuilds the term sets and posting lists;
+     the top-K neighbors of every recipe are then precomputed on a
+     background thread, outside the catalog's lock, taking this index's
+     lock one recipe at a time. A query for a recipe not yet reached is
+     computed on demand.
+
+     When a recipe is created, edited or deleted, only that recipe and the
+     recipes sharing a term with its old or new version are marked stale;
+     their lists are recomputed on next query. Other lists are recomputed
+     on read once the catalog size has moved by more than
+     SIMILAR_IDF_DRIFT since they were scored, as every IDF weight depends
+     on it. Queries are answered from memory.
+
+     Subscribes to RecipeCatalog (see catalog.py).
+===============================================================================
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+
+from recipe_utility import RecipeUtility
+
+
+# Neighbors precomputed per recipe
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "50"))
+# Terms in more recipes than this are not used to generate candidates
+SIMILAR_MAX_DF = int(os.getenv("SIMILAR_MAX_DF", "1000"))
+# Relative catalog size change after which a neighbor list is rescored
+SIMILAR_IDF_DRIFT = float(os.getenv("SIMILAR_IDF_DRIFT", "0.1"))
+
+
+class SimilarityIndex:
+    """
+    Precomputed nearest neighbors over ingredient/category TF-IDF vectors.
+
+    Attributes:
+        top_k (int): Neighbors stored per recipe.
+        max_df (int): Posting lists longer than this generate no candidates.
+        idf_drift (float): Catalog size change that makes a list stale.
+        background (bool): Precompute after reset() on a thread (else inline).
+    """
+
+    def __init__(self, top_k=SIMILAR_TOP_K, max_df=SIMILAR_MAX_DF,
+                 idf_drift=SIMILAR_IDF_DRIFT, background=True):
+        self.top_k = top_k
+        self.max_df = max_df
+        self.idf_drift = idf_drift
+        self.background = background
+        self._util = RecipeUtility()
+        self._terms = {}       # recipeid → frozenset of terms
+        self._postings = {}    # term → set of recipeids
+        self._neighbors = {}   # recipeid → [(score, recipeid), ...] best first
+        self._scored_at = {}   # recipeid → catalog size its list was scored at
+        self._dirty = set()
+        self._generation = 0   # bumped by reset(); stops an older precompute
+        self._lock = threading.RLock()
+
+    # ---------- vectors ----------
+
+    def terms_for(self, recipe):
+        """Normalized `cat:` and `ing:` terms of a recipe row."""
+        terms = {f"ing:{t}" for t in self._util._norm_set(recipe.get("ingredients")) if t}
+        category = self._util._norm_token(str(recipe.get("category") or ""))
+        if category:
+            terms.add(f"cat:{category}")
+        return frozenset(terms)
+
+    def _idf(self, term):
+        n = len(self._terms)
+        df = len(self._postings.get(term, ()))
+        return math.log((1 + n) / (1 + df)) + 1.0
+
+    def _norm(self, terms):
+        return math.sqrt(sum(self._idf(t) ** 2 for t in terms)) or 1.0
+
+    def _candidates(self, terms):
+        """Recipes sharing a term with `terms`, skipping very common terms."""
+        postings = sorted((self._postings.get(t, ()) for t in terms), key=len)
+        rare = [p for p in postings if len(p) <= self.max_df]
+        if not rare and postings:
+            # Only common terms: sample the rarest one, bounded
+            return set(itertools.islice(postings[0], self.max_df))
+        return set().union(*rare)
+
+    def _compute(self, recipe_id):
+        """Score the recipes sharing a (not too common) term with recipe_id; keep the top K."""
+        terms = self._terms[recipe_id]
+        weights = {t: self._idf(t) ** 2 for t in terms}
+        norm = math.sqrt(sum(weights.values())) or 1.0
+
+        scored = []
+        for other in self._candidates(terms):
+            if other == recipe_id:
+                continue
+            other_terms = self._terms[other]
+            dot = sum(weights[t] for t in terms & other_terms)
+            scored.append((dot / (norm * self._norm(other_terms)), other))
+        self._neighbors[recipe_id] = heapq.nlargest(self.top_k, scored)
+        self._scored_at[recipe_id] = len(self._terms)
+        self._dirty.discard(recipe_id)
+
+    def _stale(self, recipe_id):
+        if recipe_id in self._dirty or recipe_id not in self._neighbors:
+            return True
+        scored_at = self._scored_at.get(recipe_id) or 1
+        return abs(len(self._terms) - scored_at) > self.idf_drift * scored_at
+
+    def _mark_related(self, terms):
+        for term in terms:
+            self._dirty.update(self._postings.get(term, ()))
+
+    def _add_terms(self, recipe_id, terms):
+        self._terms[recipe_id] = terms
+        for term in terms:
+            self._postings.setdefault(term, set()).add(recipe_id)
+
+    def _drop_terms(self, recipe_id):
+        terms = self._terms.pop(recipe_id, frozenset())
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(recipe_id)
+                if not posting:
+                    del self._postings[term]
+        self._neighbors.pop(recipe_id, None)
+        self._scored_at.pop(recipe_id, None)
+        self._dirty.discard(recipe_id)
+        return terms
+
+    def _precompute(self, generation, recipe_ids):
+        """Score every recipe, one at a time under the lock, until the next reset()."""
+        for recipe_id in recipe_ids:
+            with self._lock:
+                if self._generation != generation:
+                    return
+                if recipe_id in self._terms and self._stale(recipe_id):
+                    self._compute(recipe_id)
+
+    # ---------- catalog listener ----------
+
+    def reset(self, rows):
+        """Rebuild the term index; neighbor lists are precomputed afterwards (see module docs)."""
+        terms = {row["recipeid"]: self.terms_for(row) for row in rows}
+        with self._lock:
+            self._terms, self._postings, self._neighbors, self._scored_at = {}, {}, {}, {}
+            self._dirty = set()
+            for recipe_id, recipe_terms in terms.items():
+                self._add_terms(recipe_id, recipe_terms)
+            self._generation += 1
+            args = (self._generation, list(terms))
+        if self.background:
+            threading.Thread(target=self._precompute, args=args, daemon=True).start()
+        else:
+            self._precompute(*args)
+
+    def upsert(self, row):
+        recipe_id = row["recipeid"]
+        new_terms = self.terms_for(row)
+        with self._lock:
+            old_terms = self._terms.get(recipe_id)
+            if old_terms == new_terms:
+                return
+            self._drop_terms(recipe_id)
+            self._mark_related(old_terms or ())
+            self._add_terms(recipe_id, new_terms)
+            self._mark_related(new_terms)
+
+    def remove(self, recipe_id):
+        with self._lock:
+            self._mark_related(self._drop_terms(recipe_id))
+
+    # ---------- queries ----------
+
+    def similar(self, recipe_id, limit=10):
+        """
+        Nearest neighbors of a recipe.
+
+        Returns:
+            list[tuple(int, float)] | None: (recipeid, cosine score) best
+            first, or None if the recipe is not indexed.
+        """
+        with self._lock:
+            if recipe_id not in self._terms:
+                return None
+            if self._stale(recipe_id):
+                self._compute(recipe_id)
+            return [(rid, round(score, 4)) for score, rid in self._neighbors[recipe_id][:limit]]
+
+    def __len__(self):
+        return len(self._terms)
@@ -0,0 +1,78 @@
+"""
+===============================================================================
+ File: singleflight.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     Single-flight call coalescing.
+
+     SingleFlight.do(key, fn) runs fn() once for all callers that ask for
+     the same key while it is running: the first caller (the leader) makes
+     the call, later ones wait and receive the leader's result, or its
+     exception. Once the call returns the key is forgotten, so nothing is
+     cached; the next request starts a new call.
+
+     Used for identical concurrent Supabase reads (a popular recipe, a
+     leaderboard page), where a cache expiry would otherwise send every
+     waiting request to the database at once.
+===============================================================================
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0          # calls actually made
+        self.coalesced = 0      # callers that shared another's call
+
+    def do(self, key, fn):
+        """
+        Return fn()'s result, sharing one in-flight call per key.
+
+        Raises:
+            Exception: Whatever fn() raised, in the leader and every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
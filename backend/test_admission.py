@@ -0,0 +1,133 @@
+"""
+File: test_admission.py
+Purpose: Unit tests for write admission control: token buckets, per-user
+         and global limits, latency-aware shedding, and the 429/503
+         responses with Retry-After on the write routes.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+import app
+from admission import AdmissionControl, TokenBucket
+from services import Services
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2, burst=3, now=0)
+        self.assertEqual([bucket.take(0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.take(0), 0.5)
+        self.assertEqual(bucket.take(0.5), 0)
+        # Never refills past the burst size
+        self.assertAlmostEqual(bucket.take(100) + bucket.tokens, 2)
+
+
+class AdmissionControlTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+
+    def control(self, **kwargs):
+        options = dict(per_user_rate=1, per_user_burst=2, global_rate=10, global_burst=3,
+                       shed_latency=0.5, clock=self.clock)
+        options.update(kwargs)
+        return AdmissionControl(**options)
+
+    def test_per_user_limit(self):
+        control = self.control()
+        self.assertEqual(control.admit("a"), (200, 0.0))
+        self.assertEqual(control.admit("a"), (200, 0.0))
+        status, retry_after = control.admit("a")
+        self.assertEqual((status, retry_after), (429, 1.0))
+        # Another user still has its own bucket
+        self.assertEqual(control.admit("b")[0], 200)
+        self.clock.now += 1
+        self.assertEqual(control.admit("a")[0], 200)
+
+    def test_global_limit_refunds_user_token(self):
+        control = self.control()
+        for user in "abc":
+            self.assertEqual(control.admit(user)[0], 200)
+        status, retry_after = control.admit("d")
+        self.assertEqual(status, 429)
+        self.assertAlmostEqual(retry_after, 0.1)
+        self.assertEqual(control._users["d"].tokens, 2)
+        self.assertEqual(control.stats()["limited"], 1)
+
+    def test_sheds_when_db_is_slow(self):
+        control = self.control(rand=lambda: 0.3)
+        control.observe(0.4)
+        self.assertEqual(control.shed_probability(), 0)
+        self.assertEqual(control.admit("a")[0], 200)
+
+        control.latency.value = 0.75        # halfway to twice the threshold
+        self.assertAlmostEqual(control.shed_probability(), 0.5)
+        self.assertEqual(control.admit("a"), (503, 1.0))
+
+        # Some writes always get through to measure recovery
+        control.latency.value = 5.0
+        self.assertEqual(control.shed_probability(), 0.9)
+        control.rand = lambda: 0.95
+        self.assertEqual(control.admit("a")[0], 200)
+
+    def test_idle_buckets_are_dropped(self):
+        control = self.control(max_users=2, global_burst=10)
+        for user in "abc":
+            control.admit(user)
+        self.assertEqual(list(control._users), ["b", "c"])
+
+
+class WriteRouteTests(unittest.TestCase):
+
+    def setUp(self):
+        self.services = Services(supabase=MagicMock())
+        self.services._built["admission"] = AdmissionControl(
+            per_user_rate=0.5, per_user_burst=1, global_rate=100, global_burst=100,
+            shed_latency=0.5,
+        )
+        self.users = self.services._built["users"] = MagicMock()
+        self.users.like_recipe.return_value = ({"message": "ok"}, 200)
+        self.client = app.create_app(self.services, warm=False).test_client()
+
+    def like(self, user_id):
+        return self.client.post("/user/like", json={
+            "user_id": user_id, "recipeid": 1, "author_id": "x",
+        })
+
+    def test_rate_limited_with_retry_after(self):
+        self.assertEqual(self.like("u1").status_code, 200)
+        response = self.like("u1")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "2")
+        self.assertEqual(self.users.like_recipe.call_count, 1)
+        self.assertEqual(self.like("u2").status_code, 200)
+
+    def test_db_latency_sheds_writes(self):
+        # Every Supabase call made through the services' DBCaller is timed
+        self.services.db.table("users_public").select("*").execute()
+        self.assertEqual(self.services.admission.latency.samples, 1)
+        self.services.admission.latency.value = 10
+        self.services.admission.rand = lambda: 0.0
+        response = self.like("u2")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "10")
+        self.assertEqual(self.services.admission.stats()["shed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+File: test_affinity.py
+Purpose: Unit tests for per-user affinity vectors: incremental swipe
+         updates, batch rebuilds, and their use in feed ranking.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is replaced by
+    memory_supabase.MemorySupabase, so no database is required.
+"""
+
+import unittest
+
+import affinity
+from memory_supabase import MemorySupabase
+from recipe_utility import RecipeUtility
+from user_service import UserService
+
+
+PASTA = {"recipeid": 1, "category": "Dinner", "ingredients": ["Garlic", "pasta"]}
+CAKE = {"recipeid": 2, "category": "dessert", "ingredients": ["flour", "sugar"]}
+
+
+class AffinityVectorTests(unittest.TestCase):
+
+    def test_like_then_unlike_cancels_out(self):
+        vec = affinity.apply_swipe(None, PASTA, affinity.LIKE_WEIGHT)
+        self.assertEqual(vec["category"], {"dinner": 1.0})
+        self.assertEqual(vec["ingredient"], {"garlic": 1.0, "pasta": 1.0})
+        undone = affinity.apply_swipe(vec, PASTA, -affinity.LIKE_WEIGHT)
+        self.assertEqual(undone, affinity.empty_vector())
+
+    def test_apply_swipe_does_not_mutate_input(self):
+        vec = affinity.apply_swipe(None, PASTA, 1.0)
+        affinity.apply_swipe(vec, PASTA, 1.0)
+        self.assertEqual(vec["category"], {"dinner": 1.0})
+
+    def test_batch_rebuild_matches_incremental(self):
+        incremental = affinity.apply_swipe(None, PASTA, affinity.LIKE_WEIGHT)
+        incremental = affinity.apply_swipe(incremental, CAKE, affinity.DISLIKE_WEIGHT)
+        rebuilt = affinity.build_vector({1: PASTA, 2: CAKE}, [1], [2])
+        self.assertEqual(rebuilt, incremental)
+
+    def test_stored_vector_drives_ranking(self):
+        utility = RecipeUtility(weights={"recency": 0, "popularity": 0})
+        user = {
+            "allergens": [],
+            "unseen_recipes": [1, 2],
+            "liked_recipes": [],
+            "affinity": {"category": {"dessert": 2.0, "dinner": -0.5}, "ingredient": {}},
+        }
+        feed = utility.generate_user_feed([PASTA, CAKE], user)
+        self.assertEqual([r["recipeid"] for r in feed], [2, 1])
+
+
+class SwipeUpdatesAffinityTests(unittest.TestCase):
+
+    def setUp(self):
+        self.db = MemorySupabase()
+        self.db.tables["users_public"].extend([
+            {"id": "u1", "liked_recipes": [], "disliked_recipes": [],
+             "unseen_recipes": [1], "total_likes": 0, "affinity": {}},
+            {"id": "a1", "total_likes": 0},
+        ])
+        self.db.tables["recipes_public"].append(dict(PASTA, likes=0))
+        self.service = UserService(self.db)
+
+    def test_like_updates_vector(self):
+        self.service.like_recipe("u1", 1, "a1")
+        user, _ = self.service.get_user("u1")
+        self.assertEqual(user["data"][0]["affinity"]["category"], {"dinner": 1.0})
+
+    def test_repeat_like_does_not_double_count(self):
+        self.service.like_recipe("u1", 1, "a1")
+        self.service.like_recipe("u1", 1, "a1")
+        user, _ = self.service.get_user("u1")
+        self.assertEqual(user["data"][0]["affinity"]["category"], {"dinner": 1.0})
+
+    def test_dislike_updates_vector(self):
+        self.service.dislike_recipe("u1", 1)
+        user, _ = self.service.get_user("u1")
+        self.assertEqual(user["data"][0]["affinity"]["category"], {"dinner": affinity.DISLIKE_WEIGHT})
+
+    def test_recipe_tokens_come_from_catalog(self):
+        from catalog import RecipeCatalog
+        catalog = RecipeCatalog()
+        catalog.load([dict(PASTA, likes=0)])
+        self.db.tables["recipes_public"].clear()
+        service = UserService(self.db, catalog=catalog)
+        service.dislike_recipe("u1", 1)
+        user, _ = service.get_user("u1")
+        self.assertEqual(user["data"][0]["affinity"]["category"], {"dinner": affinity.DISLIKE_WEIGHT})
+
+    def test_signup_leaves_affinity_to_column_default(self):
+        self.service.create_user("u2", "newcook", [], [])
+        self.assertNotIn("affinity", self.db.tables["users_public"][-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,9 +20,12 @@ Modifications:
 import unittest
 from recipe_service import RecipeService
 from supabase import create_client
+from dotenv import load_dotenv
 import os
 import io
 
+load_dotenv()
+
 class RecipeServiceDatabaseTest(unittest.TestCase):
 
     @classmethod
@@ -0,0 +1,61 @@
+"""
+File: test_app_factory.py
+Purpose: Unit tests for the application factory and lazily built services:
+         importing app.py needs no Supabase setup, services are built on
+         first use, and routes run against an injected (mocked) client.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import app
+from services import Services
+
+
+class AppFactoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.supabase = MagicMock()
+        self.services = Services(supabase=self.supabase)
+        self.client = app.create_app(self.services, warm=False).test_client()
+
+    def test_import_does_not_load_supabase(self):
+        env = {k: v for k, v in os.environ.items() if not k.startswith("SUPABASE_")}
+        out = subprocess.run(
+            [sys.executable, "-c", "import sys, app; print('supabase' in sys.modules)"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_services_are_built_on_first_use(self):
+        self.assertEqual(self.services._built, {"supabase": self.supabase})
+        recipes = self.services.recipes
+        self.assertIs(self.services.recipes, recipes)
+        self.assertIs(recipes.catalog, self.services.catalog)
+        self.assertNotIn("users", self.services._built)
+
+    def test_routes_use_injected_services(self):
+        self.assertEqual(self.client.get("/autocomplete?q=ch").status_code, 503)
+        self.services.catalog.load([{"recipeid": 1, "title": "Chili", "likes": 2}])
+        body = self.client.get("/autocomplete?q=ch").get_json()
+        self.assertEqual(body["data"][0]["text"], "Chili")
+
+    def test_apps_do_not_share_services(self):
+        other = Services(supabase=MagicMock())
+        other_client = app.create_app(other, warm=False).test_client()
+        other.catalog.load([])
+        self.assertEqual(other_client.get("/autocomplete?q=ch").status_code, 200)
+        self.assertEqual(self.client.get("/autocomplete?q=ch").status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+File: test_autocomplete.py
+Purpose: Unit tests for the type-ahead AutocompleteIndex: word-start
+         prefix matching, likes weighting and incremental updates.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. No database is needed;
+    the catalog is loaded from in-memory rows.
+"""
+
+import unittest
+
+from autocomplete import AutocompleteIndex
+from catalog import RecipeCatalog
+
+
+ROWS = [
+    {"recipeid": 1, "title": "Grilled Chicken Salad", "likes": 10, "ingredients": ["Chicken Breast", "Lettuce"]},
+    {"recipeid": 2, "title": "Chicken Curry", "likes": 30, "ingredients": ["chicken breast", "curry paste"]},
+    {"recipeid": 3, "title": "Chocolate Cake", "likes": 5, "ingredients": ["cocoa", "flour"]},
+]
+
+
+class AutocompleteIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = RecipeCatalog()
+        self.index = AutocompleteIndex()
+        self.catalog.subscribe(self.index)
+        self.catalog.load([dict(r) for r in ROWS])
+
+    def texts(self, prefix, **kwargs):
+        return [s["text"] for s in self.index.suggest(prefix, **kwargs)]
+
+    def test_matches_any_word_start(self):
+        self.assertIn("Grilled Chicken Salad", self.texts("chick"))
+        self.assertIn("chicken breast", self.texts("brea"))
+        self.assertEqual(self.texts("hicken"), [])
+
+    def test_ranked_by_likes(self):
+        # "chicken breast" is used by recipes with 10 + 30 likes
+        suggestions = self.index.suggest("chi")
+        self.assertEqual(suggestions[0]["text"], "chicken breast")
+        self.assertEqual(suggestions[0]["weight"], 40)
+        self.assertEqual(self.texts("chi", kind="title"), ["Chicken Curry", "Grilled Chicken Salad"])
+
+    def test_title_suggestion_points_at_recipe(self):
+        top = self.index.suggest("curry", kind="title")[0]
+        self.assertEqual(top["recipeid"], 2)
+
+    def test_limit_and_case_insensitive_prefix(self):
+        self.assertEqual(len(self.index.suggest("C", limit=2)), 2)
+        self.assertEqual(self.index.suggest("   "), [])
+
+    def test_new_recipe_is_suggested(self):
+        self.texts("pan")  # memoized empty result must not survive the write
+        self.catalog.upsert({"recipeid": 4, "title": "Pancakes", "likes": 1, "ingredients": ["flour"]})
+        self.assertEqual(self.texts("pan"), ["Pancakes"])
+
+    def test_edit_and_delete_update_weights(self):
+        self.catalog.upsert({"recipeid": 2, "likes": 0})
+        self.assertEqual(self.index.suggest("chicken b")[0]["weight"], 10)
+
+        self.catalog.remove(1)
+        self.catalog.remove(2)
+        self.assertEqual(self.texts("chicken"), [])
+        self.assertEqual(self.texts("flour"), ["flour"])
+
+
+    def test_likes_change_keeps_other_memoized_prefixes(self):
+        self.texts("cocoa")
+        self.catalog.upsert({"recipeid": 2, "likes": 31})
+        self.assertIsNotNone(self.index._memo.get("cocoa"))
+        self.assertIsNone(self.index._memo.get("curry"))
+
+
+class ShortPrefixTests(unittest.TestCase):
+
+    def test_maintained_lists_match_a_fresh_index(self):
+        import random
+        rng = random.Random(7)
+        words = ["apple", "apricot", "bean", "beef", "basil", "bread", "banana", "avocado"]
+        live = AutocompleteIndex(max_results=3)
+        rows = {}
+        for step in range(300):
+            rid = rng.randint(1, 12)
+            if rng.random() < 0.2:
+                rows.pop(rid, None)
+                live.remove(rid)
+            else:
+                row = {"recipeid": rid, "title": f"{rng.choice(words)} {rng.choice(words)}",
+                       "likes": rng.randint(0, 50), "ingredients": rng.sample(words, 2)}
+                rows[rid] = row
+                live.upsert(row)
+            fresh = AutocompleteIndex(max_results=3)
+            fresh.reset(list(rows.values()))
+            for prefix in ("a", "b", "ba", "ap", "be"):
+                for kind in (None, "title", "ingredient"):
+                    self.assertEqual(live.suggest(prefix, limit=3, kind=kind),
+                                     fresh.suggest(prefix, limit=3, kind=kind), (step, prefix, kind))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+"""
+File: test_catalog_snapshot.py
+Purpose: Unit tests for the memory-mapped columnar catalog snapshot: file
+         round trip, numeric columns and allergen masks, atomic
+         replacement, delta catch-up, and a RecipeCatalog layered over it
+         (remaps notify only changed rows and close old mappings), and the
+         column-based feed shortlist.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Snapshots are written to
+    a temporary directory; Supabase is mocked.
+"""
+
+import math
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from catalog import RecipeCatalog
+from catalog_snapshot import CatalogSnapshot, SnapshotManager, write_snapshot
+from recipe_utility import RecipeUtility
+from search_index import SearchIndex
+
+
+ROWS = [
+    {"recipeid": 3, "title": "Soup", "ingredients": ["leek"], "likes": 1,
+     "dietaryrestrictions": "['dairy']"},
+    {"recipeid": 1, "title": "Curry", "ingredients": ["chicken", "peanuts"], "likes": 4,
+     "datecreated": "2025-12-01T00:00:00Z", "photopath": None},
+    {"recipeid": 2, "title": "Salad", "ingredients": ["lettuce"], "likes": 0},
+]
+
+
+def mock_supabase(full_rows, delta_rows=()):
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value
+    query.order().range().execute.return_value.data = list(full_rows)
+    query.gt.return_value.order().range().execute.return_value.data = list(delta_rows)
+    return supabase
+
+
+class CatalogSnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "catalog.snap")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        write_snapshot(self.path, ROWS)
+        snap = CatalogSnapshot(self.path)
+        self.assertEqual(len(snap), 3)
+        self.assertEqual(snap.ids(), [1, 2, 3])
+        self.assertEqual(snap.get(1), ROWS[1])
+        self.assertEqual(snap.get(2), ROWS[2])  # missing fields stay missing
+        self.assertIsNone(snap.get(99))
+        self.assertIn(2, snap)
+        self.assertEqual([r["recipeid"] for r in snap.values()], [1, 2, 3])
+
+    def test_numeric_columns(self):
+        write_snapshot(self.path, ROWS)
+        snap = CatalogSnapshot(self.path)
+        self.assertEqual(snap.columns["likes"].tolist(), [4, 0, 1])
+        self.assertEqual(snap.columns["created"][0], 1764547200.0)
+        self.assertTrue(math.isnan(snap.columns["created"][1]))
+        self.assertEqual(snap.max_id(), 3)
+
+    def test_allergen_mask(self):
+        write_snapshot(self.path, ROWS)
+        snap = CatalogSnapshot(self.path)
+        self.assertEqual(snap.allergen_free_ids(["Peanut"]), [2, 3])
+        self.assertEqual(snap.allergen_free_ids(["peanut", "dairy"]), [2])
+        self.assertEqual(snap.allergen_free_ids(["dairy"], ids=[3, 2, 99]), [2])
+        self.assertIsNone(snap.allergen_free_ids(["kiwi"]))
+
+    def test_empty_snapshot(self):
+        write_snapshot(self.path, [])
+        snap = CatalogSnapshot(self.path)
+        self.assertEqual(len(snap), 0)
+        self.assertIsNone(snap.max_id())
+
+    def test_replace_keeps_old_mapping_readable(self):
+        write_snapshot(self.path, ROWS)
+        old = CatalogSnapshot(self.path)
+        write_snapshot(self.path, ROWS[:1])
+        new = CatalogSnapshot(self.path)
+        self.assertEqual(len(old), 3)
+        self.assertEqual(old.get(1)["title"], "Curry")
+        self.assertEqual(new.ids(), [3])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"x" * 64)
+        with self.assertRaises(ValueError):
+            CatalogSnapshot(self.path)
+
+    def test_catalog_over_snapshot(self):
+        write_snapshot(self.path, ROWS)
+        catalog = RecipeCatalog()
+        index = SearchIndex()
+        catalog.subscribe(index)
+        catalog.load_snapshot(CatalogSnapshot(self.path))
+
+        self.assertEqual(len(catalog), 3)
+        self.assertEqual(index.search(["chicken"]), [1])
+
+        catalog.upsert({"recipeid": 2, "title": "Green salad"})
+        catalog.upsert({"recipeid": 4, "title": "Toast", "ingredients": ["bread"]})
+        catalog.remove(3)
+        self.assertEqual(catalog.get(2)["ingredients"], ["lettuce"])
+        self.assertEqual(catalog.get(2)["title"], "Green salad")
+        self.assertIsNone(catalog.get(3))
+        self.assertNotIn(3, catalog)
+        self.assertEqual(len(catalog), 3)
+        self.assertEqual(sorted(r["recipeid"] for r in catalog.all()), [1, 2, 4])
+        self.assertEqual(index.search(["bread"]), [4])
+
+    def test_manager_writes_then_remaps(self):
+        catalog = RecipeCatalog(mock_supabase(ROWS), page_size=10)
+        manager = SnapshotManager(catalog, self.path, interval=0, poll=0)
+
+        self.assertEqual(manager.warm(), 3)
+        first = catalog.snapshot
+        self.assertIsNotNone(first)
+        self.assertFalse(manager.check())
+
+        write_snapshot(self.path, ROWS[:2], generation=first.generation + 1)
+        self.assertTrue(manager.check())
+        self.assertEqual(len(catalog), 2)
+
+    def test_cold_start_maps_existing_snapshot_and_catches_up(self):
+        write_snapshot(self.path, ROWS)
+        new = {"recipeid": 4, "title": "Toast", "ingredients": ["bread"]}
+        supabase = mock_supabase(full_rows=[], delta_rows=[new])
+        catalog = RecipeCatalog(supabase)
+        manager = SnapshotManager(catalog, self.path)
+        supabase.table.return_value.select.return_value.order.reset_mock()
+
+        self.assertEqual(manager.warm(), 4)
+        self.assertEqual(catalog.get(4)["title"], "Toast")
+        # Only the delta query ran; no full download
+        supabase.table.return_value.select.return_value.gt.assert_called_once_with("recipeid", 3)
+        supabase.table.return_value.select.return_value.order.assert_not_called()
+
+    def test_diff_and_close(self):
+        write_snapshot(self.path, ROWS)
+        old = CatalogSnapshot(self.path)
+        write_snapshot(self.path, [ROWS[0], {**ROWS[1], "likes": 5},
+                                   {"recipeid": 7, "title": "Toast"}])
+        new = CatalogSnapshot(self.path)
+        self.assertEqual(new.diff(old), ([1, 7], [2]))
+        self.assertEqual(new.diff(new), ([], []))
+        old.close()
+        self.assertTrue(old._mm.closed)
+        self.assertIsNone(old.get(1))
+
+    def test_remap_notifies_only_changed_rows(self):
+        rows = [{"recipeid": i, "title": f"Dish {i}", "likes": 0} for i in range(1, 11)]
+        write_snapshot(self.path, rows)
+        catalog = RecipeCatalog()
+        listener = MagicMock()
+        catalog.subscribe(listener)
+        first = CatalogSnapshot(self.path)
+        catalog.load_snapshot(first)
+        listener.reset.assert_called_once()
+        catalog.upsert({"recipeid": 4, "title": "Local edit"})
+        catalog.remove(5)
+        listener.reset_mock()
+
+        rows[1] = {**rows[1], "likes": 3}    # changed
+        del rows[2]                          # recipe 3 deleted
+        rows[3:4] = []                       # 5 stays deleted
+        write_snapshot(self.path, rows)
+        second = CatalogSnapshot(self.path)
+        catalog.load_snapshot(second)
+
+        listener.reset.assert_not_called()
+        self.assertEqual([c.args[0] for c in listener.remove.call_args_list], [3])
+        self.assertEqual([c.args[0]["recipeid"] for c in listener.upsert.call_args_list], [2, 4])
+        self.assertEqual(catalog.get(4)["title"], "Dish 4")
+        self.assertFalse(first._mm.closed)
+
+        write_snapshot(self.path, rows)
+        catalog.load_snapshot(CatalogSnapshot(self.path))
+        self.assertTrue(first._mm.closed)     # closed one remap later
+        self.assertFalse(second._mm.closed)
+
+    def test_feed_candidates_match_full_ranking(self):
+        rng = random.Random(7)
+        categories = ["soup", "salad", "curry"]
+        rows = [
+            {"recipeid": i, "title": f"Dish {i}", "category": rng.choice(categories),
+             "likes": int(rng.paretovariate(1.5)) - 1,
+             "datecreated": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T00:00:00Z",
+             "ingredients": rng.sample(["milk", "rice", "peanuts", "leek", "egg"], 2)}
+            for i in range(1, 301)
+        ]
+        write_snapshot(self.path, rows)
+        catalog = RecipeCatalog()
+        catalog.load_snapshot(CatalogSnapshot(self.path))
+        catalog.upsert({**rows[9], "likes": 60, "ingredients": ["rice"]})  # local row sets the scale
+        utility = RecipeUtility()
+        new_user = {"unseen_recipes": list(range(1, 301)), "allergens": ["peanut"]}
+        fan = {**new_user, "affinity": {"category": {"curry": 2, "soup": 1}}}
+
+        for user, most in ((new_user, 30), (fan, 300)):
+            slack = utility.feed_slack(utility.user_affinity([], user), {})
+            candidates, max_likes = catalog.feed_candidates(
+                user["unseen_recipes"], ["peanut"], 10, utility, slack)
+            self.assertEqual(max_likes, 60)
+            self.assertLess(len(candidates), most)
+            shortlisted = utility.generate_user_feed(candidates, user, limit=10, max_likes=max_likes)
+            full = utility.generate_user_feed(catalog.all(), user, limit=10)
+            self.assertEqual([r["recipeid"] for r in shortlisted], [r["recipeid"] for r in full])
+
+        # Allergen outside the mask: rows are decoded and filtered instead
+        self.assertIsNone(catalog.snapshot.feed_shortlist([1, 2], ["kiwi"], 1, utility, slack))
+        candidates, _ = catalog.feed_candidates([1, 2], ["kiwi"], 1, utility)
+        self.assertEqual(sorted(r["recipeid"] for r in candidates), [1, 2])
+
+    def test_second_manager_is_a_reader(self):
+        catalog = RecipeCatalog(MagicMock())
+        writer = SnapshotManager(catalog, self.path)
+        reader = SnapshotManager(RecipeCatalog(MagicMock()), self.path)
+        self.assertTrue(writer._is_writer())
+        self.assertFalse(reader._is_writer())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+File: test_compression.py
+Purpose: Unit tests for Accept-Encoding negotiated response compression,
+         including incremental compression of streamed JSON bodies.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Uses a throwaway Flask
+    app so no database or Supabase client is needed.
+"""
+
+import gzip
+import json
+import unittest
+
+from flask import Flask, jsonify
+
+import compression
+from compression import Compressor
+from etag import conditional_json, rows_etag
+from json_provider import FastJSONProvider
+
+
+ROWS = [{"recipeid": i, "title": f"Recipe {i}", "ingredients": ["flour"] * 5} for i in range(200)]
+
+
+def make_app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    Compressor(app, min_size=512)
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/big")
+    def big():
+        return jsonify({"data": ROWS})
+
+    @app.route("/stream")
+    def stream():
+        return conditional_json({"data": ROWS}, 200, rows_etag(ROWS), stream=True)
+
+    return app
+
+
+class CompressionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_gzip_when_accepted(self):
+        res = self.client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(res.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res.headers["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(res.data)), {"data": ROWS})
+
+    def test_identity_without_accept_encoding(self):
+        res = self.client.get("/big", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("Content-Encoding", res.headers)
+        self.assertEqual(res.get_json(), {"data": ROWS})
+
+    def test_small_bodies_are_not_compressed(self):
+        res = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", res.headers)
+
+    def test_streamed_body_is_compressed_incrementally(self):
+        res = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        self.assertTrue(res.is_streamed)
+        self.assertEqual(res.headers["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(res.get_data())), {"data": ROWS})
+
+    def test_encoded_etag_still_revalidates(self):
+        res = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        tag = res.headers["ETag"]
+        self.assertTrue(tag.endswith('-gzip"'))
+        again = self.client.get("/stream", headers={"Accept-Encoding": "gzip", "If-None-Match": tag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.headers["ETag"], tag)
+        self.assertIn("Accept-Encoding", again.headers["Vary"])
+
+    @unittest.skipIf(compression.brotli is None, "brotli not installed")
+    def test_brotli_preferred_when_available(self):
+        res = self.client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(res.headers["Content-Encoding"], "br")
+        self.assertEqual(json.loads(compression.brotli.decompress(res.data)), {"data": ROWS})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+File: test_etag.py
+Purpose: Unit tests for ETag computation and conditional GET handling.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Uses a throwaway Flask
+    app so no database or Supabase client is needed.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+import etag
+from etag import conditional_json, content_etag, row_etag, rows_etag
+
+
+class EtagTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.rows = [{"recipeid": 1, "likes": 3}, {"recipeid": 2, "likes": 0}]
+
+    def test_rows_etag_changes_with_content(self):
+        before = rows_etag(self.rows)
+        changed = [dict(self.rows[0], likes=4), self.rows[1]]
+        self.assertNotEqual(before, rows_etag(changed))
+        self.assertEqual(before, rows_etag([dict(r) for r in self.rows]))
+
+    def test_unchanged_rows_reuse_cached_digest(self):
+        row = {"recipeid": 99, "title": "Soup"}
+        first = row_etag(row)
+        with patch.object(etag, "content_digest", side_effect=AssertionError):
+            self.assertEqual(first, row_etag(dict(row)))
+
+    def test_matching_if_none_match_returns_304(self):
+        tag = content_etag({"leaderboard": []})
+        headers = {"If-None-Match": f'"{tag}"'}
+        with self.app.test_request_context(headers=headers):
+            response = conditional_json({"leaderboard": []}, 200, tag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+        self.assertEqual(response.get_etag(), (tag, False))
+
+    def test_stale_if_none_match_returns_body(self):
+        with self.app.test_request_context(headers={"If-None-Match": '"old"'}):
+            response = conditional_json({"data": self.rows}, 200, rows_etag(self.rows))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"data": self.rows})
+
+    def test_errors_carry_no_etag(self):
+        with self.app.test_request_context():
+            response, status = conditional_json({"error": "x"}, 404, None)
+        self.assertEqual(status, 404)
+        self.assertIsNone(response.headers.get("ETag"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+File: test_feed_queue.py
+Purpose: Unit tests for materialized per-user feed queues: serving from the
+         queue, skipping swiped recipes, live fallback, invalidation (only
+         on feed-relevant recipe changes) and the background refill of
+         active users.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. No database is needed;
+    recipes come from an in-memory RecipeCatalog.
+"""
+
+import unittest
+
+from catalog import RecipeCatalog
+from feed_queue import FeedQueues
+from recipe_utility import RecipeUtility
+
+
+ROWS = [
+    {"recipeid": i, "likes": i, "category": "dinner", "ingredients": ["rice"],
+     "dietaryrestrictions": ["peanut"] if i == 5 else []}
+    for i in range(1, 7)
+]
+
+
+class FeedQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.util = RecipeUtility(weights={"recency": 0, "affinity": 0, "ingredient": 0})
+        self.catalog = RecipeCatalog()
+        self.catalog.load([dict(r) for r in ROWS])
+        self.computes = 0
+        self.user = {"id": "u1", "allergens": [], "unseen_recipes": [1, 2, 3, 4, 5, 6]}
+
+        def compute(user, limit):
+            self.computes += 1
+            return self.util.generate_user_feed(self.catalog.all(), user, limit=limit)
+
+        self.queues = FeedQueues(
+            compute, lambda uid: dict(self.user), self.catalog.get,
+            as_list=self.util._as_list, depth=4,
+        )
+        self.catalog.subscribe(self.queues)
+
+    def ids(self, user, limit=2):
+        return [r["recipeid"] for r in self.queues.feed(user, limit)]
+
+    def test_second_request_served_from_queue(self):
+        self.assertEqual(self.ids(self.user), [6, 5])
+        self.assertEqual(self.ids(self.user), [6, 5])
+        self.assertEqual(self.computes, 1)
+
+    def test_swiped_recipes_are_skipped(self):
+        self.ids(self.user)
+        swiped = dict(self.user, unseen_recipes=[1, 2, 3, 4])
+        self.assertEqual(self.ids(swiped), [4, 3])
+        self.assertEqual(self.computes, 1)
+
+    def test_short_queue_falls_back_to_live(self):
+        self.ids(self.user)
+        # Queue holds 6,5,4,3; with those swiped it cannot fill a page
+        swiped = dict(self.user, unseen_recipes=[1, 2])
+        self.assertEqual(self.ids(swiped), [2, 1])
+        self.assertEqual(self.computes, 2)
+
+    def test_allergen_change_invalidates(self):
+        self.ids(self.user)
+        allergic = dict(self.user, allergens=["peanut"])
+        self.assertEqual(self.ids(allergic), [6, 4])
+        self.assertEqual(self.computes, 2)
+
+    def test_new_recipe_is_appended(self):
+        self.ids(self.user)
+        self.catalog.upsert({"recipeid": 7, "likes": 100, "ingredients": []})
+        user = dict(self.user, unseen_recipes=self.user["unseen_recipes"] + [7])
+        self.assertEqual(self.ids(user, limit=5), [6, 5, 4, 3, 7])
+        self.assertEqual(self.computes, 1)
+
+    def test_likes_only_change_keeps_queues(self):
+        self.ids(self.user)
+        self.catalog.upsert({"recipeid": 1, "likes": 500})
+        self.assertEqual(self.ids(self.user), [6, 5])
+        self.assertEqual(self.computes, 1)
+
+    def test_ingredient_change_invalidates(self):
+        self.ids(self.user)
+        self.catalog.upsert({"recipeid": 1, "likes": 500, "ingredients": ["rice", "peanut"]})
+        self.assertEqual(self.ids(self.user), [1, 6])
+        self.assertEqual(self.computes, 2)
+
+    def test_refill_builds_active_users(self):
+        self.queues.touch("u1")
+        self.assertEqual(self.queues.refill(), 1)
+        self.assertEqual(self.queues.refill(), 0)
+        self.assertEqual(self.ids(self.user), [6, 5])
+        self.assertEqual(self.computes, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
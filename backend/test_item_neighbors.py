@@ -0,0 +1,120 @@
+"""
+File: test_item_neighbors.py
+Purpose: Unit tests for the item-item collaborative-filtering batch job
+         (co-like counting, cosine top-N and the recipe_neighbors writes).
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+import item_neighbors
+
+
+USERS = [
+    {"id": "a", "liked_recipes": [1, 2, 3]},
+    {"id": "b", "liked_recipes": [1, 2]},
+    {"id": "c", "liked_recipes": "['1', '2', '4']"},
+    {"id": "d", "liked_recipes": [3]},            # single like, no pairs
+    {"id": "e", "liked_recipes": [4, 999]},       # 999 is not in the catalog
+]
+RECIPE_IDS = [1, 2, 3, 4]
+
+
+class ItemNeighborsTests(unittest.TestCase):
+
+    def counts(self, chunk_size=2, workers=1):
+        column_of = {rid: i for i, rid in enumerate(RECIPE_IDS)}
+        chunks = item_neighbors.user_chunks(USERS, column_of, chunk_size)
+        return item_neighbors.count_co_likes(chunks, len(RECIPE_IDS), workers)
+
+    def test_co_like_counts(self):
+        counts = self.counts().toarray()
+        self.assertEqual(counts[0, 1], 3)      # 1 & 2 liked together by a, b, c
+        self.assertEqual(counts[0, 2], 1)
+        self.assertEqual(counts[3, 3], 1)      # e's only in-catalog like is dropped
+        np.testing.assert_array_equal(counts, counts.T)
+
+    def test_chunking_does_not_change_counts(self):
+        np.testing.assert_array_equal(
+            self.counts(chunk_size=1).toarray(), self.counts(chunk_size=100).toarray()
+        )
+
+    def test_process_pool_matches_inline(self):
+        np.testing.assert_array_equal(
+            self.counts(workers=2).toarray(), self.counts(workers=1).toarray()
+        )
+
+    def test_top_neighbors_cosine_and_support(self):
+        neighbors = item_neighbors.top_neighbors(self.counts(), RECIPE_IDS, top_n=5, min_co_likes=1)
+        self.assertEqual(neighbors[1][0], {"recipeid": 2, "score": 1.0})
+        self.assertEqual([n["recipeid"] for n in neighbors[1]], [2, 3, 4])
+
+        strict = item_neighbors.top_neighbors(self.counts(), RECIPE_IDS, min_co_likes=2)
+        self.assertEqual(strict, {1: [{"recipeid": 2, "score": 1.0}], 2: [{"recipeid": 1, "score": 1.0}]})
+
+    def test_top_n_limit(self):
+        neighbors = item_neighbors.top_neighbors(self.counts(), RECIPE_IDS, top_n=1, min_co_likes=1)
+        self.assertEqual(len(neighbors[1]), 1)
+
+    def test_rebuild_writes_neighbors(self):
+        supabase = MagicMock()
+
+        def pages(table):
+            query = MagicMock()
+            rows = [{"recipeid": r} for r in RECIPE_IDS] if table == "recipes_public" else USERS
+            query.select().order().range().execute.return_value.data = rows
+            return query
+
+        supabase.table.side_effect = pages
+        neighbors = item_neighbors.rebuild(supabase, workers=1, min_co_likes=2)
+        self.assertEqual(set(neighbors), {1, 2})
+        table_names = [c.args[0] for c in supabase.table.call_args_list]
+        self.assertIn("recipe_neighbors", table_names)
+
+
+class RecipeNeighborsTests(unittest.TestCase):
+
+    def setUp(self):
+        from memory_supabase import MemorySupabase
+        from recipe_neighbors import RecipeNeighbors
+        from resilience import DBCaller
+        db = MemorySupabase()
+        db.tables["recipe_neighbors"].extend([
+            {"recipeid": 1, "neighbors": [{"recipeid": 3, "score": 0.6}, {"recipeid": 4, "score": 0.2}]},
+            {"recipeid": 2, "neighbors": [{"recipeid": 4, "score": 0.3}]},
+        ])
+        self.db = db
+        self.neighbors = RecipeNeighbors(DBCaller(db), page_size=1)
+        self.neighbors.load()
+
+    def test_rewrite_replaces_the_recipe_row(self):
+        # One row per recipeid (migrations/002); a rewrite upserts over it
+        self.db.table("recipe_neighbors").upsert(
+            {"recipeid": 1, "neighbors": [{"recipeid": 5, "score": 0.9}]}
+        ).execute()
+        self.assertEqual(len(self.db.tables["recipe_neighbors"]), 2)
+        self.neighbors.load()
+        self.assertEqual(self.neighbors.neighbors(1), ((5, 0.9),))
+
+    def test_co_likes_sum_over_liked_recipes(self):
+        scores = self.neighbors.co_likes(["1", 2, "junk"])
+        self.assertEqual(scores[3], 0.6)
+        self.assertAlmostEqual(scores[4], 0.5)
+
+    def test_feed_ranks_co_liked_recipes_first(self):
+        from recipe_utility import RecipeUtility
+        utility = RecipeUtility(weights={"recency": 0, "popularity": 0, "affinity": 0, "ingredient": 0})
+        candidates = [{"recipeid": 5}, {"recipeid": 4}, {"recipeid": 3}]
+        ranked = utility.rank_feed(candidates, {}, co_likes=self.neighbors.co_likes([1, 2]))
+        self.assertEqual([r["recipeid"] for r in ranked], [3, 4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
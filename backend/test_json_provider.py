@@ -0,0 +1,51 @@
+"""
+File: test_json_provider.py
+Purpose: Unit tests for FastJSONProvider, checking it produces the same
+         JSON as Flask's default provider and falls back when needed.
+Created: December 2025
+Authors: Kadee Wheeler
+"""
+
+import unittest
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import FastJSONProvider
+
+
+class FastJSONProviderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.fast = FastJSONProvider(self.app)
+        self.default = DefaultJSONProvider(self.app)
+
+    def test_response_matches_default_provider(self):
+        payload = {"data": [{"recipeid": 1, "title": "Crème brûlée", "ingredients": ["egg"]}]}
+        fast = self.fast.response(payload)
+        default = self.default.response(payload)
+        self.assertEqual(fast.mimetype, "application/json")
+        self.assertEqual(self.fast.loads(fast.get_data()), self.default.loads(default.get_data()))
+
+    def test_datetimes_keep_flask_format(self):
+        from datetime import date, datetime, timezone
+        payload = {"at": datetime(2025, 12, 1, 8, 30, tzinfo=timezone.utc), "on": date(2025, 12, 1)}
+        self.assertEqual(
+            self.fast.response(payload).get_json(), self.default.response(payload).get_json()
+        )
+        self.assertEqual(self.fast.response(1, 2).get_json(), [1, 2])
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        big = 2 ** 70
+        self.assertEqual(self.fast.loads(self.fast.dumps({"n": big})), {"n": big})
+
+    def test_jsonify_uses_provider(self):
+        self.app.json = self.fast
+        with self.app.app_context():
+            from flask import jsonify
+            self.assertEqual(jsonify([1, 2]).get_json(), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
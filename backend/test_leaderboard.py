@@ -35,14 +35,135 @@ class LeaderboardTests(unittest.TestCase):
 
     def test_author_leaderboard(self):
         mock_data = [
-            {"authorname": "u1", "likes": 5},
-            {"authorname": "u1", "likes": 10},
-            {"authorname": "u2", "likes": 7}
+            {"id": "a", "username": "u1", "total_likes": 15},
+            {"id": "b", "username": "u2", "total_likes": 7}
         ]
-        self.service.supabase.table().select().execute.return_value.data = mock_data
+        self.service.supabase.table().select().gt().order().order().limit().execute.return_value.data = mock_data
         result, status = self.service.get_author_leaderboard()
         self.assertEqual(status, 200)
         self.assertEqual(result["leaderboard"][0]["author"], "u1")
+        self.assertEqual(result["leaderboard"][0]["authorid"], "a")
+
+class PaginatedLeaderboardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.supabase = MagicMock()
+        self.service = LeaderboardService(self.supabase)
+        self.execute = self.supabase.table().select().gt().order().order().limit().execute
+        self.execute.return_value.data = [
+            {"id": str(i), "username": f"a{i:02d}", "total_likes": 100 - i} for i in range(25)
+        ]
+
+    def test_pages_are_slices_of_precomputed_board(self):
+        result, status = self.service.get_author_leaderboard(limit=10, offset=20)
+        self.assertEqual(status, 200)
+        self.assertEqual([e["rank"] for e in result["leaderboard"]], [21, 22, 23, 24, 25])
+        self.assertEqual((result["offset"], result["limit"], result["total"]), (20, 10, 25))
+
+        # Further pages are served without touching the database
+        calls = self.execute.call_count
+        self.service.get_author_leaderboard(limit=100, offset=0)
+        self.service.get_author_leaderboard(limit=5, offset=500)
+        self.assertEqual(self.execute.call_count, calls)
+
+    def test_failed_refresh_keeps_previous_board(self):
+        self.service.refresh()
+        self.service.boards["authors"]["generated_at"] -= self.service.author_interval
+        self.execute.side_effect = RuntimeError("down")
+        self.service.refresh()
+        result, status = self.service.get_author_leaderboard(limit=1)
+        self.assertEqual((status, result["leaderboard"][0]["author"]), (200, "a00"))
+
+    def test_stale_board_is_rebuilt(self):
+        self.service.refresh()
+        self.service.boards["authors"]["generated_at"] -= 4 * self.service.author_interval
+        self.execute.return_value.data = [{"id": "n", "username": "new", "total_likes": 1}]
+        result, _ = self.service.get_author_leaderboard()
+        self.assertEqual(result["leaderboard"][0]["author"], "new")
+
+    def test_author_board_refreshes_on_its_own_interval(self):
+        self.service.refresh()
+        calls = self.execute.call_count
+        for board in self.service.boards.values():
+            board["generated_at"] -= self.service.interval
+        self.service.refresh()
+        self.assertEqual(self.execute.call_count, calls)     # authors not due yet
+        self.service.boards["authors"]["generated_at"] -= self.service.author_interval
+        self.service.refresh()
+        self.assertEqual(self.execute.call_count, calls + 1)
+
+
+class AuthorLeaderboardTests(unittest.TestCase):
+
+    def setUp(self):
+        from memory_supabase import MemorySupabase
+        self.db = MemorySupabase()
+        self.db.tables["users_public"].extend([
+            {"id": "a", "username": "sam", "total_likes": 9},
+            {"id": "b", "username": "sam", "total_likes": 4},
+            {"id": "c", "username": "kim", "total_likes": 0},
+        ])
+        self.db.tables["recipes_public"].extend([
+            {"recipeid": 1, "authorid": "a", "likes": 5},
+            {"recipeid": 2, "authorid": "a", "likes": 4},
+            {"recipeid": 3, "authorid": "b", "likes": 6},
+        ])
+        self.service = LeaderboardService(self.db)
+
+    def test_board_is_keyed_by_author_id(self):
+        result, _ = self.service.get_author_leaderboard()
+        # kim has no likes; users_public also holds non-authors, so
+        # zero totals are left off the board
+        self.assertEqual(
+            [(e["authorid"], e["author"], e["total_likes"]) for e in result["leaderboard"]],
+            [("a", "sam", 9), ("b", "sam", 4)],
+        )
+
+    def test_reconcile_runs_on_one_worker(self):
+        workers = [LeaderboardService(self.db) for _ in range(3)]
+        for worker in workers:
+            worker.refresh()
+        self.assertEqual([w.reconciled_at is not None for w in workers], [True, False, False])
+        self.assertEqual(len(workers[0].drift), 1)
+
+        for worker in workers:
+            worker.reconcile_checked_at -= worker.reconcile_interval
+        self.db.tables["scheduled_jobs"][0]["ran_at"] -= workers[0].reconcile_interval
+        workers[1].refresh()
+        workers[2].refresh()
+        self.assertIsNotNone(workers[1].reconciled_at)
+        self.assertIsNone(workers[2].reconciled_at)
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        result, status = self.service.reconcile_authors()
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [(d["id"], d["total_likes"], d["recipe_likes"]) for d in result["drift"]], [("b", 4, 6)]
+        )
+        self.service.reconcile_authors(fix=True)
+        self.assertEqual(self.service.reconcile_authors()[0]["drift"], [])
+        self.assertEqual(self.service.stats()["author_drift"], 0)
+
+
+class LeaderboardRouteTests(unittest.TestCase):
+
+    def setUp(self):
+        import app
+        from services import Services
+        services = Services(supabase=MagicMock())
+        self.service = services.leaderboards
+        self.service.page = MagicMock(return_value=({"leaderboard": []}, 200))
+        self.client = app.create_app(services, warm=False).test_client()
+
+    def test_limit_and_offset_are_bounded(self):
+        self.client.get("/leaderboard/weekly?limit=5000&offset=99999")
+        self.service.page.assert_called_with("weekly", 100, self.service.size)
+        self.client.get("/leaderboard/daily")
+        self.service.page.assert_called_with("daily", 10, 0)
+
+    def test_bad_paging_is_400(self):
+        self.assertEqual(self.client.get("/leaderboard/authors?offset=x").status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+"""
+File: test_like_counters.py
+Purpose: Unit tests for sharded like counters: likes spread over random
+         slots through one RPC each, no read-then-write of the counter
+         columns, and folds summing the slots into likes / total_likes
+         without losing concurrent likes.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked, or
+    replaced by memory_supabase.MemorySupabase.
+"""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from like_counters import LikeCounters
+from memory_supabase import MemorySupabase
+from resilience import DBCaller
+from user_service import UserService
+
+
+class LikeCountersTests(unittest.TestCase):
+
+    def test_increment_picks_a_slot(self):
+        supabase = MagicMock()
+        counters = LikeCounters(DBCaller(supabase), shards=8, rand=lambda n: n - 1)
+        counters.increment("recipe", 42)
+        supabase.rpc.assert_called_once_with("increment_like_shard", {
+            "p_kind": "recipe", "p_key": "42", "p_shard": 7, "p_delta": 1,
+        })
+
+    def test_fold_reports_changes(self):
+        supabase = MagicMock()
+        folded = []
+        counters = LikeCounters(DBCaller(supabase), on_fold=folded.append)
+        supabase.rpc().execute.return_value.data = [{"kind": "recipe", "key": "1", "delta": 3}]
+        self.assertEqual(counters.fold(), 1)
+        self.assertEqual(folded, [[{"kind": "recipe", "key": "1", "delta": 3}]])
+
+        supabase.rpc().execute.return_value.data = []
+        self.assertEqual(counters.fold(), 0)
+        self.assertEqual(len(folded), 1)
+
+
+class ShardedLikesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.db = MemorySupabase()
+        self.db.tables["recipes_public"].append(
+            {"recipeid": 1, "category": "dinner", "ingredients": ["rice"], "likes": 10}
+        )
+        self.db.tables["users_public"].append({"id": "author", "total_likes": 5})
+        for i in range(50):
+            self.db.tables["users_public"].append({
+                "id": f"u{i}", "liked_recipes": [], "unseen_recipes": [1], "affinity": {},
+            })
+        self.service = UserService(self.db)
+
+    def pending(self, kind, key):
+        return sum(
+            r["count"] for r in self.db.tables["like_counter_shards"]
+            if r["kind"] == kind and r["key"] == str(key)
+        )
+
+    def test_concurrent_likes_are_all_counted(self):
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(
+                lambda i: self.service.like_recipe(f"u{i}", 1, "author"), range(50)
+            ))
+        self.assertTrue(all(status == 200 for _, status in results))
+
+        counters = self.service.counters
+        self.assertGreater(len(self.db.tables["like_counter_shards"]), 2)   # spread out
+        self.assertEqual(self.pending("recipe", 1), 50)
+        self.assertEqual(self.pending("author", "author"), 50)
+
+        self.assertEqual(counters.fold(), 2)
+        self.assertEqual(self.db.tables["recipes_public"][0]["likes"], 60)
+        self.assertEqual(self.db.tables["users_public"][0]["total_likes"], 55)
+        self.assertEqual(self.db.tables["like_counter_shards"], [])
+
+    def test_like_does_not_rewrite_counter_columns(self):
+        self.service.like_recipe("u1", 1, "author")
+        self.assertEqual(self.db.tables["recipes_public"][0]["likes"], 10)
+        self.assertEqual(self.pending("recipe", 1), 1)
+
+    def test_unlike_is_not_reconcile_drift(self):
+        from leaderboard_service import LeaderboardService
+        self.db.tables["recipes_public"][0]["authorid"] = "author"
+        self.db.tables["users_public"][0]["total_likes"] = 10
+        self.service.like_recipe("u1", 1, "author")
+        self.service.like_recipe("u2", 1, "author")
+        self.service.unlike_recipe("u1", 1, "author")
+        self.service.unlike_recipe("u3", 1, "author")      # never liked it
+        self.service.counters.fold()
+
+        self.assertEqual(self.db.tables["recipes_public"][0]["likes"], 11)
+        result, _ = LeaderboardService(self.db).reconcile_authors()
+        self.assertEqual(result["drift"], [])
+
+    def test_cached_author_total_follows(self):
+        self.service.get_user("author")
+        self.service.like_recipe("u1", 1, "author")
+        self.service.unlike_recipe("u1", 1, "author")
+        self.service.like_recipe("u2", 1, "author")
+        user, _ = self.service.get_user("author")
+        self.assertEqual(user["data"][0]["total_likes"], 6)
+        self.assertEqual(self.pending("author", "author"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
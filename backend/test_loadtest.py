@@ -0,0 +1,57 @@
+"""
+File: test_loadtest.py
+Purpose: Smoke test for the load generator: a few sessions against the
+         app on the in-memory database stand-in exercise every route
+         without errors, and the report's percentiles are nearest-rank.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. No database is needed.
+"""
+
+import argparse
+import random
+import unittest
+
+import loadtest
+
+
+class LoadTestTests(unittest.TestCase):
+
+    def test_local_sessions(self):
+        args = argparse.Namespace(
+            users=4, rate=0, duration=0, swipes=6, page=3, think=0, like_ratio=0.5,
+            leaderboard_ratio=1.0, post_ratio=1.0, user_ids=None, recipes=30, authors=3,
+            db_latency_ms=0,
+        )
+        rng = random.Random(7)
+        base, server, db = loadtest.start_local(args, rng)
+        try:
+            recorder = loadtest.Recorder()
+            loadtest.run(base, args, recorder, rng)
+        finally:
+            server.shutdown()
+
+        routes = set(recorder.samples)
+        self.assertLessEqual(
+            {"POST /user/create", "GET /feed", "POST /recipes"}, routes
+        )
+        self.assertTrue(routes & {"POST /user/like", "POST /user/dislike"})
+        swipes = len(recorder.samples.get("POST /user/like", [])) + \
+            len(recorder.samples.get("POST /user/dislike", []))
+        self.assertEqual(swipes, 4 * 6)
+        self.assertEqual(sum(recorder.errors.values()), 0)
+        self.assertEqual(len(db.tables["users_public"]), 3 + 4)
+        self.assertEqual(len(db.tables["recipes_public"]), 30 + 4)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(loadtest.percentile(values, 50), 50)
+        self.assertEqual(loadtest.percentile(values, 99), 99)
+        self.assertEqual(loadtest.percentile([5], 95), 5)
+        self.assertEqual(loadtest.percentile([], 95), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
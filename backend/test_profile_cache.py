@@ -0,0 +1,126 @@
+"""
+File: test_profile_cache.py
+Purpose: Unit tests for the UserService profile cache: read-through on
+         get_user, swipes applied atomically in the database and cached
+         from the returned row (no read first), and hit-rate stats.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. The Supabase client is
+    mocked or replaced by memory_supabase.MemorySupabase, so no database
+    is required.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from memory_supabase import MemorySupabase
+from user_service import UserService
+
+
+class ProfileCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.service = UserService(MagicMock())
+        self.users = {
+            "u1": {"id": "u1", "liked_recipes": [], "unseen_recipes": [7, 8],
+                   "disliked_recipes": [], "total_likes": 0},
+            "a1": {"id": "a1", "liked_recipes": [], "unseen_recipes": [],
+                   "disliked_recipes": [], "total_likes": 4},
+        }
+        for user in self.users.values():
+            self.service.profiles.set(user["id"], user)
+        self.service.supabase.table.reset_mock()
+
+    def test_get_user_hits_cache(self):
+        result, status = self.service.get_user("u1")
+        self.assertEqual(status, 200)
+        self.assertEqual(result["data"][0]["unseen_recipes"], [7, 8])
+        self.service.supabase.table.assert_not_called()
+
+    def test_get_user_returns_copy(self):
+        result, _ = self.service.get_user("u1")
+        result["data"][0]["unseen_recipes"].clear()
+        again, _ = self.service.get_user("u1")
+        self.assertEqual(again["data"][0]["unseen_recipes"], [7, 8])
+
+    def test_miss_reads_database_then_caches(self):
+        self.service.profiles.clear()
+        query = self.service.supabase.table().select().eq()
+        query.execute.return_value.data = [{"id": "u9", "liked_recipes": []}]
+        self.service.get_user("u9")
+        self.service.get_user("u9")
+        self.assertEqual(query.execute.call_count, 1)
+
+    def test_like_writes_through_to_user_and_author(self):
+        db = MemorySupabase()
+        db.tables["users_public"].extend(dict(u) for u in self.users.values())
+        service = UserService(db)
+        for user in self.users.values():
+            service.get_user(user["id"])
+
+        _, status = service.like_recipe("u1", 7, "a1")
+
+        self.assertEqual(status, 200)
+        user, _ = service.get_user("u1")
+        author, _ = service.get_user("a1")
+        self.assertEqual(user["data"][0]["liked_recipes"], [7])
+        self.assertEqual(user["data"][0]["unseen_recipes"], [8])
+        self.assertEqual(author["data"][0]["total_likes"], 5)
+
+    def test_swipes_keep_other_writers_changes(self):
+        # Another writer (create_recipe, another worker) extended the list
+        # after this profile was cached; the dislike must not drop it
+        from catalog import RecipeCatalog
+        catalog = RecipeCatalog()
+        catalog.load([{"recipeid": 999, "category": "dinner", "ingredients": ["rice"]}])
+        db = MemorySupabase()
+        db.tables["users_public"].append(dict(self.users["u1"]))
+        service = UserService(db, catalog=catalog)
+        service.get_user("u1")
+        db.tables["users_public"][0]["unseen_recipes"] = [999, 7, 8]
+        queries = db.queries
+
+        service.dislike_recipe("u1", 999)
+
+        self.assertEqual(db.queries, queries + 1)       # the swipe_recipe call only
+        self.assertEqual(db.tables["users_public"][0]["unseen_recipes"], [7, 8])
+        self.assertEqual(db.tables["users_public"][0]["disliked_recipes"], [999])
+        user, _ = service.get_user("u1")
+        self.assertEqual(user["data"][0]["unseen_recipes"], [7, 8])
+
+    def test_swipe_on_missing_user_is_404(self):
+        service = UserService(MemorySupabase())
+        self.assertEqual(service.like_recipe("nobody", 7, "a1")[1], 404)
+        self.assertEqual(service.add_unseen("nobody", 7)[1], 404)
+
+    def test_create_recipe_drops_extended_profiles(self):
+        from recipe_service import RecipeService
+        db = MemorySupabase()
+        db.tables["users_public"].append(dict(self.users["u1"]))
+        service = UserService(db)
+        service.get_user("u1")
+        recipes = RecipeService(db, on_unseen=service.profiles.pop)
+
+        result, status = recipes.create_recipe({
+            "title": "Soup", "description": "-", "ingredients": [], "directions": [],
+            "authorid": "u1",
+        })
+
+        self.assertEqual(status, 201)
+        self.assertIsNone(service.profiles.get("u1"))
+        user, _ = service.get_user("u1")
+        self.assertIn(result["recipeid"], user["data"][0]["unseen_recipes"])
+
+    def test_stats_report_hit_rate(self):
+        self.service.get_user("u1")
+        self.service.profiles.get("missing")
+        stats = self.service.cache_stats()
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertGreaterEqual(stats["misses"], 1)
+        self.assertTrue(0 < stats["hit_rate"] < 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+File: test_recipe_cache.py
+Purpose: Unit tests for the LRUCache helper and the RecipeService
+         read-through cache used by single and batch recipe lookups.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. These tests mock the
+    Supabase client and do not require a real database.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from cache import LRUCache
+from recipe_service import RecipeService
+
+
+class LRUCacheTests(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)
+        cache.set(3, "c")
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        self.assertIn(3, cache)
+
+    def test_get_many_reports_misses_in_order(self):
+        cache = LRUCache(maxsize=10)
+        cache.set(2, "b")
+        hits, misses = cache.get_many([3, 2, 1])
+        self.assertEqual(hits, {2: "b"})
+        self.assertEqual(misses, [3, 1])
+
+    def test_ttl_expires_entries(self):
+        cache = LRUCache(maxsize=10, ttl=-1)
+        cache.set(1, "a")
+        self.assertIsNone(cache.get(1))
+
+
+class RecipeBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.service = RecipeService(MagicMock())
+        self.query = self.service.supabase.table().select().in_()
+
+    def test_batch_preserves_request_order(self):
+        self.query.execute.return_value.data = [
+            {"recipeid": 1, "title": "A"},
+            {"recipeid": 3, "title": "C"},
+        ]
+        result, status = self.service.get_recipes_by_ids([3, 1, 2])
+        self.assertEqual(status, 200)
+        self.assertEqual([r["recipeid"] for r in result["data"]], [3, 1])
+        self.assertEqual(result["missing"], [2])
+
+    def test_batch_only_queries_cache_misses(self):
+        self.service.cache.set(1, {"recipeid": 1, "title": "A"})
+        self.query.execute.return_value.data = [{"recipeid": 2, "title": "B"}]
+        self.service.supabase.table().select().in_.reset_mock()
+
+        result, _ = self.service.get_recipes_by_ids([1, 2])
+
+        self.service.supabase.table().select().in_.assert_called_once_with("recipeid", [2])
+        self.assertEqual([r["title"] for r in result["data"]], ["A", "B"])
+
+    def test_batch_fully_cached_skips_database(self):
+        self.service.cache.set(5, {"recipeid": 5})
+        self.service.supabase.table().select().in_.reset_mock()
+        result, _ = self.service.get_recipes_by_ids([5])
+        self.service.supabase.table().select().in_.assert_not_called()
+        self.assertEqual(result["data"], [{"recipeid": 5}])
+
+
+if __name__ == "__main__":
+    unittest.main()
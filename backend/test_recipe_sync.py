@@ -0,0 +1,105 @@
+"""
+File: test_recipe_sync.py
+Purpose: Unit tests for the recipes_public delta sync: watermark queries,
+         upserts and tombstone deletes reaching the catalog, its indexes
+         and the recipe cache, and the full reload after a long gap.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from cache import LRUCache
+from catalog import RecipeCatalog
+from recipe_sync import RecipeSync
+from search_index import SearchIndex
+
+
+ROWS = [
+    {"recipeid": 1, "ingredients": ["rice"], "updated_at": "2025-12-01T00:00:00+00:00"},
+    {"recipeid": 2, "ingredients": ["bread"], "updated_at": "2025-12-01T00:00:00+00:00"},
+]
+
+
+class RecipeSyncTests(unittest.TestCase):
+
+    def setUp(self):
+        self.changes = {"recipes_public": [], "recipe_tombstones": []}
+        self.supabase = MagicMock()
+        self.queries = []
+
+        def table(name):
+            query = MagicMock()
+            query.select().gt().order().range().execute.side_effect = (
+                lambda: MagicMock(data=list(self.changes[name]))
+            )
+            self.queries.append((name, query))
+            return query
+
+        self.supabase.table.side_effect = table
+        self.catalog = RecipeCatalog(self.supabase)
+        self.index = SearchIndex()
+        self.catalog.subscribe(self.index)
+        self.catalog.load([dict(r) for r in ROWS])
+        self.cache = LRUCache()
+        self.sync = RecipeSync(self.catalog, self.supabase, caches=[self.cache], overlap=30)
+
+    def test_queries_from_load_time_minus_overlap(self):
+        self.sync.poll()
+        name, query = self.queries[0]
+        self.assertEqual(name, "recipes_public")
+        column, since = query.select().gt.call_args.args
+        self.assertEqual(column, "updated_at")
+        lag = self.catalog.loaded_at - datetime.fromisoformat(since).timestamp()
+        self.assertAlmostEqual(lag, 30, delta=1)
+
+    def test_new_and_edited_rows_are_applied(self):
+        self.cache.set(2, {"recipeid": 2, "ingredients": ["bread"]})
+        self.changes["recipes_public"] = [
+            {"recipeid": 2, "ingredients": ["bread", "cheese"], "updated_at": "2030-01-01T00:00:00+00:00"},
+            {"recipeid": 3, "ingredients": ["kale"], "updated_at": "2030-01-01T00:00:01+00:00"},
+        ]
+        self.assertEqual(self.sync.poll(), (2, 0))
+        self.assertEqual(self.index.search(["cheese"]), [2])
+        self.assertEqual(self.index.search(["kale"]), [3])
+        self.assertNotIn(2, self.cache)
+        self.assertEqual(self.sync.updated_after.isoformat(), "2030-01-01T00:00:01+00:00")
+
+        # The overlap window re-reads the same rows; nothing changes
+        version = self.catalog.version
+        self.assertEqual(self.sync.poll(), (0, 0))
+        self.assertEqual(self.catalog.version, version)
+
+    def test_tombstones_remove_rows(self):
+        self.cache.set(1, {"recipeid": 1})
+        self.changes["recipe_tombstones"] = [
+            {"recipeid": 1, "deleted_at": "2030-01-01T00:00:00+00:00"},
+            {"recipeid": 99, "deleted_at": "2030-01-01T00:00:00+00:00"},
+        ]
+        self.assertEqual(self.sync.poll(), (0, 1))
+        self.assertNotIn(1, self.catalog)
+        self.assertEqual(self.index.search(["rice"]), [])
+        self.assertNotIn(1, self.cache)
+
+    def test_long_gap_reloads(self):
+        self.sync.poll()
+        self.sync.last_poll = time.time() - 8 * 86400
+        self.catalog.fetch_all = MagicMock(return_value=[dict(ROWS[0])])
+        self.sync.poll()
+        self.catalog.fetch_all.assert_called_once_with()
+        self.assertNotIn(2, self.catalog)
+
+    def test_waits_for_catalog(self):
+        sync = RecipeSync(RecipeCatalog(self.supabase), self.supabase)
+        self.assertEqual(sync.poll(), (0, 0))
+        self.supabase.table.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -93,5 +93,34 @@ class RecipeUtilityTest(unittest.TestCase):
         feed = self.utility.generate_user_feed(self.recipes, self.user_safe)
         self.assertEqual(len(feed), 3)
 
+    def test_rank_feed_prefers_liked_category(self):
+        """Affinity for a liked category lifts those recipes to the top."""
+        utility = RecipeUtility(weights={"recency": 0, "popularity": 0, "affinity": 1})
+        recipes = [
+            {"recipeid": 10, "category": "dessert"},
+            {"recipeid": 11, "category": "dinner"},
+            {"recipeid": 12, "category": "dinner"},
+        ]
+        user = {"allergens": [], "unseen_recipes": [10, 12], "liked_recipes": [11]}
+        feed = utility.generate_user_feed(recipes, user)
+        self.assertEqual([r["recipeid"] for r in feed], [12, 10])
+
+    def test_rank_feed_top_k_by_likes_and_recency(self):
+        """Top-K keeps the highest scored recipes in score order."""
+        utility = RecipeUtility(weights={"recency": 1, "popularity": 1, "affinity": 0})
+        candidates = [
+            {"recipeid": 1, "likes": 0, "datecreated": "2020-01-01T00:00:00+00:00"},
+            {"recipeid": 2, "likes": 500, "datecreated": "2020-01-01T00:00:00+00:00"},
+            {"recipeid": 3, "likes": 0, "datecreated": "2099-01-01T00:00:00+00:00"},
+            {"recipeid": 4, "likes": 500, "datecreated": "2099-01-01T00:00:00+00:00"},
+        ]
+        top = utility.rank_feed(candidates, {}, limit=2)
+        self.assertEqual([r["recipeid"] for r in top], [4, 2])
+
+    def test_generate_user_feed_respects_limit(self):
+        """Feed is cut to the requested page size."""
+        feed = self.utility.generate_user_feed(self.recipes, self.user_safe, limit=2)
+        self.assertEqual(len(feed), 2)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,170 @@
+"""
+File: test_resilience.py
+Purpose: Unit tests for the shared Supabase call wrapper: error
+         classification, retries with backoff for reads only, per
+         table/operation circuit breakers, hedged reads, unobserved
+         background calls, and services answering 503 while a circuit is
+         open.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from leaderboard_service import LeaderboardService
+from resilience import CircuitBreaker, CircuitOpenError, DBCaller, is_transient
+
+
+class APIError(Exception):
+    """Stand-in for postgrest's APIError (carries a SQLSTATE / HTTP code)."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ClassificationTests(unittest.TestCase):
+
+    def test_transient_errors(self):
+        self.assertTrue(is_transient(ConnectionError("reset")))
+        self.assertTrue(is_transient(APIError("57014")))     # statement timeout
+        self.assertTrue(is_transient(APIError("503")))
+        self.assertFalse(is_transient(APIError("23505")))    # unique violation
+        self.assertFalse(is_transient(APIError("PGRST116")))
+        self.assertTrue(is_transient(APIError("PGRST001")))   # database unreachable
+        self.assertTrue(is_transient(TimeoutError()))
+        self.assertFalse(is_transient(CircuitOpenError()))
+        self.assertFalse(is_transient(ValueError("bad payload")))
+        self.assertFalse(is_transient(APIError(None)))
+
+
+class CircuitBreakerTests(unittest.TestCase):
+
+    def test_open_half_open_close(self):
+        clock = Clock()
+        breaker = CircuitBreaker("t.select", failures=2, reset_timeout=10, clock=clock)
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())        # the probe
+        self.assertFalse(breaker.allow())       # only one at a time
+        breaker.failure()
+        self.assertEqual(breaker.state, "open")
+
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.stats(), {"state": "closed", "failures": 0, "trips": 2, "rejected": 2})
+
+
+class DBCallerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.supabase = MagicMock()
+        self.sleeps = []
+        self.latencies = []
+        self.db = DBCaller(self.supabase, retries=2, backoff=0.1, breaker_failures=3,
+                           observers=[self.latencies.append], sleep=self.sleeps.append)
+
+    def test_reads_are_retried_with_backoff(self):
+        execute = self.supabase.table().select().eq().execute
+        execute.side_effect = [ConnectionError(), ConnectionError(), MagicMock(data=[1])]
+        result = self.db.table("recipes_public").select("*").eq("recipeid", 1).execute()
+        self.assertEqual(result.data, [1])
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertLessEqual(self.sleeps[0], 0.1)
+        self.assertLessEqual(self.sleeps[1], 0.2)
+        self.assertEqual(len(self.latencies), 3)
+        self.assertEqual(self.db.breaker("recipes_public", "select").state, "closed")
+
+    def test_unobserved_calls_skip_observers(self):
+        self.supabase.table().select().execute.return_value = MagicMock(data=[])
+        self.db.table("recipe_like_hours").select("*").execute(observe=False)
+        self.db.rpc("fold_like_shards").execute(observe=False)
+        self.assertEqual(self.latencies, [])
+        self.db.table("users_public").select("*").execute()
+        self.assertEqual(len(self.latencies), 1)
+
+    def test_writes_are_not_retried(self):
+        execute = self.supabase.table().update().eq().execute
+        execute.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            self.db.table("users_public").update({"x": 1}).eq("id", "u").execute()
+        self.assertEqual(execute.call_count, 1)
+
+    def test_permanent_errors_are_raised_at_once(self):
+        execute = self.supabase.table().insert().execute
+        execute.side_effect = APIError("23505")
+        for _ in range(5):
+            with self.assertRaises(APIError):
+                self.db.table("users_public").insert({}).execute()
+        self.assertEqual(self.db.breaker("users_public", "insert").state, "closed")
+
+    def test_breaker_is_per_table_and_operation(self):
+        self.supabase.table().select().execute.side_effect = ConnectionError()
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                self.db.table("recipes_public").select("*").execute(idempotent=False)
+        with self.assertRaises(CircuitOpenError):
+            self.db.table("recipes_public").select("*").execute()
+
+        self.assertEqual(self.db.breaker("recipes_public", "update").state, "closed")
+        self.assertEqual(
+            self.db.stats()["breakers"]["recipes_public.select"]["state"], "open"
+        )
+
+    def test_slow_read_is_hedged(self):
+        db = DBCaller(self.supabase, hedge_after=0.02)
+        release = threading.Event()
+        calls = []
+
+        def execute():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(1)         # first request stalls
+                return MagicMock(data="slow")
+            return MagicMock(data="fast")
+
+        self.supabase.table().select().execute.side_effect = execute
+        started = time.perf_counter()
+        result = db.table("recipes_public").select("*").execute()
+        release.set()
+        self.assertEqual(result.data, "fast")
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(db.stats()["hedged"], 1)
+
+
+class ServiceTests(unittest.TestCase):
+
+    def test_open_circuit_is_503(self):
+        supabase = MagicMock()
+        db = DBCaller(supabase, retries=0, breaker_failures=1, sleep=lambda s: None)
+        service = LeaderboardService(supabase, db=db)
+        supabase.table().select().gte().order().limit().execute.side_effect = ConnectionError("down")
+
+        self.assertEqual(service.get_daily_leaderboard()[1], 500)
+        body, status = service.get_daily_leaderboard()
+        self.assertEqual(status, 503)
+        self.assertIn("circuit open", body["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
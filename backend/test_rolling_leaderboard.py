@@ -0,0 +1,138 @@
+"""
+File: test_rolling_leaderboard.py
+Purpose: Unit tests for the rolling daily/weekly leaderboards: hourly like
+         buckets in a ring buffer, window expiry, incremental top-K kept
+         equal to a full ranking, idempotent bucket polls, and recipes
+         posted long ago ranking on recent likes.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from catalog import RecipeCatalog
+from leaderboard_service import LeaderboardService
+from resilience import DBCaller
+from rolling_leaderboard import RollingLeaderboard, hour_of
+
+HOUR = 3600
+START = 1_000_000 * HOUR + 1800        # half past some hour
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+class RollingLeaderboardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.board = RollingLeaderboard(k=3, clock=self.clock)
+
+    def test_ranked_by_likes_in_window(self):
+        for rid, likes in [(1, 2), (2, 5), (3, 1), (4, 5)]:
+            self.board.record(rid, likes)
+        self.assertEqual(self.board.top("daily", 10), [(2, 5), (4, 5), (1, 2)])
+        self.assertEqual(self.board.top("daily", 1), [(2, 5)])
+
+    def test_buckets_expire_per_window(self):
+        self.board.record(1, 4)
+        self.clock.now += 10 * HOUR
+        self.board.record(2, 1)
+
+        self.clock.now += 14 * HOUR        # recipe 1's hour is now 24h old
+        self.assertEqual(self.board.top("daily", 10), [(2, 1)])
+        self.assertEqual(self.board.top("weekly", 10), [(1, 4), (2, 1)])
+
+        self.clock.now += 7 * 24 * HOUR
+        self.assertEqual(self.board.top("weekly", 10), [])
+
+    def test_incremental_top_k_matches_full_ranking(self):
+        rng = random.Random(3)
+        totals = {}                        # (hour, rid) → likes, the ground truth
+        for _ in range(3000):
+            if rng.random() < 0.02:
+                self.clock.now += HOUR * rng.choice([1, 1, 5])
+            rid = rng.randrange(12)
+            delta = rng.choice([1, 1, 1, 2, -1])
+            hour = hour_of(self.clock.now)
+            if totals.get((hour, rid), 0) + delta < 0:
+                continue
+            totals[(hour, rid)] = totals.get((hour, rid), 0) + delta
+            self.board.record(rid, delta)
+
+            if rng.random() < 0.1:
+                now = hour_of(self.clock.now)
+                for name, hours in (("daily", 24), ("weekly", 168)):
+                    window = {}
+                    for (h, r), n in totals.items():
+                        if h > now - hours:
+                            window[r] = window.get(r, 0) + n
+                    expected = sorted(((-n, r) for r, n in window.items() if n > 0))[:3]
+                    self.assertEqual(self.board.top(name, 3), [(r, -n) for n, r in expected])
+
+    def test_set_bucket_is_idempotent(self):
+        hour = hour_of(self.clock.now)
+        self.board.set_bucket(hour, 7, 3)
+        self.board.set_bucket(hour, 7, 3)
+        self.board.set_bucket(hour - 30, 7, 2)     # daily excludes, weekly keeps
+        self.assertEqual(self.board.top("daily", 5), [(7, 3)])
+        self.assertEqual(self.board.top("weekly", 5), [(7, 5)])
+
+    def test_load_reads_last_week(self):
+        supabase = MagicMock()
+        supabase.table().select().gte().order().range().execute.return_value.data = [
+            {"hour": "2084-01-01T00:00:00+00:00", "recipeid": 1, "likes": 2},
+        ]
+        clock = lambda: hour_of("2084-01-01T05:00:00+00:00") * HOUR
+        board = RollingLeaderboard(DBCaller(supabase), clock=clock)
+        self.assertEqual(board.load(), 1)
+        self.assertTrue(board.ready)
+        since = supabase.table().select().gte.call_args.args[1]
+        self.assertTrue(since.startswith("2083-12-25T06:00:00"))
+        self.assertEqual(board.top("daily", 5), [(1, 2)])
+
+
+class LeaderboardServiceTests(unittest.TestCase):
+
+    def test_old_recipe_liked_today_ranks(self):
+        catalog = RecipeCatalog(MagicMock())
+        catalog.load([
+            {"recipeid": 1, "title": "Old Stew", "authorname": "ann", "likes": 900,
+             "datecreated": "2020-01-01T00:00:00+00:00"},
+            {"recipeid": 2, "title": "New Salad", "authorname": "bo", "likes": 3,
+             "datecreated": "2025-12-01T00:00:00+00:00"},
+        ])
+        rolling = RollingLeaderboard()
+        rolling.ready = True
+        rolling.record(1, 40)
+        rolling.record(2, 3)
+        rolling.record(99, 50)      # deleted recipe: skipped
+        service = LeaderboardService(MagicMock(), rolling=rolling, catalog=catalog)
+
+        body, status = service.get_daily_leaderboard(limit=10)
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [(e["rank"], e["title"], e["likes"], e["total_likes"]) for e in body["leaderboard"]],
+            [(1, "Old Stew", 40, 900), (2, "New Salad", 3, 3)],
+        )
+
+    def test_falls_back_until_loaded(self):
+        supabase = MagicMock()
+        service = LeaderboardService(supabase, rolling=RollingLeaderboard())
+        supabase.table().select().gte().order().limit().execute.return_value.data = []
+        self.assertEqual(service.get_weekly_leaderboard()[0],
+                         {"message": "No recipes found in the last 7 day(s)"})
+
+
+if __name__ == "__main__":
+    unittest.main()
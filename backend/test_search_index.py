@@ -0,0 +1,80 @@
+"""
+File: test_search_index.py
+Purpose: Unit tests for the ingredient inverted index behind /search:
+         include/exclude queries, allergen-safe filtering, newest-first
+         paging and updates on recipe writes.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. No database is needed;
+    the catalog is loaded from in-memory rows.
+"""
+
+import random
+import unittest
+
+from catalog import RecipeCatalog
+from recipe_utility import RecipeUtility
+from search_index import SearchIndex, parse_query
+
+
+ROWS = [
+    {"recipeid": 1, "ingredients": ["chicken breast", "garlic"], "dietaryrestrictions": []},
+    {"recipeid": 2, "ingredients": ["chicken thigh", "cream"], "dietaryrestrictions": ["dairy"]},
+    {"recipeid": 3, "ingredients": ["Peanuts", "noodles", "garlic"], "dietaryrestrictions": []},
+    {"recipeid": 4, "ingredients": ["flour", "sugar"], "dietaryrestrictions": ["gluten"]},
+]
+
+
+class SearchIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = RecipeCatalog()
+        self.index = SearchIndex()
+        self.catalog.subscribe(self.index)
+        self.catalog.load([dict(r) for r in ROWS])
+
+    def test_include_matches_ingredient_words(self):
+        self.assertEqual(self.index.search(include=["chicken"]), [1, 2])
+
+    def test_include_terms_are_intersected(self):
+        self.assertEqual(self.index.search(include=["chicken", "garlic"]), [1])
+
+    def test_exclude_removes_restrictions(self):
+        self.assertEqual(self.index.search(include=["chicken"], exclude=["dairy"]), [1])
+
+    def test_allergens_match_feed_filtering(self):
+        utility = RecipeUtility()
+        for allergens in (["peanuts"], ["gluten", "dairy"], ["garlic"]):
+            expected = [r["recipeid"] for r in utility.filter_recipes_by_allergens(ROWS, allergens)]
+            self.assertEqual(self.index.search(allergens=allergens), expected)
+
+    def test_index_follows_recipe_writes(self):
+        self.catalog.upsert({"recipeid": 5, "ingredients": ["chicken wings"], "dietaryrestrictions": []})
+        self.catalog.upsert({"recipeid": 1, "ingredients": ["tofu", "garlic"], "dietaryrestrictions": []})
+        self.catalog.remove(2)
+        self.assertEqual(self.index.search(include=["chicken"]), [5])
+
+    def test_page_matches_search_newest_first(self):
+        rng = random.Random(3)
+        words = ["rice", "egg", "milk", "leek", "tofu", "peanuts"]
+        rows = [{"recipeid": i, "ingredients": rng.sample(words, 2), "dietaryrestrictions": []}
+                for i in range(1, 201)]
+        self.catalog.load(rows)
+        queries = [((), (), ()), ((), ("milk",), ()), ((), (), ("peanuts",)),
+                   (("rice",), ("egg",), ()), (("rice", "tofu"), (), ("peanuts",))]
+        for include, exclude, allergens in queries:
+            expected = self.index.search(include, exclude, allergens)[::-1]
+            for offset, limit in ((0, 10), (15, 7), (len(expected) - 3, 10), (500, 5)):
+                page, total = self.index.page(include, exclude, allergens, limit, offset)
+                self.assertEqual(page, expected[offset:offset + limit])
+                self.assertEqual(total, len(expected))
+
+    def test_parse_query(self):
+        self.assertEqual(parse_query("chicken, garlic, no dairy, -Peanuts"),
+                         (["chicken", "garlic"], ["dairy", "Peanuts"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+File: test_similarity_index.py
+Purpose: Unit tests for the RecipeCatalog and the TF-IDF "more like this"
+         similarity index, including incremental updates on recipe writes.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. No database is needed;
+    the catalog is loaded from in-memory rows.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from catalog import RecipeCatalog
+from recipe_service import RecipeService
+from similarity_index import SimilarityIndex
+
+
+ROWS = [
+    {"recipeid": 1, "category": "dinner", "ingredients": ["chicken", "garlic", "rice"]},
+    {"recipeid": 2, "category": "dinner", "ingredients": ["chicken", "garlic", "noodles"]},
+    {"recipeid": 3, "category": "dessert", "ingredients": ["flour", "sugar", "butter"]},
+    {"recipeid": 4, "category": "dessert", "ingredients": ["flour", "sugar", "cocoa"]},
+    {"recipeid": 5, "category": "lunch", "ingredients": ["bread", "cheese"]},
+]
+
+
+class SimilarityIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = RecipeCatalog()
+        self.index = SimilarityIndex(top_k=3)
+        self.catalog.subscribe(self.index)
+        self.catalog.load([dict(r) for r in ROWS])
+
+    def test_nearest_neighbor_shares_ingredients(self):
+        self.assertEqual(self.index.similar(1)[0][0], 2)
+        self.assertEqual(self.index.similar(3)[0][0], 4)
+
+    def test_unrelated_recipes_are_not_neighbors(self):
+        self.assertEqual(self.index.similar(5), [])
+
+    def test_scores_are_cosine(self):
+        score = self.index.similar(1)[0][1]
+        self.assertTrue(0 < score < 1)
+
+    def test_unknown_recipe_returns_none(self):
+        self.assertIsNone(self.index.similar(999))
+
+    def test_new_recipe_becomes_neighbor(self):
+        self.catalog.upsert({"recipeid": 6, "category": "lunch", "ingredients": ["bread", "cheese", "ham"]})
+        self.assertEqual(self.index.similar(5)[0][0], 6)
+
+    def test_edit_moves_recipe_between_neighborhoods(self):
+        self.catalog.upsert({"recipeid": 2, "category": "dessert", "ingredients": ["flour", "sugar", "cocoa"]})
+        self.assertNotIn(2, [rid for rid, _ in self.index.similar(1)])
+        self.assertEqual(self.index.similar(4)[0][0], 2)
+
+    def test_deleted_recipe_disappears(self):
+        self.catalog.remove(2)
+        self.assertNotIn(2, [rid for rid, _ in self.index.similar(1)])
+        self.assertIsNone(self.index.similar(2))
+
+
+class SimilarityIndexScalingTests(unittest.TestCase):
+
+    def test_common_terms_score_but_do_not_fan_out(self):
+        foods = ["apple", "beet", "corn", "date", "egg"]
+        rows = [{"recipeid": i, "category": "dinner", "ingredients": [f]} for i, f in enumerate(foods, 1)]
+        rows.append({"recipeid": 6, "category": "dinner", "ingredients": ["apple"]})
+        index = SimilarityIndex(top_k=3, max_df=2, background=False)
+        index.reset(rows)
+        # cat:dinner (df 6) is skipped for candidates; apple still finds 1,
+        # and the shared category counts towards its score
+        neighbors = index.similar(6)
+        self.assertEqual([rid for rid, _ in neighbors], [1])
+        self.assertAlmostEqual(neighbors[0][1], 1.0)
+
+    def test_lists_are_rescored_after_catalog_growth(self):
+        index = SimilarityIndex(top_k=3, idf_drift=0.5, background=False)
+        index.reset([dict(r) for r in ROWS])
+        before = index.similar(1)
+        for i in range(10, 20):
+            index.upsert({"recipeid": i, "category": f"snack{chr(97 + i)}", "ingredients": []})
+        self.assertNotEqual(index.similar(1), before)
+        self.assertEqual(index.similar(1)[0][0], 2)
+
+    def test_reset_precomputes_off_the_calling_thread(self):
+        index = SimilarityIndex(top_k=3)
+        with index._lock:
+            index.reset([dict(r) for r in ROWS])   # returns without scoring
+        self.assertEqual(index.similar(1)[0][0], 2)
+
+
+class RecipeServicePublishesTests(unittest.TestCase):
+
+    def test_update_and_delete_reach_catalog(self):
+        catalog = RecipeCatalog()
+        catalog.load([dict(r) for r in ROWS])
+        service = RecipeService(MagicMock(), catalog=catalog)
+
+        service.supabase.table().update().eq().execute.return_value.data = [
+            {"recipeid": 5, "title": "Grilled cheese"}
+        ]
+        service.update_recipe(5, {"title": "Grilled cheese"})
+        self.assertEqual(catalog.get(5)["title"], "Grilled cheese")
+        self.assertEqual(catalog.get(5)["ingredients"], ["bread", "cheese"])
+
+        service.supabase.table().delete().eq().execute.return_value.data = [{"recipeid": 5}]
+        service.delete_recipe(5)
+        self.assertNotIn(5, catalog)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+File: test_singleflight.py
+Purpose: Unit tests for single-flight coalescing: concurrent identical
+         reads share one Supabase call and its result (or error), distinct
+         queries do not, and nothing outlives the call.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. Supabase is mocked.
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from recipe_service import RecipeService
+from resilience import DBCaller, _signature
+from singleflight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+
+    def run_concurrently(self, flights, key, fn, n=8):
+        with ThreadPoolExecutor(n) as pool:
+            futures = [pool.submit(flights.do, key, fn) for _ in range(n)]
+            return [f.exception() or f.result() for f in futures]
+
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"rows": 1}
+
+        results = self.run_concurrently(flights, "k", slow)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flights.stats(), {"in_flight": 0, "calls": 1, "coalesced": 7})
+
+        # Nothing is cached once the call is over
+        flights.do("k", slow)
+        self.assertEqual(len(calls), 2)
+
+    def test_error_reaches_every_caller(self):
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.05)
+            raise ConnectionError("down")
+
+        results = self.run_concurrently(flights, "k", fail)
+        self.assertTrue(all(isinstance(r, ConnectionError) for r in results))
+
+
+class SharedQueryTests(unittest.TestCase):
+
+    def test_signature_follows_filters(self):
+        from postgrest import SyncPostgrestClient
+        client = SyncPostgrestClient("http://localhost")
+        query = lambda rid: client.from_("recipes_public").select("*").eq("recipeid", rid)
+        self.assertEqual(_signature("r", query(1)), _signature("r", query(1)))
+        self.assertNotEqual(_signature("r", query(1)), _signature("r", query(2)))
+        self.assertNotEqual(_signature("r", query(1)), _signature("r", query(1).single()))
+
+    def test_popular_recipe_stampede_makes_one_call(self):
+        supabase = MagicMock()
+        gate = threading.Event()
+
+        def execute():
+            gate.wait(1)
+            return MagicMock(data=[{"recipeid": 7, "title": "Soup"}])
+
+        execute_mock = supabase.table().select().eq().execute
+        execute_mock.side_effect = execute
+        service = RecipeService(supabase)
+
+        with ThreadPoolExecutor(10) as pool:
+            futures = [pool.submit(service.get_recipe, 7) for _ in range(10)]
+            deadline = time.monotonic() + 2
+            while service.db.flights.coalesced < 9 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            gate.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(execute_mock.call_count, 1)
+        self.assertTrue(all(r == ({"data": {"recipeid": 7, "title": "Soup"}}, 200) for r in results))
+
+    def test_writes_are_never_shared(self):
+        supabase = MagicMock()
+        db = DBCaller(supabase)
+        db.table("users_public").update({"x": 1}).eq("id", "u").execute(shared=True)
+        self.assertEqual(db.flights.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
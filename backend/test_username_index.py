@@ -0,0 +1,127 @@
+"""
+File: test_username_index.py
+Purpose: Unit tests for the Bloom filter username index and the
+         UserService.username_exists lookup path.
+Created: December 2025
+Authors: Kadee Wheeler
+
+Part of System:
+    Belongs to the Tastebuddin backend test suite. The Supabase client is
+    mocked (or replaced by memory_supabase.MemorySupabase), so no database
+    is required.
+"""
+
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import user_service
+from memory_supabase import MemorySupabase
+from username_index import BloomFilter, UsernameIndex
+from user_service import UserService
+
+
+class BloomFilterTests(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        names = [f"user_{i}" for i in range(1000)]
+        for name in names:
+            bloom.add(name)
+        self.assertTrue(all(name in bloom for name in names))
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"user_{i}")
+        false_hits = sum(f"other_{i}" in bloom for i in range(10000))
+        self.assertLess(false_hits / 10000, 0.03)
+
+    def test_index_grows_past_capacity(self):
+        index = UsernameIndex(capacity=4)
+        index.load([])
+        for i in range(50):
+            index.add(f"u{i}")
+        self.assertTrue(all(index.might_contain(f"u{i}") for i in range(50)))
+        self.assertEqual(len(index), 50)
+
+    def test_names_added_during_load_are_kept(self):
+        index = UsernameIndex()
+        index.add("signed_up_mid_load")
+        index.load(["older"])
+        self.assertIn("signed_up_mid_load", index)
+        self.assertTrue(index.might_contain("signed_up_mid_load"))
+        index.load(["older"])       # a later reload starts from the DB again
+        self.assertIn("older", index)
+
+
+class UsernameExistsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.service = UserService(MagicMock())
+        self.service.usernames.load(["kadee", "chef_bob"])
+        self.eq = self.service.supabase.table().select().eq
+        self.eq.reset_mock()
+
+    def test_known_username_answered_from_memory(self):
+        self.assertTrue(self.service.username_exists("kadee"))
+        self.eq.assert_not_called()
+
+    def test_bloom_negative_skips_database(self):
+        self.service.usernames.might_contain = lambda name: False
+        self.assertFalse(self.service.username_exists("brand_new"))
+        self.eq.assert_not_called()
+
+    def test_possible_positive_checks_database(self):
+        self.service.usernames.might_contain = lambda name: True
+        self.eq.return_value.execute.return_value.data = [{"username": "elsewhere"}]
+        self.assertTrue(self.service.username_exists("elsewhere"))
+        self.eq.assert_called_once_with("username", "elsewhere")
+        self.assertIn("elsewhere", self.service.usernames)
+
+    def test_create_user_adds_to_index(self):
+        self.service.create_user("id-1", "fresh_cook", [], [])
+        self.assertIn("fresh_cook", self.service.usernames)
+
+
+class UsernameSyncTests(unittest.TestCase):
+
+    def setUp(self):
+        self.db = MemorySupabase()
+        self.service = UserService(self.db)
+        self.db.table("users_public").insert({"id": "u1", "username": "kadee"}).execute()
+        self.service.load_usernames()
+
+    def _signup_elsewhere(self, user_id, username):
+        """Insert a user the way another instance's create_user would."""
+        self.db.table("users_public").insert({
+            "id": user_id, "username": username,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }).execute()
+
+    def test_name_registered_elsewhere_is_taken_after_sync(self):
+        self._signup_elsewhere("u2", "chef_bob")
+        self.assertNotIn("chef_bob", self.service.usernames)
+
+        self.assertEqual(self.service.sync_usernames(), 1)
+        self.assertIn("chef_bob", self.service.usernames)
+        self.assertTrue(self.service.username_exists("chef_bob"))
+
+    def test_rename_elsewhere_is_picked_up_by_reload(self):
+        self.db.table("users_public").update({"username": "kadee_w"}).eq("id", "u1").execute()
+        self.service.sync_usernames()
+        self.assertNotIn("kadee_w", self.service.usernames)
+
+        with patch.object(user_service, "USERNAME_RELOAD_INTERVAL", 0):
+            self.service.sync_usernames()
+        self.assertIn("kadee_w", self.service.usernames)
+        self.assertNotIn("kadee", self.service.usernames)
+
+    def test_sync_waits_for_first_load(self):
+        service = UserService(self.db)
+        self.assertEqual(service.sync_usernames(), 0)
+        self.assertFalse(service.usernames.ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
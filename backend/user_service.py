@@ -7,17 +7,117 @@ Created: 2025-12-04
 Authors: Kadee Wheeler
 """
 
-from supabase import Client
-from datetime import datetime, timezone
-from dotenv import load_dotenv
-
-load_dotenv() 
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
+import os
+import threading
+import time
+
+import affinity
+from cache import LRUCache
+from like_counters import LikeCounters
+from resilience import DBCaller, error_status
+from username_index import UsernameIndex
+
+if TYPE_CHECKING:  # supabase is slow to import; only needed for the annotation
+    from supabase import Client
+
+# Profiles kept in the per-process LRU cache
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+# Seconds before a cached profile is re-read (bounds staleness from other writers)
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+# Seconds between polls for usernames registered by other instances
+USERNAME_SYNC_INTERVAL = float(os.getenv("USERNAME_SYNC_INTERVAL", "5"))
+# Seconds of created_at re-read behind the watermark (rows committed out of order)
+USERNAME_SYNC_OVERLAP = float(os.getenv("USERNAME_SYNC_OVERLAP", "30"))
+# Seconds between full reloads (picks up renames and deletions)
+USERNAME_RELOAD_INTERVAL = float(os.getenv("USERNAME_RELOAD_INTERVAL", "3600"))
+
+
+def _copy_profile(profile):
+    """Copy a profile row, including its list columns, so callers can mutate it."""
+    return {k: list(v) if isinstance(v, list) else v for k, v in profile.items()}
 
 
 class UserService:
-    def __init__(self, supabase: Client):
+    def __init__(self, supabase: "Client", db: Optional[DBCaller] = None,
+                 counters: Optional[LikeCounters] = None, catalog=None):
         self.supabase = supabase
+        self.catalog = catalog      # RecipeCatalog | None, for recipe tokens
+        self.db = db or DBCaller(supabase)
+        self.counters = counters or LikeCounters(self.db)
         self.table = "users_public"
+        self.usernames = UsernameIndex()
+        self.profiles = LRUCache(PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+        self.usernames_after = None     # created_at watermark of the username sync
+        self.usernames_loaded = None    # time.time() of the last full load
+        self._stop = threading.Event()
+
+    # -------------------------------------------------
+    # PROFILE CACHE
+    # -------------------------------------------------
+    def _cache_update(self, user_id: str, changes: dict):
+        """Write-through: apply a successful DB update to the cached profile."""
+        cached = self.profiles.get(user_id)
+        if cached is not None:
+            updated = dict(cached)
+            updated.update(_copy_profile(changes))
+            self.profiles.set(user_id, updated)
+
+    def _cache_bump(self, user_id: str, field: str, delta: int):
+        """Adjust a cached counter by `delta` (the DB column catches up on the next fold)."""
+        cached = self.profiles.get(user_id)
+        if cached is not None:
+            self._cache_update(user_id, {field: max(0, (cached.get(field) or 0) + delta)})
+
+    def _swipe(self, user_id: str, recipe_id: int, action: str, weight: float = 0.0):
+        """
+        Apply a swipe to the user's lists in one atomic database call
+        (swipe_recipe(), migrations/007) and cache the row it returns.
+
+        The arrays are changed in place under the row lock, so nothing is
+        read first and no other writer's changes are lost. A nonzero
+        `weight` also shifts the affinity vector by the recipe's tokens.
+
+        Returns:
+            tuple(dict, bool) | None: (updated profile, whether the swipe
+            changed the lists), or None if the user does not exist.
+        """
+        params = {"p_user_id": user_id, "p_recipe_id": recipe_id, "p_action": action}
+        recipe = self._recipe_tokens(recipe_id) if weight else None
+        if recipe:
+            category, ingredients = affinity.swipe_tokens(recipe)
+            params.update(p_category=category, p_ingredients=ingredients, p_weight=weight)
+
+        res = self.db.rpc("swipe_recipe", params).execute()
+        if not res.data:
+            return None
+        profile = res.data[0]["profile"]
+        self.profiles.set(user_id, _copy_profile(profile))
+        return _copy_profile(profile), bool(res.data[0]["applied"])
+
+    def cache_stats(self):
+        return self.profiles.stats()
+
+    # -------------------------------------------------
+    # AFFINITY HELPERS
+    # -------------------------------------------------
+    def _recipe_tokens(self, recipe_id: int):
+        """
+        The columns an affinity update needs, from the in-memory catalog
+        when it holds the recipe, else from the database.
+        """
+        if self.catalog is not None:
+            recipe = self.catalog.get(recipe_id)
+            if recipe is not None:
+                return recipe
+        res = (
+            self.db.table("recipes_public")
+            .select(affinity.RECIPE_COLUMNS)
+            .eq("recipeid", recipe_id)
+            .execute()
+        )
+        return res.data[0] if res.data else None
 
     # -------------------------------------------------
     # CREATE USER
@@ -32,35 +132,152 @@ class UserService:
             "unseen_recipes": unseen,
             "disliked_recipes": [],
             "total_likes": 0,
+            # affinity is left to its column default (migrations/001), so
+            # signup also works against a database without the column
             "created_at": datetime.now(timezone.utc).isoformat()
         }
 
         try:
-            result = self.supabase.table(self.table).insert(profile_data).execute()
+            result = self.db.table(self.table).insert(profile_data).execute()
+            self.usernames.add(username)
+            self.profiles.set(user_id, _copy_profile((result.data or [profile_data])[0]))
             return {"data": result.data}, 200
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
+
+    # -------------------------------------------------
+    # USERNAME INDEX
+    # -------------------------------------------------
+    def load_usernames(self, page_size: int = 1000):
+        """Page every username out of users_public into the in-memory index."""
+        # Rows created while we page are picked up by the next sync
+        started = datetime.now(timezone.utc)
+        names = []
+        start = 0
+        while True:
+            res = (
+                self.db.table(self.table)
+                .select("username")
+                .order("id")
+                .range(start, start + page_size - 1)
+                .execute(observe=False)
+            )
+            rows = res.data or []
+            names.extend(r["username"] for r in rows)
+            if len(rows) < page_size:
+                break
+            start += page_size
+
+        self.usernames.load(names)
+        self.usernames_after = started
+        self.usernames_loaded = time.time()
+        return len(names)
+
+    def sync_usernames(self, page_size: int = 1000):
+        """
+        Add usernames registered since the last load or sync to the index.
+
+        Pages users_public by created_at after the watermark, re-reading
+        USERNAME_SYNC_OVERLAP seconds so rows committed slightly out of
+        order are not missed (re-adding a name is a no-op). Renames and
+        deletions have no timestamp to follow, so the index is fully
+        reloaded every USERNAME_RELOAD_INTERVAL seconds instead.
+
+        Returns:
+            int: Names read by this sync (0 before the first load).
+        """
+        if self.usernames_after is None:
+            return 0
+        if time.time() - self.usernames_loaded > USERNAME_RELOAD_INTERVAL:
+            return self.load_usernames(page_size)
+
+        after = (self.usernames_after - timedelta(seconds=USERNAME_SYNC_OVERLAP)).isoformat()
+        newest = self.usernames_after
+        count = start = 0
+        while True:
+            rows = (
+                self.db.table(self.table)
+                .select("username, created_at")
+                .gt("created_at", after)
+                .order("created_at")
+                .range(start, start + page_size - 1)
+                .execute(observe=False)
+            ).data or []
+            for row in rows:
+                self.usernames.add(row["username"])
+                if row.get("created_at"):
+                    created = datetime.fromisoformat(str(row["created_at"]).replace("Z", "+00:00"))
+                    newest = max(newest, created if created.tzinfo else created.replace(tzinfo=timezone.utc))
+            count += len(rows)
+            if len(rows) < page_size:
+                break
+            start += page_size
+
+        self.usernames_after = newest
+        return count
+
+    def run(self):
+        """Username sync loop; call from a daemon thread."""
+        while not self._stop.wait(USERNAME_SYNC_INTERVAL):
+            try:
+                self.sync_usernames()
+            except Exception as e:
+                print("[WARN] Username sync failed:", e)
+
+    def stop(self):
+        self._stop.set()
+
+    def username_exists(self, username: str) -> bool:
+        """
+        True if the username is taken.
+
+        Bloom negatives and exact hits are answered from memory; only
+        possible positives (or an index that has not loaded yet) query
+        the database.
+        """
+        if self.usernames.ready:
+            if not self.usernames.might_contain(username):
+                return False
+            if username in self.usernames:
+                return True
+
+        res = (
+            self.db.table(self.table)
+            .select("username")
+            .eq("username", username)
+            .execute()
+        )
+        exists = len(res.data) > 0
+        if exists:
+            self.usernames.add(username)
+        return exists
 
     # -------------------------------------------------
     def get_user(self, user_id: str):
+        cached = self.profiles.get(user_id)
+        if cached is not None:
+            return {"data": [_copy_profile(cached)]}, 200
+
         try:
             res = (
-                self.supabase.table(self.table)
+                self.db.table(self.table)
                 .select("*")
                 .eq("id", user_id)
-                .execute()
+                .execute(shared=True)
             )
 
             if not res.data:
                 return {"error": "User not found"}, 404
 
-            return {"data": res.data}, 200
+            # The row may be shared with concurrent callers; hand out copies
+            self.profiles.set(user_id, _copy_profile(res.data[0]))
+            return {"data": [_copy_profile(res.data[0])]}, 200
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
         
 
     def update_user(self, user_id, data):
-        return self.supabase.table("user_public") \
+        return self.db.table("user_public") \
             .update(data) \
             .eq("id", user_id) \
             .single()
@@ -71,113 +288,56 @@ class UserService:
     def update_allergens(self, user_id: str, allergens: list):
         try:
             resp = (
-                self.supabase.table(self.table)
+                self.db.table(self.table)
                 .update({"allergens": allergens})
                 .eq("id", user_id)
                 .execute()
             )
+            self._cache_update(user_id, {"allergens": allergens})
             return {"data": resp.data}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
     # -------------------------------------------------
     # LIKE/DISLIKE RECIPE
     # -------------------------------------------------
     def like_recipe(self, user_id: str, recipe_id: int, author_id: str):
         try:
+            # liked/unseen lists and affinity, in one atomic call
+            if self._swipe(user_id, recipe_id, "like", affinity.LIKE_WEIGHT) is None:
+                return {"error": "User not found"}, 404
 
-            #update user likes and unseen
-            user, _ = self.get_user(user_id)
-            profile = user["data"][0]
-
-            likes = profile.get("liked_recipes", [])
-            if recipe_id not in likes:
-                likes.append(recipe_id)
-
-            unseen = profile.get("unseen_recipes", [])
-            if recipe_id in unseen:
-                unseen.remove(recipe_id)
-
-            self.supabase.table(self.table).update(
-                {
-                    "liked_recipes": likes,
-                    "unseen_recipes": unseen
-                }
-            ).eq("id", user_id).execute()
-
-            #update authors likes 
-            author, _ = self.get_user(author_id)
-            total = author["data"][0].get("total_likes", 0) + 1
-
-            self.supabase.table(self.table).update(
-                {"total_likes": total}
-            ).eq("id", author_id).execute()
-
-            #update recipe likes
-            recipe_res = (
-            self.supabase.table("recipes_public")
-            .select("likes")
-            .eq("recipeid", recipe_id)
-            .execute()
-        )
-
-            current_likes = recipe_res.data[0].get("likes", 0)
-            new_likes = current_likes + 1
-
-            self.supabase.table("recipes_public").update(
-                {"likes": new_likes}
-            ).eq("recipeid", recipe_id).execute()
+            # recipe and author like counts (sharded; folded into the
+            # likes / total_likes columns in the background)
+            self.counters.increment("recipe", recipe_id)
+            self.counters.increment("author", author_id)
+            self._cache_bump(author_id, "total_likes", 1)
 
             return {"data": "Recipe liked"}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
         
     def dislike_recipe(self, user_id: str, recipe_id: int):
         try:
-            user, _ = self.get_user(user_id)
-            profile = user["data"][0]
-
-            disliked = profile.get("disliked_recipes", [])
-            if recipe_id not in disliked:
-                disliked.append(recipe_id)
-
-            # Remove from unseen_recipes
-            unseen = profile.get("unseen_recipes", [])
-            if recipe_id in unseen:
-                unseen.remove(recipe_id)
-
-            # Update user record
-            res = (
-                self.supabase.table(self.table)
-                .update({
-                    "disliked_recipes": disliked,
-                    "unseen_recipes": unseen
-                })
-                .eq("id", user_id)
-                .execute()
-            )
-            return {"data": res.data}, 200
+            swiped = self._swipe(user_id, recipe_id, "dislike", affinity.DISLIKE_WEIGHT)
+            if swiped is None:
+                return {"error": "User not found"}, 404
+            return {"data": [swiped[0]]}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
 
     def get_liked_recipes(self, user_id):
         try:
-            # 1) Load profile
-            prof = (
-                self.supabase.table("users_public")
-                .select("liked_recipes")
-                .eq("id", user_id)
-                .execute()
-            )
-
-            if not prof.data:
-                return {"error": "User not found"}, 404
+            # 1) Load profile (served from the profile cache when warm)
+            prof, status = self.get_user(user_id)
+            if status != 200:
+                return prof, status
 
-            liked = prof.data[0].get("liked_recipes", [])
+            liked = prof["data"][0].get("liked_recipes", []) or []
 
             # Convert strings → integers (CRITICAL FIX)
             liked_int = []
@@ -192,7 +352,7 @@ class UserService:
 
             # 2) Fetch recipes using proper integer list
             recipes = (
-                self.supabase.table("recipes_public")
+                self.db.table("recipes_public")
                 .select("*")
                 .in_("recipeid", liked_int)
                 .execute()
@@ -202,62 +362,45 @@ class UserService:
 
         except Exception as e:
             print("ERROR in get_liked_recipes:", e)
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
 
 
     # -------------------------------------------------
     def unlike_recipe(self, user_id: str, recipe_id: int, author_id: str):
         try:
-            user, _ = self.get_user(user_id)
-            profile = user["data"][0]
-
-            likes = profile.get("liked_recipes", [])
-            if recipe_id in likes:
-                likes.remove(recipe_id)
-
-            self.supabase.table(self.table).update(
-                {"liked_recipes": likes}
-            ).eq("id", user_id).execute()
-
-            author, _ = self.get_user(author_id)
-            total = max(0, author["data"][0].get("total_likes", 0) - 1)
+            # Undo the like's contribution to the affinity vector
+            swiped = self._swipe(user_id, recipe_id, "unlike", -affinity.LIKE_WEIGHT)
+            if swiped is None:
+                return {"error": "User not found"}, 404
 
-            self.supabase.table(self.table).update(
-                {"total_likes": total}
-            ).eq("id", author_id).execute()
+            # Take the like back from both counters, so total_likes stays
+            # the sum of the author's recipe likes (reconcile_author_likes)
+            if swiped[1]:
+                self.counters.increment("recipe", recipe_id, -1)
+                self.counters.increment("author", author_id, -1)
+                self._cache_bump(author_id, "total_likes", -1)
 
             return {"data": "Recipe unliked"}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
 
     # -------------------------------------------------
     def add_unseen(self, user_id: str, recipe_id: int):
         try:
-            user, _ = self.get_user(user_id)
-            profile = user["data"][0]
-
-            unseen = profile.get("unseen_recipes", [])
-            if recipe_id not in unseen:
-                unseen.append(recipe_id)
-
-            res = (
-                self.supabase.table(self.table)
-                .update({"unseen_recipes": unseen})
-                .eq("id", user_id)
-                .execute()
-            )
-
-            return {"data": res.data}, 200
+            swiped = self._swipe(user_id, recipe_id, "unseen")
+            if swiped is None:
+                return {"error": "User not found"}, 404
+            return {"data": [swiped[0]]}, 200
 
         except Exception as e:
-            return {"error": str(e)}, 500
+            return {"error": str(e)}, error_status(e)
         
 
     def get_user_by_username(self, username):
         result = (
-            self.supabase.table("user_public")
+            self.db.table("user_public")
             .select("*")
             .eq("username", username)
             .single()
@@ -267,10 +410,16 @@ class UserService:
 
     def update_user_by_username(self, username, update_data):
         result = (
-            self.supabase.table("user_public")
+            self.db.table("user_public")
             .update(update_data)
             .eq("username", username)
             .single()
             .execute()
         )
+        if isinstance(result.data, dict) and result.data.get("id"):
+            self.profiles.pop(result.data["id"])
+        new_name = update_data.get("username")
+        if new_name and new_name != username:
+            self.usernames.discard(username)
+            self.usernames.add(new_name)
         return result.data
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+===============================================================================
+ File: username_index.py
+ Part of: Tastebuddin Backend System
+ Authors: Kadee Wheeler
+
+ Description:
+     In-process index of taken usernames used by the signup flow.
+     Provides:
+         - BloomFilter: compact set sketch with no false negatives
+         - UsernameIndex: Bloom filter for fast "definitely free" answers
+           plus an exact set of the usernames loaded/created locally
+
+     UserService loads the index from users_public, adds every username
+     it creates, and polls users_public by created_at in the background
+     (UserService.sync_usernames), so names registered on other instances
+     show up within USERNAME_SYNC_INTERVAL seconds; a periodic full
+     reload picks up renames and deletions. A Bloom negative is answered
+     from memory; only possible positives that are not in the exact set
+     go to the database. Names added while the load is running are kept.
+     Within the sync window the unique constraint on
+     users_public.username still rejects a duplicate insert and
+     /user/create answers 409 (see app.py).
+===============================================================================
+"""
+
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over a blake2b digest.
+
+    Attributes:
+        capacity (int): Expected number of items.
+        error_rate (float): Target false-positive probability at capacity.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class UsernameIndex:
+    """
+    Bloom filter + exact set of known usernames.
+
+    Until load() has run the index is not `ready` and callers should ask
+    the database directly.
+    """
+
+    def __init__(self, capacity=100_000, error_rate=0.01):
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._exact = set()
+        self._lock = threading.Lock()
+        self._recent = set()        # added since the last load() finished
+        self.ready = False
+
+    def load(self, usernames):
+        """
+        Replace the index contents with `usernames` and mark it ready.
+        Names add()ed since the previous load (e.g. while `usernames` was
+        being paged in) are merged in rather than dropped.
+        """
+        names = {u for u in usernames if u}
+        bloom = BloomFilter(max(len(names) * 2, self._bloom.capacity), self.error_rate)
+        for name in names:
+            bloom.add(name)
+        with self._lock:
+            for name in self._recent - names:
+                names.add(name)
+                bloom.add(name)
+            self._recent = set()
+            self._bloom, self._exact = bloom, names
+            self.ready = True
+
+    def add(self, username):
+        with self._lock:
+            if username in self._exact:
+                return
+            self._exact.add(username)
+            self._recent.add(username)
+            if self._bloom.count >= self._bloom.capacity:
+                # Grow before the false-positive rate degrades
+                self._bloom = BloomFilter(self._bloom.capacity * 2, self.error_rate)
+                for name in self._exact:
+                    self._bloom.add(name)
+            else:
+                self._bloom.add(username)
+
+    def discard(self, username):
+        """Forget an exact entry (Bloom bits stay set; lookups fall back to the DB)."""
+        with self._lock:
+            self._exact.discard(username)
+            self._recent.discard(username)
+
+    def might_contain(self, username):
+        return username in self._bloom
+
+    def __contains__(self, username):
+        return username in self._exact
+
+    def __len__(self):
+        return len(self._exact)
@@ -45,12 +45,18 @@ if (!userID) {
 }
 
 // new fetch functionality
-fetch(`${API_BASE}/feed/${userID}`)
-    .then(res => res.json())
-    .then(data => {
-        console.log("User feed: ", data);
-        renderFeed(data.data);
-    });
+// The backend returns the top-ranked page of the feed; swiped recipes leave
+// the unseen list, so fetching again yields the next page.
+function loadFeed() {
+    fetch(`${API_BASE}/feed/${userID}`)
+        .then(res => res.json())
+        .then(data => {
+            console.log("User feed: ", data);
+            renderFeed(data.data);
+        });
+}
+
+loadFeed();
 
 
 // variables for the animation
@@ -155,7 +161,7 @@ function nextRecipe() {
 
         if (idx >= recipes.length) {
             recipes = [];
-            return showDefault();
+            return loadFeed();
         }
     
         showRecipe();